@@ -0,0 +1,106 @@
+import argparse
+import json
+import time
+
+import common
+from stub_server import StubSteamServer, synthetic_games
+
+# Several accounts served by the stub GetOwnedGames with --latency seconds each:
+# the libraries fetched one after another against the bounded pool of
+# LauncherCore.fetch_accounts, the merged library (one row per appid with its
+# owners), a second refresh that only refetches stale accounts, and an account
+# whose fetch fails falling back to its stored copy.
+def fixture_libraries(accounts, games_per_account):
+    # Overlapping slices of one synthetic catalogue, so many games are owned more than once
+    catalogue = synthetic_games(games_per_account * 2)
+    step = games_per_account // accounts
+    return {f"7656119800000{index:04d}": catalogue[index * step:index * step + games_per_account]
+            for index in range(accounts)}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--accounts", type=int, default=5)
+    parser.add_argument("--games", type=int, default=2000, help="games per account")
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    import library_accounts
+    import steam_api
+    from launcher_core import LauncherCore
+
+    libraries = fixture_libraries(args.accounts, args.games)
+    server = StubSteamServer(libraries=libraries, account_delays={steam_id: args.latency for steam_id in libraries}).start()
+    steam_api.OWNED_GAMES_URL = server.base_url + "/IPlayerService/GetOwnedGames/v1/"
+    accounts = [{"steam_id": steam_id, "name": f"account {index}"} for index, steam_id in enumerate(libraries)]
+    with open("launcher_config.json", "w") as file:
+        json.dump({"steam_api_key": "KEY", "steam_accounts": accounts, "account_workers": args.workers,
+                   "steam_roots": []}, file)
+    core = LauncherCore()
+    rows = []
+    checks = []
+
+    # One account after the other, as a loop over fetch_owned_games would do
+    start = time.perf_counter()
+    for account in core.accounts():
+        steam_api.fetch_owned_games(account["api_key"], account["steam_id"], session=core.session())
+    sequential = time.perf_counter() - start
+    rows.append(("sequential", f"{sequential * 1000:8.1f} ms"))
+
+    server.max_in_flight = 0
+    start = time.perf_counter()
+    games, errors = core.fetch_library()
+    pooled = time.perf_counter() - start
+    rows.append((f"pool of {args.workers}", f"{pooled * 1000:8.1f} ms  at most {server.max_in_flight} at once"))
+    checks.append(("faster than sequential", pooled < sequential * 0.6))
+    checks.append((f"at most {args.workers} requests at once", server.max_in_flight <= args.workers))
+
+    expected = {}
+    for steam_id, library in libraries.items():
+        for game in library:
+            expected.setdefault(game["appid"], []).append(game)
+    rows.append(("merged", f"{len(games)} games from {sum(map(len, libraries.values()))} account entries"))
+    checks.append(("one row per appid", len(games) == len(expected) == len({game["appid"] for game in games})))
+    checks.append(("owners recorded", all(len(game["owners"]) == len(expected[game["appid"]]) for game in games)))
+    checks.append(("playtime summed", all(game["playtime_forever"] == sum(entry["playtime_forever"] for entry in expected[game["appid"]])
+                                          for game in games)))
+    changes = core.update_library([], games)
+    stored = core.games()
+    checks.append(("stored with owners", changes is None and stored == games))
+
+    # Nothing stale: the refresh is served from the per-account cache
+    before = sum(server.owned_requests.values())
+    start = time.perf_counter()
+    games, errors = core.fetch_library(force=False)
+    rows.append(("refresh, all fresh", f"{(time.perf_counter() - start) * 1000:8.1f} ms  "
+                                        f"requests {sum(server.owned_requests.values()) - before}"))
+    checks.append(("fresh accounts not refetched", sum(server.owned_requests.values()) == before and games == stored))
+
+    # One account aged past account_max_age
+    stale = accounts[1]["steam_id"]
+    core.library().store_account(stale, libraries[stale], fetched=time.time() - library_accounts.DEFAULT_MAX_AGE - 1)
+    before = server.owned_requests.copy()
+    start = time.perf_counter()
+    games, errors = core.fetch_library(force=False)
+    refetched = server.owned_requests - before
+    rows.append(("refresh, one stale", f"{(time.perf_counter() - start) * 1000:8.1f} ms  requests {sum(refetched.values())}"))
+    checks.append(("only the stale account refetched", dict(refetched) == {stale: 1} and games == stored))
+
+    # A failing account keeps its stored library and is reported
+    failing = accounts[2]["steam_id"]
+    server.failing_accounts.add(failing)
+    games, errors = core.fetch_library()
+    rows.append(("refresh, one account failing", f"errors {sorted(errors)}"))
+    checks.append(("failure reported", list(errors) == [failing]))
+    checks.append(("stored copy used for it", games == stored))
+    core.close()
+    server.stop()
+
+    rows += [(label, "OK" if ok else "NO") for label, ok in checks]
+    common.report(f"accounts: {args.accounts} accounts x {args.games} games, {args.latency * 1000:.0f} ms latency", rows)
+    if not all(ok for _, ok in checks):
+        raise SystemExit("accounts check failed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import common
+from fake_steam import install_fake_steam
+from stub_server import StubSteamServer, synthetic_games
+
+# Runs launcher_cli in a fresh interpreter, pointed at the stub server, and reports
+# whether PyQt5 or requests ended up imported
+RUNNER = """
+import sys
+import steam_api
+steam_api.OWNED_GAMES_URL = {api!r}
+steam_api.ICON_BASE_URL = {icons!r}
+import launcher_cli
+code = launcher_cli.main(sys.argv[1:])
+print(json.dumps({{"pyqt5": "PyQt5" in sys.modules, "requests": "requests" in sys.modules}}), file=sys.stderr)
+sys.exit(code)
+"""
+
+def run_cli(runner, *command):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", runner, *command], capture_output=True, text=True,
+                            cwd=os.getcwd(), env=dict(os.environ, PYTHONPATH=common.REPO_ROOT))
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise SystemExit(f"launcher_cli {' '.join(command)} failed ({result.returncode}):\n{result.stderr}")
+    imports = json.loads(result.stderr.strip().splitlines()[-1])
+    return elapsed, result.stdout, imports
+
+# Every launcher_cli command against a --games library from the stub server, each in
+# its own interpreter as a login script or CI job would run it: wall time including
+# interpreter start, and a check that PyQt5 is never imported.
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--icons", type=int, default=1000)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    install_fake_steam(tempfile.mkdtemp(prefix="fake-steam-"))
+    # launch --wait follows the game the fake steam starts
+    os.environ["FAKE_STEAM_GAME_SECONDS"] = "0.5"
+    games = synthetic_games(args.games)
+    # Only the first --icons games have an icon, to keep the prefetch run short
+    for game in games[args.icons:]:
+        game["img_icon_url"] = ""
+    server = StubSteamServer(games, image_bytes=common.sample_jpeg()).start()
+    runner = "import json\n" + RUNNER.format(api=server.base_url + "/IPlayerService/GetOwnedGames/v1/",
+                                              icons=server.base_url + "/steamcommunity/public/images/apps")
+    with open("launcher_config.json", "w") as file:
+        json.dump({"steam_api_key": "KEY", "steam_profile_id": "76561198000000000", "steam_roots": []}, file)
+
+    rows = []
+    qt_free = True
+    steps = [
+        ("refresh (first)", ["refresh"]),
+        ("refresh (unchanged)", ["refresh"]),
+        ("list", ["list"]),
+        ("list --json", ["list", "--json", "--sort", "playtime"]),
+        ("search", ["search", "hollow", "knight"]),
+        ("prefetch-icons (cold)", ["prefetch-icons"]),
+        ("prefetch-icons (warm)", ["prefetch-icons"]),
+        ("launch --wait", ["launch", str(games[0]["appid"]), "--wait"]),
+        ("launch (detached)", ["launch", str(games[1]["appid"])]),
+    ]
+    for label, command in steps:
+        elapsed, output, imports = run_cli(runner, *command)
+        qt_free = qt_free and not imports["pyqt5"]
+        lines = output.strip().splitlines()
+        summary = lines[-1] if command[0] in ("refresh", "prefetch-icons", "launch") else f"{len(lines)} lines"
+        if command == ["list", "--json", "--sort", "playtime"]:
+            summary = f"{len(json.loads(output))} games"
+        rows.append((label, f"{elapsed * 1000:7.0f} ms  requests: {'yes' if imports['requests'] else 'no '}  {summary}"))
+
+    # Interpreter start alone, for reference
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "pass"], check=True)
+    rows.append(("python -c pass", f"{(time.perf_counter() - start) * 1000:7.0f} ms"))
+    rows.append(("PyQt5 imported", "never" if qt_free else "yes"))
+    server.stop()
+    common.report(f"launcher_cli: {args.games} games, {args.icons} icons", rows)
+    if not qt_free:
+        raise SystemExit("launcher_cli imported PyQt5")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import threading
+import time
+
+import common
+
+# Process-wide bytes handed to write() (Linux only), covers every writer in the process
+def written_bytes():
+    try:
+        with open("/proc/self/io") as file:
+            for line in file:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+# Adds --favorites favorites one by one, the way clicking "Add to Favorites" does,
+# once with the old save_config (full synchronous rewrite per favorite) and once
+# with ConfigStore. Reports GUI-thread time, number of file writes and bytes written,
+# and checks that the file on disk holds every favorite after close().
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--favorites", type=int, default=10000)
+    parser.add_argument("--delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    from config_store import ConfigStore
+
+    config = {"steam_api_key": "KEY", "steam_profile_id": "76561198000000000"}
+    app_ids = [10 + 10 * i for i in range(args.favorites)]
+
+    # The previous behaviour: list scan plus a full open(..., "w") rewrite per favorite
+    favorites = []
+    legacy_bytes = 0
+    before = written_bytes()
+    start = time.perf_counter()
+    for app_id in app_ids:
+        if app_id not in favorites:
+            favorites.append(app_id)
+            config["favorites"] = favorites
+            with open("legacy_config.json", "w") as file:
+                json.dump(config, file)
+            legacy_bytes += os.path.getsize("legacy_config.json")
+    legacy_time = time.perf_counter() - start
+    legacy_io = written_bytes() - before if before is not None else None
+
+    # The store is fed at full speed, so the debounce only flushes on max_delay
+    store = ConfigStore("launcher_config.json", delay=args.delay, max_delay=args.delay * 4)
+    store.set("steam_api_key", "KEY")
+    before = written_bytes()
+    start = time.perf_counter()
+    for app_id in app_ids:
+        store.add_favorite(app_id)
+    gui_time = time.perf_counter() - start
+    store.close()
+    total_time = time.perf_counter() - start
+    store_io = written_bytes() - before if before is not None else None
+
+    with open("launcher_config.json") as file:
+        saved = json.load(file)
+
+    # Concurrent changes from several threads must all reach the file
+    concurrent = ConfigStore("concurrent_config.json", delay=args.delay)
+    threads = [threading.Thread(target=lambda n=n: [concurrent.add_favorite(n * 1000 + i) for i in range(1000)])
+               for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    concurrent.close()
+    with open("concurrent_config.json") as file:
+        concurrent_saved = len(json.load(file)["favorites"])
+
+    def io(wchar):
+        return f" (wchar {wchar / 1e6:.1f} MB)" if wchar is not None else ""
+
+    common.report(f"config persistence: {args.favorites} favorites", [
+        ("save_config per favorite", f"{legacy_time * 1000:.0f} ms, {len(app_ids)} writes, "
+                                     f"{legacy_bytes / 1e6:.1f} MB{io(legacy_io)}"),
+        ("ConfigStore, GUI thread", f"{gui_time * 1000:.1f} ms"),
+        ("ConfigStore, until closed", f"{total_time * 1000:.0f} ms, {store.stats['writes']} writes, "
+                                      f"{store.stats['bytes_written'] / 1e6:.2f} MB{io(store_io)}"),
+        ("favorites on disk", f"{len(saved['favorites'])} of {len(app_ids)}"),
+        ("4 threads x 1000 favorites", f"{concurrent_saved} on disk, {concurrent.stats['writes']} writes"),
+    ])
+
+if __name__ == "__main__":
+    main()
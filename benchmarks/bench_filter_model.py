@@ -0,0 +1,66 @@
+import argparse
+import statistics
+import time
+
+import common
+from stub_server import synthetic_games
+
+# Filter latency per keystroke on a large library: the model/view list against
+# the previous clear-and-rebuild QListWidget. Icons are left out so only the
+# item handling is measured. Target is one frame (16 ms).
+QUERIES = ["c", "co", "cou", "coun", "count", "counte", "counter", "counter ", "counter s",
+           "counter st", "counter str", "counter stri", "counter strik", "counter strike",
+           "counter stri", "counter", "", "portal", ""]
+FRAME_MS = 16.0
+
+def measure(step):
+    latencies = []
+    for query in QUERIES:
+        start = time.perf_counter()
+        step(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=10000)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    common.qt_app()
+    from PyQt5 import QtCore, QtWidgets
+    import launcherAlpha2
+
+    games = [dict(game, img_icon_url="") for game in synthetic_games(args.games)]
+
+    launcher = launcherAlpha2.GamingLauncher()
+    launcher.show()
+    launcher.show_library(games)
+
+    def model_view(query):
+        common.set_search_text(launcher, query)
+        common.paint_view(launcher.game_list)
+
+    widget = QtWidgets.QListWidget()
+    widget.resize(launcher.game_list.size())
+    widget.show()
+
+    def rebuild(query):
+        widget.clear()
+        for game in games:
+            if query in game["name"].lower():
+                item = QtWidgets.QListWidgetItem(game["name"])
+                item.setData(QtCore.Qt.UserRole, game["appid"])
+                widget.addItem(item)
+        widget.viewport().repaint()
+
+    rows = []
+    for label, step in [("model/view", model_view), ("QListWidget rebuild", rebuild)]:
+        latencies = measure(step)
+        verdict = "ok" if max(latencies) < FRAME_MS else "over budget"
+        rows.append((label, f"median {statistics.median(latencies):7.2f} ms  max {max(latencies):7.2f} ms  ({verdict})"))
+    launcher.close()
+    common.report(f"filter latency: {args.games} games, {len(QUERIES)} keystrokes", rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import argparse
+import json
+import time
+import tracemalloc
+from array import array
+from itertools import compress
+
+import common
+from bench_stream_parse import api_entries
+
+# Memory of the library and of filtering, measured with tracemalloc for each of
+# --sizes games: API dicts against Game records (parsed and loaded from the
+# snapshot), then one filter pass as the old list of dicts, as a set-based
+# category, and as the row arrays and category mask launcherAlpha2 now uses,
+# plus filter_games on a launcher holding the library.
+def traced(function):
+    # (result, bytes still held, peak bytes) of function()
+    tracemalloc.start()
+    result = function()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, held, peak
+
+def mib(size):
+    return f"{size / 2 ** 20:7.2f} MiB"
+
+def kib(size):
+    return f"{size / 1024:9.1f} KiB"
+
+def measure(count, rows, checks, skip_gui):
+    # The API body and dicts are gone once measure_records returns, only the records stay
+    records = measure_records(count, rows, checks)
+    if not skip_gui:
+        measure_launcher(count, records, rows)
+
+def measure_records(count, rows, checks):
+    import steam_api
+    from library_db import LibraryDB
+
+    body = json.dumps({"response": {"game_count": count, "games": api_entries(count)}}).encode()
+    dicts, held, _ = traced(lambda: json.loads(body)["response"]["games"])
+    rows.append((f"{count}: API dicts", mib(held)))
+
+    def parse():
+        parser = steam_api.OwnedGamesParser()
+        games = []
+        for start in range(0, len(body), 64 * 1024):
+            games += parser.feed(body[start:start + 64 * 1024])
+        return games + parser.feed(b"", final=True)
+    records, held_records, _ = traced(parse)
+    rows.append((f"{count}: Game records", f"{mib(held_records)}  ({held_records / count:.0f} B per game)"))
+    checks.append((f"{count}: records below half the dicts", held_records < held * 0.5))
+
+    db = LibraryDB(":memory:")
+    db.replace_games("1", records)
+    loaded, held, _ = traced(lambda: db.load_games("1"))
+    rows.append((f"{count}: Game records from the snapshot", mib(held)))
+    checks.append((f"{count}: snapshot loads the same games", loaded == records))
+    del loaded
+    measure_filters(count, dicts, rows, checks)
+    return records
+
+def measure_filters(count, dicts, rows, checks):
+    # One in five games in the category, one in ten matching the search
+    appids = [game["appid"] for game in dicts]
+    category_appids = appids[::5]
+    matches = array("i", range(0, count, 10))
+    games_by_appid = {game["appid"]: game for game in dicts}
+    _, _, peak = traced(lambda: [games_by_appid[appid] for appid in appids])
+    rows.append((f"{count}: filter, list of dicts (all)", kib(peak)))
+    list_all = peak
+
+    rows_by_appid = {appid: row for row, appid in enumerate(appids)}
+    category_set, held, _ = traced(lambda: {rows_by_appid[appid] for appid in category_appids})
+    rows.append((f"{count}: category as row set", kib(held)))
+
+    def category_mask():
+        mask = bytearray(count)
+        for appid in category_appids:
+            mask[rows_by_appid[appid]] = 1
+        return mask
+    mask, held_mask, _ = traced(category_mask)
+    rows.append((f"{count}: category as mask", kib(held_mask)))
+    checks.append((f"{count}: mask below a tenth of the set", held_mask < held * 0.1))
+
+    all_rows = array("i", range(count))
+    _, _, peak = traced(lambda: array("i", all_rows))
+    rows.append((f"{count}: filter, row array (all)", kib(peak)))
+    checks.append((f"{count}: row array below half the list", peak < list_all * 0.5))
+    filtered, _, peak_set = traced(lambda: [row for row in matches if row in category_set])
+    rows.append((f"{count}: search + category, set (before)", kib(peak_set)))
+    masked, _, peak = traced(lambda: array("i", compress(matches, map(mask.__getitem__, matches))))
+    rows.append((f"{count}: search + category, mask", kib(peak)))
+    only_category, _, peak = traced(lambda: array("i", compress(all_rows, mask)))
+    rows.append((f"{count}: category only, mask", f"{kib(peak)}  {len(only_category)} rows"))
+    checks.append((f"{count}: same rows", list(masked) == filtered and len(only_category) == len(category_appids)))
+
+def measure_launcher(count, records, rows):
+    launcher = common_launcher()
+    launcher.core.update_library([], records)
+    launcher.show_library(records)
+    for category, query in [("all", ""), ("recent", ""), ("recent", "knight")]:
+        index = launcher.filter_dropdown.findData(category)
+        launcher.filter_dropdown.blockSignals(True)
+        launcher.filter_dropdown.setCurrentIndex(index)
+        launcher.filter_dropdown.blockSignals(False)
+        launcher.search_bar.blockSignals(True)
+        launcher.search_bar.setText(query)
+        launcher.search_bar.blockSignals(False)
+        start = time.perf_counter()
+        launcher.filter_games()
+        elapsed = time.perf_counter() - start
+        _, _, peak = traced(launcher.filter_games)
+        rows.append((f"{count}: filter_games {category}/{query or '-'}",
+                     f"{kib(peak)}  {elapsed * 1000:6.1f} ms  {launcher.filter_model.rowCount()} rows"))
+
+_launcher = []
+
+def common_launcher():
+    if not _launcher:
+        common.qt_app()
+        import launcherAlpha2
+        with open(launcherAlpha2.CONFIG_FILE, "w") as file:
+            json.dump({"steam_api_key": "KEY", "steam_profile_id": "1", "refresh_on_startup": False,
+                       "steam_roots": []}, file)
+        launcher = launcherAlpha2.GamingLauncher()
+        launcher.show()
+        common.wait_until(lambda: launcher.library_db is not None, timeout=10)
+        _launcher.append(launcher)
+    return _launcher[0]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000")
+    parser.add_argument("--skip-gui", action="store_true")
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    rows = []
+    checks = []
+    for count in [int(size) for size in args.sizes.split(",")]:
+        measure(count, rows, checks, args.skip_gui)
+    if _launcher:
+        _launcher[0].close()
+
+    rows += [(label, "OK" if ok else "NO") for label, ok in checks]
+    common.report("game records (tracemalloc)", rows)
+    if not all(ok for _, ok in checks):
+        raise SystemExit("game record check failed")
+
+if __name__ == "__main__":
+    main()
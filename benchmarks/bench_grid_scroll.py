@@ -0,0 +1,160 @@
+import argparse
+import os
+import statistics
+import time
+
+import common
+from stub_server import StubSteamServer, synthetic_games
+
+# Scrolls a --games tile grid from top to bottom offscreen, one repaint per step of
+# --step pixels (a fast wheel/fling), and reports the frame times. The GameGridView
+# painting from the thumbnail atlas is compared with a QListWidget in icon mode
+# holding one QIcon per game built from the header file, as launcherAlpha1 does.
+FRAME_MS = 1000 / 60
+
+def scroll_frames(view, step):
+    app = common.qt_app()
+    bar = view.verticalScrollBar()
+    bar.setValue(0)
+    app.processEvents()
+    frames = []
+    for value in range(0, bar.maximum() + step, step):
+        start = time.perf_counter()
+        bar.setValue(value)
+        view.viewport().repaint()
+        frames.append((time.perf_counter() - start) * 1000)
+    return frames
+
+# Anonymous (heap) memory of this process in MiB; the atlas pages are file-backed and not part of it
+def rss_anon_mb():
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float("nan")
+
+def frame_row(frames):
+    frames = sorted(frames)
+    p95 = frames[min(len(frames) - 1, int(len(frames) * 0.95))]
+    on_time = sum(1 for frame in frames if frame <= FRAME_MS) / len(frames) * 100
+    return (f"{len(frames):5d} frames  median {statistics.median(frames):6.2f} ms  p95 {p95:6.2f} ms  "
+            f"max {frames[-1]:7.2f} ms  {on_time:5.1f}% within 60 Hz")
+
+# A 460x215 JPEG with some detail, so decoding costs about what real header art does
+def sample_header():
+    from PyQt5 import QtCore, QtGui
+    common.qt_app()
+    noise = QtGui.QImage(os.urandom(92 * 43 * 4), 92, 43, 92 * 4, QtGui.QImage.Format_RGB32)
+    image = noise.scaled(460, 215, transformMode=QtCore.Qt.SmoothTransformation)
+    painter = QtGui.QPainter(image)
+    painter.setFont(QtGui.QFont("Sans", 40, QtGui.QFont.Bold))
+    painter.drawText(image.rect(), QtCore.Qt.AlignCenter, "HEADER ART")
+    painter.end()
+    buffer = QtCore.QBuffer()
+    buffer.open(QtCore.QIODevice.WriteOnly)
+    image.save(buffer, "JPG", 85)
+    return bytes(buffer.data())
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--step", type=int, default=120, help="pixels scrolled per frame")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=800)
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args()
+
+    workdir = common.isolated_workdir()
+    app = common.qt_app()
+    from PyQt5 import QtCore, QtGui, QtWidgets
+    import steam_api
+    from game_grid import GameGridView
+    from game_model import GameFilterModel, GameListModel
+    from image_cache import ImageCache
+    from thumbnail_atlas import ThumbnailAtlas
+
+    header = sample_header()
+    server = StubSteamServer(image_bytes=header, unique_images=True).start()
+    steam_api.HEADER_BASE_URL = server.base_url + "/steam/apps"
+    games = [dict(game, img_icon_url="") for game in synthetic_games(args.games)]
+    model = GameListModel()
+    model.set_games(games)
+    filter_model = GameFilterModel(model)
+
+    rows = []
+    checks = []
+    grid = GameGridView(image_cache=ImageCache(os.path.join(workdir, "images")), atlas_bytes=1024 * 1024 * 1024)
+    grid.setModel(filter_model)
+    grid.resize(args.width, args.height)
+    grid.show()
+
+    # Cold: the first screen of tiles through stub CDN, image cache and atlas
+    start = time.perf_counter()
+    grid.doItemsLayout()
+    grid.viewport().repaint()
+    visible = [filter_model.index(row, 0).data(QtCore.Qt.UserRole) for row in grid.visible_range()]
+    common.wait_until(lambda: all(app_id in grid.atlas for app_id in visible), timeout=60)
+    app.processEvents()
+    rows.append(("first screen of tiles (cold)", f"{(time.perf_counter() - start) * 1000:7.1f} ms, {len(visible)} tiles incl. prefetch"))
+
+    # Fill the atlas for the whole library, as after browsing it once
+    image = QtGui.QImage()
+    image.loadFromData(header)
+    start = time.perf_counter()
+    for game in games:
+        if game["appid"] not in grid.atlas:
+            grid.atlas.put(game["appid"], image)
+    rows.append(("atlas put (scale + copy)", f"{(time.perf_counter() - start) / len(games) * 1e6:7.1f} us per tile, "
+                                             f"header {len(header) // 1024} KiB"))
+
+    requested = grid.loader.stats["requested"]
+    memory = rss_anon_mb()
+    rows.append(("grid, atlas", frame_row(scroll_frames(grid, args.step))))
+    rows.append(("  heap growth while scrolling", f"{rss_anon_mb() - memory:7.1f} MiB"))
+    checks.append(("every tile painted from the atlas", grid.loader.stats["requested"] == requested))
+    summary = grid.atlas.summary()
+    rows.append(("atlas file", f"{summary['tiles']} tiles in {summary['pages']} pages, {summary['file_bytes'] / 2 ** 20:.0f} MiB"))
+    grid.shutdown()
+    grid.hide()
+
+    reopened = ThumbnailAtlas(grid.atlas.directory, max_bytes=1024 * 1024 * 1024)
+    checks.append(("tiles survive a restart", all(game["appid"] in reopened for game in games)))
+    reopened.close()
+    server.stop()
+
+    if not args.skip_baseline:
+        # One header file per game, loaded through QIcon on paint like launcherAlpha1
+        header_dir = os.path.join(workdir, "headers")
+        os.makedirs(header_dir)
+        widget = QtWidgets.QListWidget()
+        widget.setViewMode(QtWidgets.QListView.IconMode)
+        widget.setMovement(QtWidgets.QListView.Static)
+        widget.setResizeMode(QtWidgets.QListView.Adjust)
+        widget.setUniformItemSizes(True)
+        widget.setIconSize(QtCore.QSize(184, 86))
+        widget.setGridSize(grid.gridSize())
+        widget.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        for game in games:
+            path = os.path.join(header_dir, f"{game['appid']}.jpg")
+            with open(path, "wb") as file:
+                file.write(header)
+            item = QtWidgets.QListWidgetItem(QtGui.QIcon(path), game["name"])
+            widget.addItem(item)
+        widget.resize(args.width, args.height)
+        widget.show()
+        app.processEvents()
+        memory = rss_anon_mb()
+        rows.append(("QListWidget, QIcon per game", frame_row(scroll_frames(widget, args.step))))
+        rows.append(("  heap growth while scrolling", f"{rss_anon_mb() - memory:7.1f} MiB"))
+        widget.close()
+
+    rows += [(label, "OK" if ok else "NO") for label, ok in checks]
+    common.report(f"grid scroll: {args.games} games, {args.width}x{args.height}, {args.step} px per frame", rows)
+    if not all(ok for _, ok in checks):
+        raise SystemExit("grid check failed")
+
+if __name__ == "__main__":
+    main()
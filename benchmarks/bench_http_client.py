@@ -0,0 +1,137 @@
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import common
+from stub_server import StubSteamServer, synthetic_games
+
+# Connections and requests the stub server sees for a load of --icons icons:
+# a bare requests.get per icon and the previous small per-loader session against
+# the shared HttpClient, plus duplicate requests in flight, Cache-Control hits,
+# ETag revalidation, gzip for the library JSON and the whole prefetch path.
+def load(server, get, urls, workers):
+    requests_before, connections_before = server.requests, server.connections
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        bodies = list(executor.map(lambda url: get(url).content, urls))
+    elapsed = time.perf_counter() - start
+    return elapsed, server.requests - requests_before, server.connections - connections_before, bodies
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--icons", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--games", type=int, default=10000)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    import requests
+    import http_client
+    import steam_api
+
+    jpeg = common.sample_jpeg()
+    server = StubSteamServer(synthetic_games(args.games), image_bytes=jpeg, delay=0.002, unique_images=True,
+                             cache_control="max-age=3600", gzip_json=True).start()
+    steam_api.ICON_BASE_URL = server.base_url + "/steamcommunity/public/images/apps"
+    steam_api.OWNED_GAMES_URL = server.base_url + "/IPlayerService/GetOwnedGames/v1/"
+    urls = [steam_api.icon_url(game["appid"], game["img_icon_url"]) for game in synthetic_games(args.icons)]
+    rows = []
+    checks = []
+
+    def row(label, elapsed, sent, connections, extra=""):
+        rows.append((label, f"{elapsed * 1000:8.1f} ms  requests {sent:5d}  connections {connections:5d}  {extra}"))
+
+    elapsed, sent, connections, _ = load(server, lambda url: requests.get(url, timeout=10), urls, args.workers)
+    row("requests.get per icon", elapsed, sent, connections)
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=4)
+    session.mount("http://", adapter)
+    elapsed, sent, connections, _ = load(server, lambda url: session.get(url, timeout=10), urls, args.workers)
+    row("session, pool of 4 (before)", elapsed, sent, connections)
+    session.close()
+
+    client = http_client.HttpClient()
+    elapsed, sent, connections, bodies = load(server, lambda url: client.get(url, timeout=10), urls, args.workers)
+    row("HttpClient, cold", elapsed, sent, connections)
+    checks.append((f"connections <= {http_client.POOL_PER_HOST} per host", connections <= http_client.POOL_PER_HOST))
+    checks.append(("bodies intact", all(body == jpeg + urlsplit(url).path.encode() for body, url in zip(bodies, urls))))
+
+    elapsed, sent, connections, _ = load(server, lambda url: client.get(url, timeout=10), urls, args.workers)
+    row("HttpClient, Cache-Control hit", elapsed, sent, connections, f"cache hits {client.stats['cache_hits']}")
+    checks.append(("fresh responses served from memory", sent == 0))
+
+    # Every icon asked for twice at the same time, as two views of the same row would
+    client.clear_cache()
+    doubled = [url for url in urls for _ in range(2)]
+    elapsed, sent, connections, _ = load(server, lambda url: client.get(url, timeout=10), doubled, args.workers)
+    row("HttpClient, each icon twice", elapsed, sent, connections, f"coalesced {client.stats['coalesced']}")
+    checks.append(("duplicates in flight sent once", sent <= len(urls) * 1.05))
+
+    with client.lock:
+        for entry in client.cache.values():
+            entry.expires = 0
+    not_modified = server.not_modified
+    elapsed, sent, connections, _ = load(server, lambda url: client.get(url, timeout=10), urls, args.workers)
+    row("HttpClient, stale (ETag)", elapsed, sent, connections, f"304 {server.not_modified - not_modified}")
+    checks.append(("stale entries revalidated", server.not_modified - not_modified == len(urls)))
+
+    # While a slow request holds the only pooled connection, another host request and a
+    # duplicate of the slow one give up after their timeouts instead of hanging
+    server.delay = 1.0
+    bounded = http_client.HttpClient(per_host=1, pool_timeout=0.2)
+
+    def timed_out(url, timeout):
+        start = time.perf_counter()
+        try:
+            bounded.get(url, timeout=timeout)
+            error = None
+        except requests.Timeout as e:
+            error = e
+        return error, time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        slow = executor.submit(timed_out, urls[0], 10)
+        time.sleep(0.1)
+        pool_error, pool_wait = timed_out(urls[1], 10)
+        coalesced_error, coalesced_wait = timed_out(urls[0], 0.2)
+        slow.result()
+    bounded.close()
+    server.delay = 0.002
+    rows.append(("waits bounded", f"pool {pool_wait * 1000:.0f} ms, coalesced {coalesced_wait * 1000:.0f} ms"))
+    checks.append(("pool wait bounded", isinstance(pool_error, requests.ConnectTimeout) and pool_wait < 0.8))
+    checks.append(("coalesced wait bounded", coalesced_error is not None and coalesced_wait < 0.8))
+
+    # The library JSON with and without gzip
+    plain = requests.Session()
+    plain.headers["Accept-Encoding"] = "identity"
+    for label, session in [("library, identity", plain), ("library, gzip", http_client.HttpClient())]:
+        before = server.bytes_sent
+        start = time.perf_counter()
+        games = steam_api.fetch_owned_games("KEY", "76561198000000000", session=session)
+        elapsed = time.perf_counter() - start
+        rows.append((label, f"{elapsed * 1000:8.1f} ms  {(server.bytes_sent - before) / 1024:8.0f} KiB on the wire  {len(games)} games"))
+
+    # The real icon path: LauncherCore.prefetch_icons through ImageCache on the shared client
+    from launcher_core import LauncherCore
+    with open("launcher_config.json", "w") as file:
+        json.dump({"steam_roots": []}, file)
+    core = LauncherCore()
+    requests_before, connections_before = server.requests, server.connections
+    start = time.perf_counter()
+    counts = core.prefetch_icons(synthetic_games(args.icons), workers=args.workers)
+    row("prefetch_icons (ImageCache)", time.perf_counter() - start, server.requests - requests_before,
+        server.connections - connections_before, f"downloaded {counts['downloaded']} failed {counts['failed']}")
+    checks.append(("prefetch reuses pooled connections", server.connections - connections_before <= http_client.POOL_PER_HOST))
+    core.close()
+    server.stop()
+
+    rows += [(label, "OK" if ok else "NO") for label, ok in checks]
+    common.report(f"http client: {args.icons} icons, {args.workers} workers", rows)
+    if not all(ok for _, ok in checks):
+        raise SystemExit("http client check failed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import time
+
+import common
+from stub_server import StubSteamServer, synthetic_games
+
+# Measures how fast a large library is painted and how long the background icon
+# loader needs to fill in the visible icons, and then every icon, from a local stub CDN.
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--delay", type=float, default=0.002, help="injected CDN latency in seconds")
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    app = common.qt_app()
+    games = synthetic_games(args.games)
+    server = StubSteamServer(image_bytes=common.sample_jpeg(), delay=args.delay).start()
+
+    import icon_loader
+    import launcherAlpha2
+    import steam_api
+    steam_api.ICON_BASE_URL = server.base_url + "/steamcommunity/public/images/apps"
+
+    launcher = launcherAlpha2.GamingLauncher()
+    launcher.icon_loader.shutdown()
+    launcher.icon_loader = icon_loader.IconLoader(max_workers=args.concurrency, cache=launcher.image_cache,
+                                                  icon_size=launcher.icon_size)
+    launcher.icon_loader.icon_loaded.connect(launcher.on_icon_loaded)
+    loaded = set()
+    launcher.icon_loader.icon_loaded.connect(lambda key, image: loaded.add(key))
+    launcher.show()
+    app.processEvents()
+
+    start = time.perf_counter()
+    launcher.show_library(games)
+    common.paint_view(launcher.game_list)
+    first_paint = time.perf_counter() - start
+    common.wait_until(lambda: not launcher.icon_loader.pending, timeout=600)
+    app.processEvents()
+    visible_fill = time.perf_counter() - start
+    visible_icons = len(loaded)
+
+    # Equivalent of scrolling through the whole list once
+    for game in games:
+        launcher.game_icon(game)
+    complete = common.wait_until(lambda: len(loaded) >= len(games), timeout=600)
+    fill_time = time.perf_counter() - start
+
+    launcher.close()
+    server.stop()
+    common.report(f"icon loader: {args.games} games, concurrency {args.concurrency}", [
+        ("time to first paint", f"{first_paint * 1000:.1f} ms"),
+        ("visible icons filled", f"{visible_fill * 1000:.1f} ms ({visible_icons} icons)"),
+        ("total fill time", f"{fill_time:.2f} s" + ("" if complete else " (timed out)")),
+        ("icons loaded", len(loaded)),
+        ("http requests", server.requests),
+        ("tcp connections", server.connections),
+    ])
+
+if __name__ == "__main__":
+    main()
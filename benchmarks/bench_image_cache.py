@@ -0,0 +1,47 @@
+import argparse
+import os
+import time
+
+import common
+from stub_server import StubSteamServer
+
+# Cold vs warm startup of the on-disk image cache: the first run downloads every
+# image, a fresh ImageCache on the same directory (a restart) should only hit,
+# expired entries should revalidate with 304s, and a small budget should evict.
+def run(cache, urls):
+    start = time.perf_counter()
+    for url in urls:
+        cache.fetch(url)
+    elapsed = time.perf_counter() - start
+    cache.flush()
+    return elapsed, cache.summary()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--images", type=int, default=2000)
+    args = parser.parse_args()
+
+    workdir = common.isolated_workdir()
+    from image_cache import ImageCache
+
+    server = StubSteamServer(image_bytes=os.urandom(8 * 1024), unique_images=True).start()
+    urls = [f"{server.base_url}/steam/apps/{i}/header.jpg" for i in range(args.images)]
+    directory = os.path.join(workdir, "images")
+
+    rows = []
+    for label, kwargs in [
+        ("cold", {}),
+        ("warm (restart)", {}),
+        ("expired (revalidate)", {"max_age": 0}),
+        ("budget 1 MiB", {"max_bytes": 1024 * 1024}),
+    ]:
+        before = server.requests
+        elapsed, stats = run(ImageCache(directory, **kwargs), urls)
+        rows.append((label, f"{elapsed * 1000:8.1f} ms  requests={server.requests - before} "
+                            f"hits={stats['hits']} misses={stats['misses']} revalidated={stats['revalidated']} "
+                            f"evictions={stats['evictions']} bytes={stats['total_bytes']}"))
+    server.stop()
+    common.report(f"image cache: {args.images} images", rows)
+
+if __name__ == "__main__":
+    main()
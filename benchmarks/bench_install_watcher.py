@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import common
+from steam_fixture import make_steam_tree, write_manifest
+from stub_server import synthetic_games
+
+# Creates, updates and deletes appmanifest files under a fixture Steam tree while
+# the launcher runs, and measures how long it takes until the list model shows the
+# new install state. Exits non-zero if a change does not show up, takes longer than
+# --max-latency-ms or resets the model. Runs once with inotify and once with the
+# polling fallback; the GUI thread must not stall on the full scans of the latter.
+# Longest gap between 1 ms timer ticks on the GUI thread over the next seconds
+def longest_stall(seconds):
+    from PyQt5 import QtCore
+    gaps = []
+    last = [time.perf_counter()]
+    def beat():
+        now = time.perf_counter()
+        gaps.append(now - last[0])
+        last[0] = now
+    heartbeat = QtCore.QTimer()
+    heartbeat.timeout.connect(beat)
+    heartbeat.start(1)
+    common.wait_until(lambda: False, timeout=seconds)
+    heartbeat.stop()
+    return max(gaps) if gaps else 0.0
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=5000)
+    parser.add_argument("--changes", type=int, default=20)
+    parser.add_argument("--poll-ms", type=int, default=500)
+    parser.add_argument("--max-latency-ms", type=float, default=1000)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    common.qt_app()
+    import launcherAlpha2
+    from library_db import LibraryDB
+
+    games = synthetic_games(args.games)
+    LibraryDB().replace_games("76561198000000000", games)
+    rows = []
+    failed = []
+    for mode in ("auto", "poll"):
+        root, installed = make_steam_tree(tempfile.mkdtemp(prefix="steam-"), args.games // 2)
+        steamapps = os.path.join(root, "steamapps")
+        with open(launcherAlpha2.CONFIG_FILE, "w") as file:
+            json.dump({"steam_api_key": "KEY", "steam_profile_id": "76561198000000000", "refresh_on_startup": False,
+                       "steam_roots": [root], "install_watch": mode, "install_poll_ms": args.poll_ms}, file)
+        launcher = launcherAlpha2.GamingLauncher()
+        launcher.show()
+        if not common.wait_until(lambda: launcher.install_watcher.active, timeout=30):
+            raise SystemExit(f"{mode}: install watcher not started")
+        resets = []
+        launcher.game_model.modelReset.connect(lambda: resets.append(1))
+
+        latencies = []
+        missed = 0
+        free = [game["appid"] for game in games if game["appid"] not in installed]
+        for i in range(args.changes):
+            # Install a new game, then uninstall it again
+            appid = free[i]
+            start = time.perf_counter()
+            write_manifest(steamapps, appid, f"Game {appid}", 123456789)
+            missed += not common.wait_until(lambda: launcher.game_model.installed.get(appid) == 123456789, timeout=10)
+            latencies.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            os.remove(os.path.join(steamapps, f"appmanifest_{appid}.acf"))
+            missed += not common.wait_until(lambda: appid not in launcher.game_model.installed, timeout=10)
+            latencies.append(time.perf_counter() - start)
+
+        # A few full passes in poll mode, with a heartbeat on the GUI thread
+        stall = 0.0
+        if launcher.install_watcher.mode == "poll":
+            stall = longest_stall(args.poll_ms * 3 / 1000)
+
+        tooltip_row = launcher.game_model.rows_by_appid[free[0]]
+        mode_used = launcher.install_watcher.mode
+        launcher.close()
+        worst = max(latencies) * 1000
+        rows.append((f"{mode_used}: median / worst", f"{statistics.median(latencies) * 1000:.1f} ms / {worst:.1f} ms"
+                                                      f", model resets {len(resets)}"))
+        if mode_used == "poll":
+            rows.append(("poll: longest GUI stall", f"{stall * 1000:.1f} ms"))
+        checks = [
+            ("every change seen", missed == 0),
+            ("latency", worst <= args.max_latency_ms + (args.poll_ms if mode_used == "poll" else 0)),
+            ("row kept", tooltip_row is not None),
+            ("no model reset", not resets),
+            ("no GUI stall", stall * 1000 <= args.max_latency_ms / 2),
+        ]
+        failed += [f"{mode_used}: {label}" for label, ok in checks if not ok]
+
+    common.report(f"install watcher: {args.changes} installs + uninstalls, {args.games // 2} manifests", rows)
+    if failed:
+        raise SystemExit(f"failed: {', '.join(failed)}")
+
+if __name__ == "__main__":
+    main()
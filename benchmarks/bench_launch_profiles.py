@@ -0,0 +1,186 @@
+import argparse
+import ctypes.util
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import common
+from fake_steam import install_fake_steam, install_fake_wrapper
+from stub_server import synthetic_games
+
+# Previous start_game: strip variables from the launcher's own environment, then spawn
+def legacy_start(supervisor, app_id):
+    for name in ("LD_PRELOAD", "GAME_MODE"):
+        os.environ.pop(name, None)
+    supervisor.launch(app_id, ["steam", "-applaunch", str(app_id)])
+
+def read_record(path, timeout=10):
+    deadline = time.perf_counter() + timeout
+    while not os.path.exists(path):
+        if time.perf_counter() > deadline:
+            raise AssertionError(f"fake steam did not write {path}")
+        time.sleep(0.001)
+    with open(path) as file:
+        return json.load(file)
+
+# Launches games from launcherAlpha2 through a fake "steam" on PATH with launch
+# profiles that set env, a wrapper, nice, CPU affinity and args, and checks what
+# the child actually got: argv, environment, niceness and affinity, while the
+# launcher's own environment (with LD_PRELOAD and GAME_MODE set) stays as it was.
+# Times click-to-spawn for the first click on a game (profile resolved) and for
+# repeated clicks (cached), next to the old clean_environment + spawn.
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clicks", type=int, default=30)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    bin_dir = tempfile.mkdtemp(prefix="fake-steam-")
+    records = tempfile.mkdtemp(prefix="fake-steam-records-")
+    install_fake_steam(bin_dir)
+    install_fake_wrapper(bin_dir, "fakegamemoderun")
+    # A library that loads cleanly, so the preload itself is harmless
+    os.environ["LD_PRELOAD"] = ctypes.util.find_library("m") or "libm.so.6"
+    os.environ["GAME_MODE"] = "1"
+    parent_env = dict(os.environ)
+
+    common.qt_app()
+    import launcherAlpha2
+    from launcher_core import steam_launch_command
+    from library_db import LibraryDB
+    games = synthetic_games(args.clicks + 10)
+    LibraryDB().replace_games("76561198000000000", games)
+    tuned, plain, broken = (game["appid"] for game in games[:3])
+    invalid = games[-1]["appid"]
+    cpus = sorted(os.sched_getaffinity(0))
+    profiles = {
+        "default": {"env": {"PROTON_LOG": "1"}},
+        str(tuned): {"wrapper": ["fakegamemoderun", "--verbose"], "nice": 5, "cpu_affinity": cpus[:1],
+                     "args": ["-novid", "+fps_max", "144"],
+                     "env": {"DXVK_HUD": "fps", "PROTON_LOG": None,
+                             "FAKE_WRAPPER_RECORD": os.path.join(records, "wrapper")}},
+        str(broken): {"wrapper": "not-installed-wrapper --flag"},
+        str(invalid): {"nice": "high"},
+    }
+    for game in games:
+        profile = profiles.setdefault(str(game["appid"]), {})
+        profile.setdefault("env", {})["FAKE_STEAM_RECORD"] = os.path.join(records, str(game["appid"]))
+    with open(launcherAlpha2.CONFIG_FILE, "w") as file:
+        json.dump({"steam_api_key": "KEY", "steam_profile_id": "76561198000000000", "refresh_on_startup": False,
+                   "launch_profiles": profiles}, file)
+    launcher = launcherAlpha2.GamingLauncher()
+    # The fake steam starts no game here; a session ends with the steam process itself
+    launcher.launch_supervisor.find_game = None
+    launcher.show()
+    common.wait_until(lambda: launcher.filter_model.rowCount() == len(games))
+    rows = {launcher.filter_model.index(row).data(launcherAlpha2.AppIdRole): row
+            for row in range(launcher.filter_model.rowCount())}
+
+    def click(app_id):
+        # One child at a time, so spawns don't compete with starting interpreters
+        common.wait_until(lambda: not launcher.launch_supervisor.running(), timeout=30)
+        index = launcher.filter_model.index(rows[app_id])
+        start = time.perf_counter()
+        launcher.launch_game(index)
+        return time.perf_counter() - start
+
+    # What the children got
+    for app_id in (tuned, plain, broken):
+        click(app_id)
+    tuned_record = read_record(os.path.join(records, str(tuned)))
+    plain_record = read_record(os.path.join(records, str(plain)))
+    broken_record = read_record(os.path.join(records, str(broken)))
+    with open(os.path.join(records, "wrapper")) as file:
+        wrapper_args = file.read().split()
+    parent_nice = os.nice(0)
+
+    checks = [
+        ("argv passes profile args", tuned_record["argv"][1:] == ["-applaunch", str(tuned), "-novid", "+fps_max", "144"]),
+        ("wrapper ran with its options", wrapper_args[0] == "--verbose" and os.path.basename(wrapper_args[1]) == "steam"),
+        ("nice applied", tuned_record["nice"] == min(parent_nice + 5, 19)),
+        ("affinity applied", tuned_record["affinity"] == cpus[:1]),
+        ("env override set", tuned_record["env"].get("DXVK_HUD") == "fps"),
+        ("null removes default env", "PROTON_LOG" not in tuned_record["env"]),
+        ("default env inherited", plain_record["env"].get("PROTON_LOG") == "1"),
+        ("LD_PRELOAD/GAME_MODE stripped", not {"LD_PRELOAD", "GAME_MODE"} & (tuned_record["env"].keys()
+                                                                            | plain_record["env"].keys())),
+        ("plain game untouched", plain_record["argv"][1:] == ["-applaunch", str(plain)]
+                                 and plain_record["affinity"] == cpus and plain_record["nice"] == parent_nice),
+        ("missing wrapper skipped", broken_record["argv"][1:] == ["-applaunch", str(broken)]),
+        ("launcher env unchanged", dict(os.environ) == parent_env),
+    ]
+
+    # A bad profile is reported instead of escaping the slot
+    errors = []
+    critical = launcherAlpha2.QtWidgets.QMessageBox.critical
+    launcherAlpha2.QtWidgets.QMessageBox.critical = lambda parent, title, text: errors.append(text)
+    try:
+        launcher.launch_game(launcher.filter_model.index(rows[invalid]))
+    finally:
+        launcherAlpha2.QtWidgets.QMessageBox.critical = critical
+    checks.append(("invalid profile reported", len(errors) == 1 and "Invalid launch profile" in errors[0]
+                                               and not launcher.launch_supervisor.running(invalid)))
+
+    # With a Steam client running, profiles that set more than args (here all of them) are warned about
+    home = os.environ["HOME"]
+    os.environ["HOME"] = tempfile.mkdtemp(prefix="fake-home-")
+    os.makedirs(os.path.join(os.environ["HOME"], ".steam"))
+    try:
+        no_client = launcher.core.launch_warning(tuned)
+        with open(os.path.join(os.environ["HOME"], ".steam", "steam.pid"), "w") as file:
+            file.write(str(os.getpid()))
+        client_tuned = launcher.core.launch_warning(tuned)
+    finally:
+        os.environ["HOME"] = home
+    checks.append(("warned while Steam runs", no_client is None and client_tuned is not None))
+    failed = [label for label, ok in checks if not ok]
+
+    # Click-to-spawn: first click per game resolves the profile, later clicks reuse it
+    first = [click(game["appid"]) for game in games[3:3 + args.clicks]]
+    repeat = [click(tuned) for _ in range(args.clicks)]
+    resolve_cold, resolve_cached = [], []
+    for game in games[:args.clicks]:
+        launcher.core.launch_profiles.invalidate()
+        start = time.perf_counter()
+        launcher.core.launch_profiles.resolve(game["appid"], steam_launch_command(game["appid"]))
+        resolve_cold.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        launcher.core.launch_profiles.resolve(game["appid"], steam_launch_command(game["appid"]))
+        resolve_cached.append(time.perf_counter() - start)
+
+    # Until the child process itself is running (includes the fake steam's interpreter start)
+    record = os.path.join(records, str(plain))
+    os.remove(record)
+    start = time.perf_counter()
+    click(plain)
+    read_record(record)
+    child_running = time.perf_counter() - start
+
+    legacy = []
+    for game in games[:args.clicks]:
+        common.wait_until(lambda: not launcher.launch_supervisor.running(), timeout=30)
+        start = time.perf_counter()
+        legacy_start(launcher.launch_supervisor, game["appid"])
+        legacy.append(time.perf_counter() - start)
+    common.wait_until(lambda: not launcher.launch_supervisor.running(), timeout=60)
+    launcher.close()
+
+    def ms(values):
+        return f"median {statistics.median(values) * 1000:.2f} ms, max {max(values) * 1000:.2f} ms"
+
+    common.report(f"launch profiles: {args.clicks} clicks through a fake steam", [
+        *[(label, "ok" if ok else "FAILED") for label, ok in checks],
+        ("click to spawn, first", ms(first)),
+        ("click to spawn, cached", ms(repeat)),
+        ("resolve, cold / cached", f"{statistics.median(resolve_cold) * 1e6:.0f} us / "
+                                   f"{statistics.median(resolve_cached) * 1e6:.1f} us"),
+        ("click to child running", f"{child_running * 1000:.1f} ms"),
+        ("old clean_environment + spawn", ms(legacy)),
+    ])
+    if failed:
+        raise SystemExit(f"failed: {', '.join(failed)}")
+
+if __name__ == "__main__":
+    main()
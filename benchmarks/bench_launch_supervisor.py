@@ -0,0 +1,104 @@
+import argparse
+import glob
+import json
+import os
+import subprocess
+import tempfile
+import time
+
+import common
+from fake_steam import install_fake_steam
+from stub_server import synthetic_games
+
+# Launches games through a fake "steam" on PATH that starts a three second "game",
+# writes --output-mb of output and exits with code 3. The old Popen(stdout=PIPE,
+# stderr=PIPE) without readers blocks once the pipe is full; through the supervisor
+# the process finishes, is reaped, its output lands in rotating logs and the session
+# lasts until the game is gone. A launch whose game never shows up is not recorded.
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--output-mb", type=float, default=8)
+    parser.add_argument("--parallel", type=int, default=20)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    install_fake_steam(tempfile.mkdtemp(prefix="fake-steam-"))
+    os.environ.update(FAKE_STEAM_OUTPUT=str(int(args.output_mb * 1024 * 1024)), FAKE_STEAM_SECONDS="0.3",
+                      FAKE_STEAM_EXIT="3", FAKE_STEAM_GAME_SECONDS="3")
+
+    # Previous start_game: pipes that nobody reads
+    process = subprocess.Popen(["steam", "-applaunch", "10"], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    try:
+        process.wait(timeout=3)
+        legacy = f"exited after {process.returncode}"
+    except subprocess.TimeoutExpired:
+        legacy = "still blocked on a full pipe after 3 s"
+        process.kill()
+        process.communicate()
+
+    common.qt_app()
+    import launcherAlpha2
+    from library_db import LibraryDB
+    games = synthetic_games(100)
+    LibraryDB().replace_games("76561198000000000", games)
+    with open(launcherAlpha2.CONFIG_FILE, "w") as file:
+        json.dump({"steam_api_key": "KEY", "steam_profile_id": "76561198000000000", "refresh_on_startup": False,
+                   "launch_log_kb": 1024}, file)
+    launcher = launcherAlpha2.GamingLauncher()
+    launcher.show()
+    common.wait_until(lambda: launcher.filter_model.rowCount() == len(games))
+
+    index = launcher.filter_model.index(0)
+    app_id = index.data(launcherAlpha2.AppIdRole)
+    start = time.perf_counter()
+    launcher.launch_game(index)
+    click_to_running = time.perf_counter() - start
+    shows_running = "(running)" in index.data()
+    session = launcher.launch_supervisor.running(app_id)[0]
+    common.wait_until(lambda: launcher.library_db.sessions(app_id), timeout=30)
+    exited = time.perf_counter() - start
+    record = launcher.library_db.sessions(app_id)[0]
+    logs = glob.glob(os.path.join(launcher.launch_supervisor.log_dir, f"{app_id}.log*"))
+    try:
+        os.waitpid(session.pid, os.WNOHANG)
+        reaped = False
+    except ChildProcessError:
+        reaped = True
+
+    # Many launches at once must all be reaped and recorded
+    start = time.perf_counter()
+    parallel_ids = [launcher.filter_model.index(row).data(launcherAlpha2.AppIdRole) for row in range(1, 1 + args.parallel)]
+    for row in range(1, 1 + args.parallel):
+        launcher.launch_game(launcher.filter_model.index(row))
+    def recorded():
+        return sum(len(launcher.library_db.sessions(appid)) for appid in parallel_ids)
+    common.wait_until(lambda: recorded() == args.parallel, timeout=60)
+    parallel = time.perf_counter() - start
+
+    # Steam took the launch but no game came up
+    del os.environ["FAKE_STEAM_GAME_SECONDS"]
+    launcher.launch_supervisor.game_start_timeout = 1
+    stub_index = launcher.filter_model.index(1 + args.parallel)
+    stub_game = stub_index.data(launcherAlpha2.AppIdRole)
+    launcher.launch_game(stub_index)
+    common.wait_until(lambda: not launcher.launch_supervisor.running(stub_game), timeout=30)
+    common.qt_app().processEvents()
+    stub_recorded = len(launcher.library_db.sessions(stub_game))
+    launcher.close()
+
+    common.report(f"launch supervisor: fake steam writing {args.output_mb:g} MB", [
+        ("unread pipes (old start_game)", legacy),
+        ("click to running", f"{click_to_running * 1000:.1f} ms, list shows running: {shows_running}"),
+        ("until exit recorded", f"{exited * 1000:.0f} ms, exit code {record['exit_code']}, "
+                                f"duration {record['ended'] - record['started']:.2f} s, reaped: {reaped}, "
+                                f"game pid found: {session.game_pid is not None}"),
+        ("log files", f"{len(logs)}, {sum(os.path.getsize(path) for path in logs) / 1e6:.1f} MB on disk"),
+        (f"{args.parallel} parallel launches", f"{parallel * 1000:.0f} ms, {recorded()} sessions recorded, "
+                                               f"still running: {len(launcher.launch_supervisor.running())}"),
+        ("no game showed up", f"{stub_recorded} sessions recorded"),
+    ])
+    if not session.played or stub_recorded:
+        raise SystemExit("failed: sessions must follow the game, not the steam command")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import random
+import statistics
+import time
+
+import common
+from stub_server import synthetic_games
+
+CATEGORIES = ["all", "recent", "installed", "favorites"]
+SEARCHES = ["", "k", "hollow", "counter strike 4"]
+SORTS = ["appid", "name", "playtime", "last_played"]
+
+SORT_KEYS = {
+    "appid": lambda game: game["appid"],
+    "name": lambda game: (game["name"].lower(), game["appid"]),
+    "playtime": lambda game: (-game["playtime_forever"], game["appid"]),
+    "last_played": lambda game: (-game["rtime_last_played"], game["appid"]),
+}
+
+# The previous filter_games: list scans over the raw dicts, plus a sort
+def linear(games, favorites, installed, category, search, sort):
+    search = search.lower()
+    found = [game for game in games if search in game["name"].lower()]
+    if category == "recent":
+        found = [game for game in found if game.get("playtime_2weeks", 0) > 0]
+    elif category == "installed":
+        found = [game for game in found if game["appid"] in installed]
+    elif category == "favorites":
+        found = [game for game in found if game["appid"] in favorites]
+    return [game["appid"] for game in sorted(found, key=SORT_KEYS[sort])]
+
+# Every category x search x sort combination against a --games library in the
+# on-disk LibraryDB, compared with list scans over the dicts. Also prints the
+# query plans, which should only show index lookups.
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    from library_db import LibraryDB
+
+    rng = random.Random(1)
+    games = synthetic_games(args.games)
+    favorites = {game["appid"] for game in games if rng.random() < 0.02}
+    installed = {game["appid"]: 1 << 30 for game in games if rng.random() < 0.1}
+
+    db = LibraryDB()
+    start = time.perf_counter()
+    db.replace_games("76561198000000000", games)
+    db.set_favorites(favorites)
+    db.set_installed(installed)
+    write_time = time.perf_counter() - start
+
+    rows = [("write library + flags", f"{write_time * 1000:.0f} ms")]
+    worst = {"LibraryDB.query": 0.0, "list scans": 0.0}
+    for category in CATEGORIES:
+        db_times, linear_times = [], []
+        for search in SEARCHES:
+            for sort in SORTS:
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    found = db.query(category, search, sort)
+                    db_times.append(time.perf_counter() - start)
+                    start = time.perf_counter()
+                    expected = linear(games, favorites, installed, category, search, sort)
+                    linear_times.append(time.perf_counter() - start)
+                # Names differ only in case/accents handling, so compare as sets for "name"
+                assert (set(found) == set(expected)) if sort == "name" else found == expected, (category, search, sort)
+        worst["LibraryDB.query"] = max(worst["LibraryDB.query"], max(db_times))
+        worst["list scans"] = max(worst["list scans"], max(linear_times))
+        rows.append((f"{category}: db / scan", f"median {statistics.median(db_times) * 1000:6.2f} ms"
+                                                f" / {statistics.median(linear_times) * 1000:6.2f} ms"))
+    rows += [(f"worst {name}", f"{value * 1000:.2f} ms") for name, value in worst.items()]
+    common.report(f"library db: {args.games} games, {len(SEARCHES) * len(SORTS)} queries per category", rows)
+
+    print("query plans:")
+    for category, search, sort in [("recent", "", "appid"), ("installed", "", "name"),
+                                   ("favorites", "hollow", "name"), ("all", "hollow", "playtime")]:
+        sql, params = db.build_query(category, search, sort)
+        plan = [row[3] for row in db.conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+        print(f"  {category}/{search or '-'}/{sort}: " + "; ".join(plan))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import statistics
+import time
+
+import common
+from bench_filter_model import QUERIES
+from stub_server import synthetic_games
+
+# Cost of the perf instrumentation and a check of what it reports: disabled spans
+# and traced calls against a bare call, keystroke latency with tracing off and on,
+# a stall caused on the GUI thread that the overlay must attribute to the right
+# span, and a Chrome trace export that has to load as JSON.
+CALLS = 200000
+
+def per_call_ns(function, calls=CALLS):
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1e9
+
+def keystrokes(launcher, repeat):
+    latencies = []
+    for _ in range(repeat):
+        for query in QUERIES:
+            start = time.perf_counter()
+            common.set_search_text(launcher, query)
+            common.paint_view(launcher.game_list)
+            latencies.append((time.perf_counter() - start) * 1000)
+    common.set_search_text(launcher, "")
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    app = common.qt_app()
+    import perf
+
+    def bare():
+        return None
+
+    traced = perf.traced("bench", "bench")(bare)
+
+    def with_span():
+        with perf.span("bench", "bench"):
+            return None
+
+    rows = [("bare call", f"{per_call_ns(bare):7.0f} ns")]
+    rows.append(("traced call (disabled)", f"{per_call_ns(traced):7.0f} ns"))
+    rows.append(("span (disabled)", f"{per_call_ns(with_span):7.0f} ns"))
+    perf.enable()
+    rows.append(("traced call (enabled)", f"{per_call_ns(traced):7.0f} ns"))
+    rows.append(("span (enabled)", f"{per_call_ns(with_span):7.0f} ns"))
+    perf.disable()
+    perf.tracer.clear()
+
+    import launcherAlpha2
+    games = [dict(game, img_icon_url="") for game in synthetic_games(args.games)]
+    launcher = launcherAlpha2.GamingLauncher()
+    launcher.show()
+    launcher.show_library(games)
+    app.processEvents()
+
+    off = keystrokes(launcher, args.repeat)
+    launcher.perf_overlay_action.setChecked(True)
+    on = keystrokes(launcher, args.repeat)
+    rows.append(("keystroke, tracing off", f"median {statistics.median(off):7.2f} ms  max {max(off):7.2f} ms"))
+    rows.append(("keystroke, tracing on", f"median {statistics.median(on):7.2f} ms  max {max(on):7.2f} ms"))
+    names = {event[0] for event in perf.tracer.events}
+    checks = [("filter_games and update_game_list traced", {"filter_games", "update_game_list"} <= names)]
+
+    # Block the event loop with a full library load and let the stall monitor catch it
+    def run_event_loop(seconds):
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            app.processEvents()
+
+    run_event_loop(0.1)
+    perf.tracer.clear()
+    launcher.show_library(games)
+    run_event_loop(0.2)
+    stalls = [event for event in perf.tracer.events if event[1] == "stall"]
+    launcher.perf_overlay.refresh()
+    summary = launcher.perf_overlay.text()
+    stall_line = next((line for line in summary.splitlines() if line.startswith("last stall")), "")
+    checks.append(("stall detected", bool(stalls)))
+    checks.append(("stall attributed to show_library", "show_library" in stall_line))
+    rows.append(("stall", stall_line or "none"))
+
+    path = os.path.abspath("launcher-trace.json")
+    perf.export_chrome_trace(path)
+    with open(path) as file:
+        trace = json.load(file)
+    spans = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    checks.append(("trace export loads", bool(spans) and all("ts" in event and "dur" in event for event in spans)))
+    rows.append(("trace", f"{len(spans)} spans, {os.path.getsize(path) / 1024:.0f} KiB"))
+
+    launcher.perf_overlay_action.setChecked(False)
+    checks.append(("overlay off disables tracing", not perf.enabled()))
+    launcher.close()
+
+    rows += [(label, "OK" if ok else "NO") for label, ok in checks]
+    common.report(f"perf instrumentation: {args.games} games, {len(QUERIES) * args.repeat} keystrokes", rows)
+    if not all(ok for _, ok in checks):
+        raise SystemExit("perf instrumentation check failed")
+
+if __name__ == "__main__":
+    main()
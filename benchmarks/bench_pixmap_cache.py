@@ -0,0 +1,62 @@
+import argparse
+import statistics
+import time
+
+import common
+from stub_server import synthetic_games
+
+# Keystroke-to-repaint latency of the search bar with and without the decoded
+# icon cache surviving between keystrokes. All images are already in the on-disk
+# cache, so the difference is purely JPEG decoding and scaling.
+QUERY = "counter strike"
+
+def repaint(launcher):
+    common.paint_view(launcher.game_list)
+
+def type_query(launcher, keep_cache):
+    latencies = []
+    for i in range(1, len(QUERY) + 1):
+        if not keep_cache:
+            launcher.pixmap_cache.clear()
+        start = time.perf_counter()
+        common.set_search_text(launcher, QUERY[:i])
+        repaint(launcher)
+        # Wait until every icon requested by this repaint has been decoded, then paint again
+        common.wait_until(lambda: not launcher.icon_loader.pending, timeout=60)
+        common.qt_app().processEvents()
+        repaint(launcher)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=2000)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    common.qt_app()
+    import launcherAlpha2
+    from steam_api import icon_url
+
+    games = synthetic_games(args.games)
+    jpeg = common.sample_jpeg(184, 69)
+    rows = []
+    for label, keep_cache in [("without pixmap cache", False), ("with pixmap cache", True)]:
+        launcher = launcherAlpha2.GamingLauncher()
+        for game in games:
+            launcher.image_cache.store(icon_url(game["appid"], game["img_icon_url"]), jpeg)
+        launcher.show()
+        launcher.show_library(games)
+        # Warm-up: decode every icon once
+        for game in games:
+            launcher.game_icon(game)
+        common.wait_until(lambda: not launcher.icon_loader.pending, timeout=120)
+        common.qt_app().processEvents()
+        latencies = type_query(launcher, keep_cache)
+        launcher.close()
+        rows.append((label, f"median {statistics.median(latencies) * 1000:7.1f} ms  "
+                            f"max {max(latencies) * 1000:7.1f} ms  hits={launcher.pixmap_cache.hits}"))
+    common.report(f"keystroke to repaint: {args.games} games, query {QUERY!r}", rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import json
+import time
+
+import common
+from stub_server import StubSteamServer, synthetic_games
+
+# refresh_library against a stub GetOwnedGames with injected latency and failures.
+# Reports the longest GUI-thread stall while the worker runs, the attempts it
+# took, and how quickly the UI returns after the refresh is cancelled. Exits
+# non-zero unless the refresh gets through the failures by retrying and the
+# cancelled refresh leaves the worker idle.
+def run_refresh(launcher, cancel_after=None):
+    gaps = []
+    last = [time.perf_counter()]
+    def beat():
+        now = time.perf_counter()
+        gaps.append(now - last[0])
+        last[0] = now
+    from PyQt5 import QtCore
+    heartbeat = QtCore.QTimer()
+    heartbeat.timeout.connect(beat)
+    heartbeat.start(1)
+    start = time.perf_counter()
+    launcher.refresh_library()
+    if cancel_after is not None:
+        common.wait_until(lambda: False, timeout=cancel_after)
+        launcher.refresh_library()
+    idle = common.wait_until(lambda: launcher.refresh_worker is None, timeout=120)
+    elapsed = time.perf_counter() - start
+    heartbeat.stop()
+    return idle, elapsed, max(gaps) if gaps else 0.0
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=5000)
+    parser.add_argument("--delay", type=float, default=0.3)
+    parser.add_argument("--failure-rate", type=float, default=0.5)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    common.qt_app()
+    import launcherAlpha2
+    import steam_api
+
+    games = synthetic_games(args.games)
+    with open(launcherAlpha2.CONFIG_FILE, "w") as file:
+        json.dump({"steam_api_key": "KEY", "steam_profile_id": "1", "refresh_on_startup": False,
+                   "api_retries": 5, "api_timeout": [2, 5]}, file)
+    server = StubSteamServer(games=games, delay=args.delay, failure_rate=args.failure_rate, seed=3).start()
+    steam_api.OWNED_GAMES_URL = server.base_url + "/IPlayerService/GetOwnedGames/v1/"
+
+    launcher = launcherAlpha2.GamingLauncher()
+    launcher.show()
+    rows = []
+    idle, elapsed, stall = run_refresh(launcher)
+    attempts = server.requests
+    refreshed = launcher.game_model.rowCount()
+    rows.append(("refresh with failures", f"{elapsed * 1000:.0f} ms, {attempts} attempts, "
+                                          f"{refreshed} games, longest stall {stall * 1000:.1f} ms"))
+    checks = [
+        ("refresh done within 120 s", idle),
+        ("refresh succeeded", refreshed == len(games)),
+        ("failures retried", attempts > 1 or args.failure_rate == 0),
+    ]
+
+    server.failure_rate = 0.0
+    server.delay = 5.0
+    idle, elapsed, stall = run_refresh(launcher, cancel_after=0.1)
+    rows.append(("cancel during slow response", f"UI idle again after {elapsed * 1000:.0f} ms, "
+                                                f"longest stall {stall * 1000:.1f} ms"))
+    # Idle well before the slow response would have arrived
+    checks.append(("cancel returns to idle", idle and elapsed < server.delay))
+    launcher.close()
+    server.stop()
+    common.report(f"refresh worker: {args.games} games, {args.delay * 1000:.0f} ms latency", rows)
+    failed = [label for label, ok in checks if not ok]
+    if failed:
+        raise SystemExit(f"failed: {', '.join(failed)}")
+
+if __name__ == "__main__":
+    main()
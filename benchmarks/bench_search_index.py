@@ -0,0 +1,52 @@
+import argparse
+import statistics
+import time
+
+import common
+from stub_server import synthetic_games
+
+# Per-keystroke search cost of the prebuilt trigram index against the previous
+# list comprehension that lowercased every name on every keystroke.
+QUERIES = ["c", "co", "cou", "coun", "count", "counte", "counter", "counter s", "counter st",
+           "counter str", "counter stri", "counter strik", "counter strike", "hollow knight", "valley 4"]
+
+def linear(games, query):
+    query = query.lower()
+    return [game for game in games if query in game.get("name", "").lower()]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    args = parser.parse_args()
+    from search_index import SearchIndex
+
+    rows = []
+    for size in args.sizes:
+        games = synthetic_games(size)
+        start = time.perf_counter()
+        index = SearchIndex([game["name"] for game in games])
+        build = time.perf_counter() - start
+
+        timings = {"list comprehension": [], "trigram index": []}
+        for query in QUERIES:
+            start = time.perf_counter()
+            expected = linear(games, query)
+            timings["list comprehension"].append(time.perf_counter() - start)
+            start = time.perf_counter()
+            found = index.search(query)
+            timings["trigram index"].append(time.perf_counter() - start)
+            assert len(found) == len(expected), query
+
+        start = time.perf_counter()
+        fuzzy = index.fuzzy_search("conter strke")
+        fuzzy_time = time.perf_counter() - start
+
+        rows.append((f"{size} titles: index build", f"{build * 1000:9.2f} ms"))
+        for label, values in timings.items():
+            rows.append((f"{size} titles: {label}", f"{statistics.mean(values) * 1000:9.3f} ms/keystroke  "
+                                                    f"max {max(values) * 1000:8.3f} ms"))
+        rows.append((f"{size} titles: fuzzy fallback", f"{fuzzy_time * 1000:9.3f} ms ({len(fuzzy)} results)"))
+    common.report("search", rows)
+
+if __name__ == "__main__":
+    main()
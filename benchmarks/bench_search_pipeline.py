@@ -0,0 +1,57 @@
+import argparse
+import statistics
+import time
+
+import common
+from stub_server import synthetic_games
+
+# Types a query into the search bar at a fixed speed and reports how many searches
+# actually ran, the per-query timings of the pipeline and the longest stall of the
+# GUI thread, measured with a 1 ms heartbeat timer.
+QUERY = "counter strike"
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--interval", type=float, default=0.04, help="seconds between keystrokes")
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    common.qt_app()
+    from PyQt5 import QtCore
+    import launcherAlpha2
+
+    launcher = launcherAlpha2.GamingLauncher()
+    launcher.show()
+    launcher.show_library([dict(game, img_icon_url="") for game in synthetic_games(args.games)])
+    common.wait_until(lambda: False, timeout=0.2)
+
+    gaps = []
+    last = [time.perf_counter()]
+    def beat():
+        now = time.perf_counter()
+        gaps.append(now - last[0])
+        last[0] = now
+    heartbeat = QtCore.QTimer()
+    heartbeat.timeout.connect(beat)
+    heartbeat.start(1)
+
+    for i in range(1, len(QUERY) + 1):
+        launcher.search_bar.setText(QUERY[:i])
+        common.wait_until(lambda: False, timeout=args.interval)
+    common.wait_until(lambda: launcher.search_pipeline.timings and
+                      launcher.search_pipeline.timings[-1]["query"] == QUERY, timeout=10)
+    heartbeat.stop()
+
+    timings = list(launcher.search_pipeline.timings)
+    launcher.close()
+    rows = [("keystrokes", len(QUERY)), ("searches applied", len(timings))]
+    for key in ["debounce_ms", "queue_ms", "match_ms", "apply_ms", "total_ms"]:
+        values = [timing[key] for timing in timings]
+        rows.append((key, f"median {statistics.median(values):8.2f}  max {max(values):8.2f}"))
+    rows.append(("longest GUI stall", f"{max(gaps) * 1000:.2f} ms"))
+    rows.append(("results", launcher.filter_model.rowCount()))
+    common.report(f"search pipeline: {args.games} games, {args.interval * 1000:.0f} ms per keystroke", rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+import common
+from stub_server import synthetic_games
+
+LINE = re.compile(r"^\s+(.+?)\s+([\d.]+) ms\s+\(total\s+([\d.]+) ms\)")
+
+# Cold start of each launcher with --profile-startup, run in fresh processes.
+# Reports the median time per stage (dependency check, imports, window, first
+# paint, library shown) and checks that requests is not imported at startup.
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    from library_db import LibraryDB
+    import launcherAlpha2
+
+    # Alpha2 shows a snapshot of --games games; the refresh is skipped while profiling
+    LibraryDB().replace_games("76561198000000000", synthetic_games(args.games))
+    with open(launcherAlpha2.CONFIG_FILE, "w") as file:
+        json.dump({"steam_api_key": "KEY", "steam_profile_id": "76561198000000000"}, file)
+
+    for script in ("launcherAlpha1.py", "launcherAlpha2.py"):
+        stages = {}
+        for _ in range(args.runs):
+            output = subprocess.run([sys.executable, os.path.join(common.REPO_ROOT, script), "--profile-startup"],
+                                    capture_output=True, text=True, timeout=60).stdout
+            for line in output.splitlines():
+                match = LINE.match(line)
+                if match:
+                    stages.setdefault(match.group(1), []).append((float(match.group(2)), float(match.group(3))))
+        common.report(f"{script}: median of {args.runs} runs", [
+            (label, f"{statistics.median(s for s, _ in values):7.1f} ms   (total {statistics.median(t for _, t in values):7.1f} ms)")
+            for label, values in stages.items()])
+
+    probe = "import sys; sys.argv = ['x']; import {}; print('requests' in sys.modules)"
+    common.report("requests imported at startup", [
+        (script, subprocess.run([sys.executable, "-c", probe.format(script[:-3])], cwd=common.REPO_ROOT,
+                                capture_output=True, text=True).stdout.strip())
+        for script in ("launcherAlpha1.py", "launcherAlpha2.py")])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import time
+
+import common
+from stub_server import StubSteamServer
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "GetOwnedGames.json")
+
+# Games of the recorded GetOwnedGames response (include_appinfo=1), repeated under
+# new appids until there are count of them
+def fixture_games(count):
+    with open(FIXTURE) as file:
+        recorded = json.load(file)["response"]["games"]
+    games = []
+    while len(games) < count:
+        offset = len(games) // len(recorded) * 10000000
+        games += [dict(game, appid=game["appid"] + offset) for game in recorded[:count - len(games)]]
+    return sorted(games, key=lambda game: game["appid"])
+
+# Startup from the local library snapshot of a recorded GetOwnedGames response:
+# the list must show the cached games without a single HTTP request. A refresh
+# against the same response with a few games added, removed and renamed must
+# apply just that delta. Exits non-zero if any check fails.
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=10000)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    common.qt_app()
+    import requests
+    import launcherAlpha2
+    import steam_api
+    from library_db import LibraryDB
+
+    requests_made = []
+    original_send = requests.Session.send
+    def counting_send(session, request, **kwargs):
+        requests_made.append(request.url)
+        return original_send(session, request, **kwargs)
+    requests.Session.send = counting_send
+
+    # No icon URLs, so only the library itself could cause requests
+    games = [dict(game, img_icon_url="") for game in fixture_games(args.games)]
+    LibraryDB().replace_games("76561198000000000", games)
+    config = {"steam_api_key": "KEY", "steam_profile_id": "76561198000000000", "refresh_on_startup": False}
+    with open(launcherAlpha2.CONFIG_FILE, "w") as file:
+        json.dump(config, file)
+
+    start = time.perf_counter()
+    launcher = launcherAlpha2.GamingLauncher()
+    launcher.show()
+    shown_in_time = common.wait_until(lambda: launcher.filter_model.rowCount() > 0, timeout=30)
+    common.paint_view(launcher.game_list)
+    shown = time.perf_counter() - start
+    offline_requests = len(requests_made)
+    rows_shown = launcher.game_model.rowCount()
+
+    # Refresh against a response with 10 games removed, 10 renamed and 10 added
+    fresh = games[10:]
+    fresh[:10] = [dict(game, name=game["name"] + " GOTY") for game in fresh[:10]]
+    fresh += [dict(game, appid=game["appid"] + 5) for game in games[:10]]
+    server = StubSteamServer(games=fresh).start()
+    steam_api.OWNED_GAMES_URL = server.base_url + "/IPlayerService/GetOwnedGames/v1/"
+    resets = []
+    launcher.game_model.modelReset.connect(lambda: resets.append(1))
+    start = time.perf_counter()
+    launcher.refresh_library()
+    refreshed_in_time = common.wait_until(lambda: launcher.refresh_worker is None, timeout=30)
+    refreshed = time.perf_counter() - start
+    server.stop()
+    names = {game.get("appid"): game.get("name") for game in launcher.game_model.games}
+    launcher.close()
+
+    common.report(f"startup from snapshot: {args.games} games", [
+        ("time to list shown", f"{shown * 1000:.1f} ms"),
+        ("rows shown", rows_shown),
+        ("http requests before refresh", offline_requests),
+        ("delta refresh", f"{refreshed * 1000:.1f} ms"),
+        ("model resets during refresh", len(resets)),
+        ("rows after refresh", len(names)),
+    ])
+    checks = [
+        ("list shown within 30 s", shown_in_time),
+        ("no requests at startup", offline_requests == 0),
+        ("all cached games shown", rows_shown == len(games)),
+        ("refresh done within 30 s", refreshed_in_time),
+        ("rows after the delta", len(names) == len(fresh)),
+        ("delta applied", all(names.get(game["appid"]) == game["name"] for game in fresh)),
+        ("a single model reset", len(resets) <= 1),
+    ]
+    failed = [label for label, ok in checks if not ok]
+    if failed:
+        raise SystemExit(f"failed: {', '.join(failed)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import common
+from steam_fixture import make_steam_tree, write_manifest
+
+def timed(function, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+# Scans a fixture Steam tree with --manifests appmanifest files spread over three
+# library folders: a full scan with a fresh scanner, an incremental rescan with
+# nothing changed, and one after a few manifests were rewritten, added and removed.
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--manifests", type=int, default=5000)
+    parser.add_argument("--changed", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    from steam_local import SteamLibraryScanner
+
+    root, expected = make_steam_tree(tempfile.mkdtemp(prefix="steam-"), args.manifests)
+
+    installed, full = timed(lambda: SteamLibraryScanner([root]).scan(), args.repeat)
+    assert {appid: info["size_on_disk"] for appid, info in installed.items()} == expected
+
+    scanner = SteamLibraryScanner([root])
+    scanner.scan()
+    _, unchanged = timed(scanner.scan, args.repeat)
+    unchanged_stats = dict(scanner.last_scan)
+
+    # Rewrite some manifests with a new size, add new ones and remove one
+    steamapps = os.path.join(root, "steamapps")
+    for appid in list(expected)[:args.changed]:
+        path = os.path.join(root, "steamapps", f"appmanifest_{appid}.acf")
+        if os.path.exists(path):
+            expected[appid] += 1
+            write_manifest(steamapps, appid, f"Game {appid}", expected[appid], last_updated=1800000000)
+    for appid in range(1, 1 + args.changed):
+        expected[appid] = 1000 + appid
+        write_manifest(steamapps, appid, f"New {appid}", expected[appid])
+    removed = next(appid for appid in expected if os.path.exists(os.path.join(steamapps, f"appmanifest_{appid}.acf")))
+    os.remove(os.path.join(steamapps, f"appmanifest_{removed}.acf"))
+    del expected[removed]
+    start = time.perf_counter()
+    installed = scanner.scan()
+    changed = time.perf_counter() - start
+    assert {appid: info["size_on_disk"] for appid, info in installed.items()} == expected
+
+    common.report(f"steam install scan: {args.manifests} manifests in 3 library folders", [
+        ("full scan (fresh scanner)", f"{full * 1000:.1f} ms"),
+        ("rescan, nothing changed", f"{unchanged * 1000:.1f} ms  {unchanged_stats}"),
+        ("rescan after changes", f"{changed * 1000:.1f} ms  {scanner.last_scan}"),
+        ("installed games", len(installed)),
+    ])
+
+if __name__ == "__main__":
+    main()
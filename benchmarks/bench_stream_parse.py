@@ -0,0 +1,120 @@
+import argparse
+import json
+import time
+import tracemalloc
+
+import common
+from stub_server import StubSteamServer, synthetic_games
+
+# GetOwnedGames for a --games library served at --mbit, with the fields the real API
+# sends besides the ones the launcher keeps. The previous path (whole body, one
+# json.loads, a dict per game) is compared with fetch_owned_games streaming Game
+# records: time to the first parsed game and to the whole library, and with
+# tracemalloc the peak and the memory still held by the library afterwards.
+# Finally the time until launcherAlpha2 shows its first row on a first refresh.
+def api_entries(count):
+    games = synthetic_games(count)
+    for game in games:
+        playtime = game["playtime_forever"]
+        game.update({
+            "img_logo_url": game["img_icon_url"],
+            "playtime_windows_forever": playtime,
+            "playtime_mac_forever": 0,
+            "playtime_linux_forever": 0,
+            "playtime_deck_forever": 0,
+            "rtime_last_played": game["rtime_last_played"],
+            "playtime_disconnected": 0,
+            "content_descriptorids": [2, 5],
+            "has_leaderboards": True,
+        })
+    return games
+
+def fetch_whole_body(url, session):
+    # What fetch_owned_games did before: read everything, then decode it in one go
+    start = time.perf_counter()
+    response = session.get(url, params={"key": "KEY", "steamid": "1", "include_appinfo": "true"}, stream=True)
+    body = b"".join(response.iter_content(chunk_size=64 * 1024))
+    games = json.loads(body).get("response", {}).get("games", [])
+    elapsed = time.perf_counter() - start
+    return games, elapsed, elapsed
+
+def fetch_streaming(url, session):
+    import steam_api
+    first = []
+    start = time.perf_counter()
+    games = steam_api.fetch_owned_games("KEY", "1", session=session,
+                                        on_games=lambda batch: first or first.append(time.perf_counter()))
+    return games, first[0] - start, time.perf_counter() - start
+
+def measure(fetch, url, session):
+    games, first, total = fetch(url, session)
+    del games
+    tracemalloc.start()
+    games, _, _ = fetch(url, session)
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return games, first, total, held, peak
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=100000)
+    parser.add_argument("--mbit", type=float, default=100.0, help="connection speed of the stub server")
+    parser.add_argument("--skip-gui", action="store_true")
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    import http_client
+    import steam_api
+
+    entries = api_entries(args.games)
+    server = StubSteamServer(entries, bandwidth=args.mbit * 1e6 / 8, cache_json=True).start()
+    steam_api.OWNED_GAMES_URL = server.base_url + "/IPlayerService/GetOwnedGames/v1/"
+    session = http_client.HttpClient()
+    # Warm up the stub's encoded body so its work stays out of every measurement
+    steam_api.fetch_owned_games("KEY", "1", session=session)
+    body_mb = len(server.json_bodies["1"]) / 2 ** 20
+    rows = []
+    checks = []
+    results = {}
+    for label, fetch in [("whole body, dicts", fetch_whole_body), ("streaming, Game records", fetch_streaming)]:
+        games, first, total, held, peak = measure(fetch, steam_api.OWNED_GAMES_URL, session)
+        results[label] = (games, first, total, held, peak)
+        rows.append((label, f"first game {first * 1000:7.0f} ms  all {total * 1000:7.0f} ms  "
+                            f"held {held / 2 ** 20:6.1f} MiB  peak {peak / 2 ** 20:6.1f} MiB"))
+    old, new = results["whole body, dicts"], results["streaming, Game records"]
+    checks.append(("same games", len(old[0]) == len(new[0]) == args.games
+                   and all(game == {field: entry[field] for field in game.keys()} for game, entry in zip(new[0], old[0]))))
+    checks.append(("first game within 10% of the download", new[1] < old[2] * 0.1))
+    checks.append(("library held in half the memory", new[3] < old[3] * 0.5))
+    checks.append(("lower peak", new[4] < old[4]))
+    del results, old, new
+
+    if not args.skip_gui:
+        app = common.qt_app()
+        import launcherAlpha2
+        with open(launcherAlpha2.CONFIG_FILE, "w") as file:
+            json.dump({"steam_api_key": "KEY", "steam_profile_id": "1", "refresh_on_startup": False}, file)
+        launcher = launcherAlpha2.GamingLauncher()
+        launcher.show()
+        app.processEvents()
+        start = time.perf_counter()
+        launcher.refresh_library()
+        common.wait_until(lambda: launcher.filter_model.rowCount() > 0, timeout=120)
+        common.paint_view(launcher.game_list)
+        first_row = time.perf_counter() - start
+        common.wait_until(lambda: launcher.refresh_worker is None, timeout=120)
+        done = time.perf_counter() - start
+        rows.append(("launcherAlpha2, first refresh", f"first row painted {first_row * 1000:7.0f} ms  "
+                                                      f"library applied {done * 1000:7.0f} ms"))
+        checks.append(("all rows after the refresh", launcher.game_model.rowCount() == args.games
+                       and launcher.filter_model.rowCount() == args.games))
+        launcher.close()
+
+    server.stop()
+    rows += [(label, "OK" if ok else "NO") for label, ok in checks]
+    common.report(f"streaming parse: {args.games} games, {body_mb:.1f} MiB body at {args.mbit:.0f} Mbit/s", rows)
+    if not all(ok for _, ok in checks):
+        raise SystemExit("streaming parse check failed")
+
+if __name__ == "__main__":
+    main()
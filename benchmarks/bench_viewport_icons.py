@@ -0,0 +1,58 @@
+import argparse
+import time
+
+import common
+from stub_server import StubSteamServer, synthetic_games
+
+# Cold start of a large library with viewport-driven icon loading: shows the first
+# page, flicks through the list and settles at the middle. Reports icons fetched
+# from the stub CDN against rows actually rendered, and downloads cancelled
+# because their rows scrolled away.
+def settle(launcher, timeout=30):
+    common.wait_until(lambda: False, timeout=0.05)
+    common.wait_until(lambda: not launcher.icon_loader.pending, timeout=timeout)
+    common.qt_app().processEvents()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    common.isolated_workdir()
+    common.qt_app()
+    import launcherAlpha2
+    import steam_api
+
+    server = StubSteamServer(image_bytes=common.sample_jpeg(), delay=args.delay).start()
+    steam_api.ICON_BASE_URL = server.base_url + "/steamcommunity/public/images/apps"
+
+    launcher = launcherAlpha2.GamingLauncher()
+    launcher.show()
+    start = time.perf_counter()
+    launcher.show_library(synthetic_games(args.games))
+    common.paint_view(launcher.game_list)
+    settle(launcher)
+    first_page = time.perf_counter() - start
+
+    scrollbar = launcher.game_list.verticalScrollBar()
+    for step in range(1, 21):
+        scrollbar.setValue(scrollbar.maximum() * step // 20)
+        common.wait_until(lambda: False, timeout=0.01)
+    scrollbar.setValue(scrollbar.maximum() // 2)
+    settle(launcher)
+
+    stats = launcher.icon_stats()
+    launcher.close()
+    server.stop()
+    common.report(f"viewport icon loading: {args.games} games", [
+        ("first page with icons", f"{first_page * 1000:.1f} ms"),
+        ("rows rendered", stats["rows_rendered"]),
+        ("icons requested", stats["requested"]),
+        ("icons fetched from CDN", server.requests),
+        ("downloads cancelled", stats["cancelled"]),
+        ("share of library fetched", f"{server.requests / args.games:.1%}"),
+    ])
+
+if __name__ == "__main__":
+    main()
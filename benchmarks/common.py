@@ -0,0 +1,70 @@
+import os
+import sys
+import tempfile
+import time
+
+# Shared setup for the benchmark scripts: make the launcher modules importable,
+# run Qt offscreen and keep config/cache files out of the working tree.
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+_app = None
+
+def qt_app():
+    global _app
+    from PyQt5 import QtWidgets
+    if _app is None:
+        _app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    return _app
+
+# Switch into a throw-away directory so launcher_config.json and caches don't leak
+def isolated_workdir():
+    path = tempfile.mkdtemp(prefix="gaminglauncher-bench-")
+    os.chdir(path)
+    os.environ["XDG_CACHE_HOME"] = os.path.join(path, "xdg-cache")
+    os.environ["XDG_DATA_HOME"] = os.path.join(path, "xdg-data")
+    return path
+
+# Encode a small JPEG the stub CDN can serve
+def sample_jpeg(width=32, height=32):
+    from PyQt5 import QtCore, QtGui
+    qt_app()
+    image = QtGui.QImage(width, height, QtGui.QImage.Format_RGB32)
+    image.fill(QtGui.QColor(30, 120, 200))
+    buffer = QtCore.QBuffer()
+    buffer.open(QtCore.QIODevice.WriteOnly)
+    image.save(buffer, "JPG")
+    return bytes(buffer.data())
+
+# Spin the Qt event loop until condition() holds or the timeout expires
+def wait_until(condition, timeout=60.0):
+    app = qt_app()
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            return False
+        app.processEvents()
+        time.sleep(0.001)
+    return True
+
+def report(title, rows):
+    print(title)
+    for label, value in rows:
+        print(f"  {label:<32} {value}")
+
+# Lay out and paint an item view right now, waiting for the first layout batch
+def paint_view(view):
+    from PyQt5 import QtCore
+    view.doItemsLayout()
+    wait_until(lambda: view.model().rowCount() == 0 or view.indexAt(QtCore.QPoint(1, 1)).isValid(), timeout=5)
+    view.viewport().repaint()
+
+# Put text into the launcher's search bar and filter synchronously, bypassing the debounce
+def set_search_text(launcher, text):
+    launcher.search_bar.blockSignals(True)
+    launcher.search_bar.setText(text)
+    launcher.search_bar.blockSignals(False)
+    launcher.filter_games()
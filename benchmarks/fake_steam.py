@@ -0,0 +1,59 @@
+import os
+import stat
+import sys
+
+# Stand-in for the steam binary. It records how it was started to
+# $FAKE_STEAM_RECORD (JSON), writes $FAKE_STEAM_OUTPUT bytes to stdout and stderr,
+# sleeps $FAKE_STEAM_SECONDS and exits with $FAKE_STEAM_EXIT. With
+# $FAKE_STEAM_GAME_SECONDS it first starts a "game" for -applaunch <appid> that
+# runs that long on its own, under a command line like Steam's reaper.
+SCRIPT = r'''#!{python}
+import json, os, subprocess, sys, time
+record = os.environ.get("FAKE_STEAM_RECORD")
+if record:
+    info = {{"argv": sys.argv, "env": dict(os.environ), "cwd": os.getcwd(), "pid": os.getpid(),
+            "nice": os.nice(0) if hasattr(os, "nice") else None,
+            "affinity": sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None}}
+    with open(record + ".tmp", "w") as file:
+        json.dump(info, file)
+    os.replace(record + ".tmp", record)
+game_seconds = os.environ.get("FAKE_STEAM_GAME_SECONDS")
+if game_seconds and "-applaunch" in sys.argv:
+    appid = sys.argv[sys.argv.index("-applaunch") + 1]
+    subprocess.Popen([sys.executable, "-c", "import sys, time; time.sleep(float(sys.argv[1]))", game_seconds,
+                      "SteamLaunch", "AppId=" + appid, "--"],
+                     stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     start_new_session=True)
+remaining = int(os.environ.get("FAKE_STEAM_OUTPUT", "0"))
+line = b"fake steam: lots of output to fill the pipe buffer\n" * 64
+while remaining > 0:
+    chunk = line[:remaining]
+    os.write(1 if remaining % 2 else 2, chunk)
+    remaining -= len(chunk)
+time.sleep(float(os.environ.get("FAKE_STEAM_SECONDS", "0")))
+sys.exit(int(os.environ.get("FAKE_STEAM_EXIT", "0")))
+'''
+
+# Write an executable "steam" into directory and put it first on PATH
+def install_fake_steam(directory):
+    path = os.path.join(directory, "steam")
+    with open(path, "w") as file:
+        file.write(SCRIPT.format(python=sys.executable))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    os.environ["PATH"] = directory + os.pathsep + os.environ.get("PATH", "")
+    return path
+
+# Write an executable wrapper (like gamemoderun) into directory that records its
+# own arguments to $FAKE_WRAPPER_RECORD and execs the command after its options
+WRAPPER = r'''#!/bin/sh
+[ -n "$FAKE_WRAPPER_RECORD" ] && echo "$@" > "$FAKE_WRAPPER_RECORD"
+while [ "${{1#-}}" != "$1" ]; do shift; done
+exec "$@"
+'''
+
+def install_fake_wrapper(directory, name):
+    path = os.path.join(directory, name)
+    with open(path, "w") as file:
+        file.write(WRAPPER.format())
+    os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return path
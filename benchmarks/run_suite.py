@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+import common
+from bench_filter_model import QUERIES
+from stub_server import StubSteamServer, synthetic_games
+
+STARTUP_LINE = re.compile(r"^\s+(.+?)\s+([\d.]+) ms\s+\(total\s+([\d.]+) ms\)")
+# Differences below this are noise on any machine and never count as a regression
+NOISE_FLOOR_MS = 0.5
+
+def summarize(samples):
+    samples = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 4),
+        "max_ms": round(samples[-1], 4),
+        "runs": len(samples),
+    }
+
+def timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return (time.perf_counter() - start) * 1000
+
+def metadata():
+    from PyQt5 import QtCore
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=common.REPO_ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "qt": QtCore.QT_VERSION_STR,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+# Cold start of launcherAlpha2 with --profile-startup in fresh processes, showing a snapshot of games
+def bench_startup(results, args):
+    from library_db import LibraryDB
+    # Without icon hashes no icon downloads are started, which would delay the exit of every run
+    games = [dict(game, img_icon_url="") for game in synthetic_games(args.startup_games)]
+    LibraryDB().replace_games("76561198000000000", games)
+    with open("launcher_config.json", "w") as file:
+        json.dump({"steam_api_key": "KEY", "steam_profile_id": "76561198000000000", "refresh_on_startup": False}, file)
+    stages = {}
+    for _ in range(args.startup_runs):
+        output = subprocess.run([sys.executable, os.path.join(common.REPO_ROOT, "launcherAlpha2.py"), "--profile-startup"],
+                                capture_output=True, text=True, timeout=120).stdout
+        for line in output.splitlines():
+            match = STARTUP_LINE.match(line)
+            if match:
+                stages.setdefault(match.group(1), []).append(float(match.group(3)))
+    results["startup/first paint"] = summarize(stages["first paint"])
+    results[f"startup/library shown ({args.startup_games})"] = summarize(stages["library shown"])
+
+# refresh_library, filter_games, update_game_list and icon paths against one launcher,
+# with libraries of every size in --sizes served by the stub API
+def bench_launcher(results, args):
+    from PyQt5 import QtGui
+    import launcherAlpha2
+    import steam_api
+
+    server = StubSteamServer(image_bytes=common.sample_jpeg()).start()
+    steam_api.OWNED_GAMES_URL = server.base_url + "/IPlayerService/GetOwnedGames/v1/"
+    steam_api.ICON_BASE_URL = server.base_url + "/steamcommunity/public/images/apps"
+    launcher = launcherAlpha2.GamingLauncher()
+    launcher.show()
+    common.wait_until(lambda: launcher.library_db is not None, timeout=10)
+
+    def refresh():
+        launcher.refresh_library(silent=True)
+        common.wait_until(lambda: launcher.refresh_worker is None, timeout=600)
+
+    for size in args.sizes:
+        games = synthetic_games(size)
+        server.games = games
+        # A new profile per size, so the first refresh stores the library as a whole
+        profile_id = f"7656119800{size:07d}"
+        launcher.steam_api_key = "KEY"
+        launcher.steam_profile_id = profile_id
+        launcher.config_store.set("steam_api_key", "KEY")
+        launcher.config_store.set("steam_profile_id", profile_id)
+        common.set_search_text(launcher, "")
+
+        results[f"refresh_library/first/{size}"] = summarize([timed(refresh)])
+        assert launcher.filter_model.rowCount() == size, (size, launcher.filter_model.rowCount())
+        results[f"refresh_library/unchanged/{size}"] = summarize([timed(refresh) for _ in range(args.repeat)])
+        samples = []
+        for run in range(args.repeat):
+            server.games = [dict(game, playtime_2weeks=run + 1) if i % 100 == 0 else game for i, game in enumerate(games)]
+            samples.append(timed(refresh))
+        results[f"refresh_library/1% changed/{size}"] = summarize(samples)
+
+        def keystroke(query):
+            common.set_search_text(launcher, query)
+            common.paint_view(launcher.game_list)
+        results[f"filter_games/keystroke/{size}"] = summarize(
+            [timed(keystroke, query) for _ in range(args.repeat) for query in QUERIES])
+        common.set_search_text(launcher, "")
+
+        all_rows = list(range(size))
+        half_rows = all_rows[::2]
+        samples = []
+        for _ in range(args.repeat):
+            for rows in (half_rows, all_rows):
+                launcher.filtered_rows = rows
+                samples.append(timed(lambda: (launcher.update_game_list(), common.paint_view(launcher.game_list))))
+        results[f"update_game_list/rebuild/{size}"] = summarize(samples)
+
+    # Icon hit paths: on-disk cache, decoded pixmap cache and the icon a painted row asks for
+    cache = launcher.image_cache
+    jpeg = common.sample_jpeg()
+    games = launcher.steam_games[:args.icons]
+    urls = [steam_api.icon_url(game["appid"], game["img_icon_url"]) for game in games]
+    for url in urls:
+        cache.store(url, jpeg)
+    results["icon_cache/disk hit (fetch)"] = summarize([timed(cache.fetch, url) for url in urls])
+    results["icon_cache/disk hit (lookup)"] = summarize([timed(cache.lookup, url) for url in urls])
+    results["icon_cache/decode from disk"] = summarize(
+        [timed(lambda: QtGui.QImage().load(cache.lookup(url))) for url in urls])
+    for game in games:
+        launcher.game_icon(game)
+    common.wait_until(lambda: not launcher.icon_loader.pending, timeout=120)
+    common.qt_app().processEvents()
+    keys = [(game["appid"], launcher.icon_size) for game in games]
+    results["icon_cache/pixmap hit"] = summarize([timed(launcher.pixmap_cache.get, key) for key in keys])
+    results["icon_cache/row icon (cached)"] = summarize([timed(launcher.game_icon, game) for game in games])
+
+    launcher.close()
+    server.stop()
+
+SUITE = {"startup": bench_startup, "launcher": bench_launcher}
+
+def compare(results, baseline, threshold):
+    # Print median changes against a baseline file; True if anything got slower than threshold
+    regressed = False
+    print(f"compared with {baseline['meta'].get('commit') or 'baseline'}:")
+    for name, current in results.items():
+        old = baseline["results"].get(name)
+        if old is None:
+            print(f"  {name:<44} {current['median_ms']:10.3f} ms  (new)")
+            continue
+        change = (current["median_ms"] - old["median_ms"]) / old["median_ms"] * 100 if old["median_ms"] else 0.0
+        slower = change > threshold and current["median_ms"] - old["median_ms"] > NOISE_FLOOR_MS
+        regressed = regressed or slower
+        print(f"  {name:<44} {old['median_ms']:10.3f} -> {current['median_ms']:10.3f} ms  "
+              f"{change:+6.1f}%{'  REGRESSION' if slower else ''}")
+    return regressed
+
+# Runs the launcher hot paths headless (offscreen Qt, stub Steam API/CDN) and writes
+# the results as JSON, e.g.
+#   python benchmarks/run_suite.py --output before.json
+#   python benchmarks/run_suite.py --compare before.json --output after.json
+# With --compare the exit code is 1 if a median got more than --threshold percent slower.
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="100,1000,10000,100000", help="library sizes, comma separated")
+    parser.add_argument("--quick", action="store_true", help="sizes 100,1000,10000 and fewer runs")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--startup-runs", type=int, default=7)
+    parser.add_argument("--startup-games", type=int, default=5000)
+    parser.add_argument("--icons", type=int, default=500)
+    parser.add_argument("--only", choices=list(SUITE), action="append")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", metavar="BASELINE")
+    parser.add_argument("--threshold", type=float, default=20.0, help="allowed slowdown in percent")
+    args = parser.parse_args()
+    args.sizes = [int(size) for size in ("100,1000,10000" if args.quick else args.sizes).split(",")]
+    if args.quick:
+        args.repeat = min(args.repeat, 3)
+        args.startup_runs = min(args.startup_runs, 3)
+    # Paths are relative to where the suite was started, not the throw-away workdir
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+
+    common.isolated_workdir()
+    common.qt_app()
+    results = {}
+    for name in args.only or SUITE:
+        start = time.perf_counter()
+        SUITE[name](results, args)
+        print(f"{name}: {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    report = {"meta": dict(metadata(), sizes=args.sizes, repeat=args.repeat), "results": results}
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    common.report(f"results ({output})", [(name, f"median {value['median_ms']:10.3f} ms  p95 {value['p95_ms']:10.3f} ms")
+                                          for name, value in results.items()])
+    if baseline_path:
+        with open(baseline_path) as file:
+            baseline = json.load(file)
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import os
+import random
+
+# Fake Steam installation for the benchmarks: a root with libraryfolders.vdf and
+# appmanifest_*.acf files in the same format Steam writes them.
+
+MANIFEST = '''"AppState"
+{{
+	"appid"		"{appid}"
+	"Universe"		"1"
+	"name"		"{name}"
+	"StateFlags"		"{flags}"
+	"installdir"		"{installdir}"
+	"LastUpdated"		"{last_updated}"
+	"SizeOnDisk"		"{size}"
+	"StagingSize"		"0"
+	"buildid"		"{buildid}"
+	"LastOwner"		"76561198000000000"
+	"BytesToDownload"		"0"
+	"BytesDownloaded"		"0"
+	"AutoUpdateBehavior"		"0"
+	"AllowOtherDownloadsWhileRunning"		"0"
+	"ScheduledAutoUpdate"		"0"
+	"InstalledDepots"
+	{{
+		"{depot}"
+		{{
+			"manifest"		"{manifest}"
+			"size"		"{size}"
+		}}
+	}}
+	"UserConfig"
+	{{
+		"language"		"english"
+	}}
+	"MountedConfig"
+	{{
+		"language"		"english"
+	}}
+}}
+'''
+
+def write_manifest(steamapps, appid, name, size, flags=4, last_updated=1700000000):
+    path = os.path.join(steamapps, f"appmanifest_{appid}.acf")
+    with open(path, "w") as file:
+        file.write(MANIFEST.format(appid=appid, name=name, flags=flags, installdir=name.replace(" ", ""),
+                                   last_updated=last_updated, size=size, buildid=appid * 7,
+                                   depot=appid + 1, manifest=appid * 7919))
+    return path
+
+# Create root/steamapps plus folders - 1 extra library folders and spread count
+# manifests over them. Returns (root, {appid: size} of the fully installed games).
+def make_steam_tree(root, count, folders=3, seed=1):
+    rng = random.Random(seed)
+    libraries = [root] + [os.path.join(root, f"library{i}") for i in range(1, folders)]
+    for library in libraries:
+        os.makedirs(os.path.join(library, "steamapps"), exist_ok=True)
+    entries = "".join(f'\t"{i}"\n\t{{\n\t\t"path"\t\t"{library}"\n\t\t"label"\t\t""\n\t}}\n'
+                      for i, library in enumerate(libraries))
+    with open(os.path.join(root, "steamapps", "libraryfolders.vdf"), "w") as file:
+        file.write(f'"libraryfolders"\n{{\n{entries}}}\n')
+    installed = {}
+    for i in range(count):
+        appid = 10 + i * 10
+        size = rng.randint(10 ** 6, 10 ** 11)
+        # Some games are still downloading (StateFlags 1026 = update required + running)
+        flags = 4 if rng.random() < 0.9 else 1026
+        write_manifest(os.path.join(libraries[i % folders], "steamapps"), appid, f"Game {appid}", size, flags)
+        if flags & 4:
+            installed[appid] = size
+    return root, installed
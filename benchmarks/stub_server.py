@@ -0,0 +1,170 @@
+import gzip
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Local stand-in for the Steam Web API and the image CDNs, used by the benchmarks.
+# Serves GetOwnedGames for a synthetic library and the same image bytes for every icon URL.
+# libraries ({steamid: games}) serves a different library per account instead, with an
+# optional extra delay per account (account_delays) and accounts answering 403 (failing_accounts).
+
+# Build a deterministic synthetic library in the GetOwnedGames format
+def synthetic_games(count, seed=1):
+    rng = random.Random(seed)
+    words = ["Counter", "Strike", "Half", "Life", "Portal", "Dota", "Team", "Fortress",
+             "Left", "Dead", "Garry", "Mod", "Stardew", "Valley", "Terraria", "Rust",
+             "Cities", "Skylines", "Civilization", "Witcher", "Hollow", "Knight", "Celeste"]
+    games = []
+    for i in range(count):
+        appid = 10 + i * 10
+        name = " ".join(rng.choice(words) for _ in range(rng.randint(1, 4))) + f" {i}"
+        games.append({
+            "appid": appid,
+            "name": name,
+            "playtime_forever": rng.randint(0, 50000),
+            "playtime_2weeks": rng.choice([0, 0, 0, rng.randint(1, 3000)]),
+            "rtime_last_played": rng.randint(0, 1700000000),
+            "img_icon_url": f"{appid:040x}",
+            "has_community_visible_stats": rng.random() < 0.5,
+        })
+    return games
+
+class StubSteamServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, games=(), image_bytes=b"", delay=0.0, failure_rate=0.0, unique_images=False, seed=1,
+                 cache_control=None, gzip_json=False, libraries=None, account_delays=None, failing_accounts=(),
+                 bandwidth=None, cache_json=False):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.games = list(games)
+        self.libraries = libraries
+        self.account_delays = account_delays or {}
+        self.failing_accounts = set(failing_accounts)
+        self.image_bytes = image_bytes
+        self.unique_images = unique_images
+        self.delay = delay
+        self.failure_rate = failure_rate
+        # Bytes per second per response body, to show what arrives when on a real connection
+        self.bandwidth = bandwidth
+        # Encode each library once instead of per request (it must not change afterwards),
+        # so the stub's own work stays out of the client's timings and tracemalloc
+        self.cache_json = cache_json
+        self.json_bodies = {}
+        # Cache-Control header sent with images, and whether JSON is gzipped for clients that accept it
+        self.cache_control = cache_control
+        self.gzip_json = gzip_json
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        # GetOwnedGames requests per steamid, and how many were answered at the same time
+        self.owned_requests = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def should_fail(self):
+        with self.lock:
+            return self.rng.random() < self.failure_rate
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this Nagle adds ~40ms per request
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        if self.server.should_fail():
+            self._send(503, b"unavailable", "text/plain")
+        elif "GetOwnedGames" in self.path:
+            self._owned_games()
+        elif self.path.endswith(".jpg"):
+            # Trailing bytes after the JPEG end marker are ignored by decoders but make each image distinct
+            body = self.server.image_bytes + (self.path.encode() if self.server.unique_images else b"")
+            etag = '"%s"' % hashlib.sha1(body).hexdigest()
+            headers = {"ETag": etag}
+            if self.server.cache_control:
+                headers["Cache-Control"] = self.server.cache_control
+            if self.headers.get("If-None-Match") == etag:
+                with self.server.lock:
+                    self.server.not_modified += 1
+                self._send(304, b"", "image/jpeg", headers)
+            else:
+                self._send(200, body, "image/jpeg", headers)
+        else:
+            self._send(404, b"not found", "text/plain")
+
+    def _owned_games(self):
+        steam_id = parse_qs(urlsplit(self.path).query).get("steamid", [""])[0]
+        server = self.server
+        with server.lock:
+            server.owned_requests[steam_id] += 1
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.account_delays.get(steam_id, 0))
+            if steam_id in server.failing_accounts:
+                self._send(403, b"forbidden", "text/plain")
+                return
+            body = server.json_bodies.get(steam_id) if server.cache_json else None
+            if body is None:
+                games = server.games if server.libraries is None else server.libraries.get(steam_id, [])
+                body = json.dumps({"response": {"game_count": len(games), "games": games}}).encode()
+                if server.cache_json:
+                    server.json_bodies[steam_id] = body
+            if server.gzip_json and "gzip" in self.headers.get("Accept-Encoding", ""):
+                self._send(200, gzip.compress(body, 6), "application/json", {"Content-Encoding": "gzip"})
+            else:
+                self._send(200, body, "application/json")
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def _send(self, status, body, content_type, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.server.bandwidth:
+            slice_bytes = 16 * 1024
+            for start in range(0, len(body), slice_bytes):
+                if start:
+                    time.sleep(slice_bytes / self.server.bandwidth)
+                self.wfile.write(body[start:start + slice_bytes])
+        else:
+            self.wfile.write(body)
+        with self.server.lock:
+            self.server.bytes_sent += len(body)
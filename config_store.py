@@ -0,0 +1,128 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+import perf
+from image_cache import atomic_write
+
+# Launcher configuration with batched, crash-safe writes. set() and the favorite
+# helpers only mark the config dirty; a background thread writes it once no change
+# has come in for delay seconds (or at the latest max_delay seconds after the first
+# unsaved change), and close()/interpreter exit write whatever is left. Every write
+# goes through a temp file + rename, so the file is either the old or the new config.
+class ConfigStore:
+    def __init__(self, path, delay=1.0, max_delay=5.0):
+        self.path = path
+        self.delay = delay
+        self.max_delay = max_delay
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)
+        # Serializes writers so an older snapshot never replaces a newer one
+        self.write_lock = threading.Lock()
+        self.data = self._load()
+        # Favorites are a set for O(1) lookups and written back as a sorted list
+        self.favorites = set(self.data.pop("favorites", []))
+        self.dirty = False
+        self.first_change = None
+        self.due = None
+        self.closed = False
+        self.thread = None
+        self.stats = Counter(changes=0, writes=0, bytes_written=0)
+        atexit.register(self.close)
+
+    def _load(self):
+        try:
+            with open(self.path, "r") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Could not read {self.path} ({e}), starting with an empty config.")
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        with self.lock:
+            self.data[key] = value
+            self._schedule()
+
+    def is_favorite(self, app_id):
+        return app_id in self.favorites
+
+    def add_favorite(self, app_id):
+        # False if the game already was a favorite
+        with self.lock:
+            if app_id in self.favorites:
+                return False
+            self.favorites.add(app_id)
+            self._schedule()
+            return True
+
+    def remove_favorite(self, app_id):
+        with self.lock:
+            if app_id not in self.favorites:
+                return False
+            self.favorites.discard(app_id)
+            self._schedule()
+            return True
+
+    def flush(self):
+        # Write pending changes now, on the calling thread
+        with self.write_lock:
+            with self.lock:
+                if not self.dirty:
+                    return
+                snapshot = dict(self.data, favorites=sorted(self.favorites))
+                self.dirty = False
+                self.first_change = None
+                self.due = None
+            try:
+                with perf.span("save_config", "io"):
+                    data = json.dumps(snapshot).encode()
+                    atomic_write(os.path.abspath(self.path), data)
+            except OSError as e:
+                print(f"Could not save {self.path}: {e}")
+                with self.lock:
+                    self._schedule()
+                return
+            with self.lock:
+                self.stats["writes"] += 1
+                self.stats["bytes_written"] += len(data)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.changed.notify()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.flush()
+
+    def _schedule(self):
+        # Called with the lock held after every change
+        now = time.monotonic()
+        self.dirty = True
+        self.stats["changes"] += 1
+        if self.first_change is None:
+            self.first_change = now
+        self.due = min(now + self.delay, self.first_change + self.max_delay)
+        if self.closed:
+            return
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="config-flush", daemon=True)
+            self.thread.start()
+        self.changed.notify()
+
+    def _run(self):
+        while True:
+            with self.lock:
+                while not self.closed and (self.due is None or time.monotonic() < self.due):
+                    self.changed.wait(None if self.due is None else self.due - time.monotonic())
+                if self.closed:
+                    return
+            self.flush()
@@ -0,0 +1,130 @@
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+from game_model import AppIdRole
+from icon_loader import IconLoader
+from steam_api import header_url
+from thumbnail_atlas import ThumbnailAtlas
+
+# Space for the game name below each tile
+CAPTION_HEIGHT = 20
+TILE_MARGIN = 6
+
+# IconLoader for the header art: the decoded image goes straight into the atlas on
+# the worker thread, the GUI thread only hears which tile is ready.
+class ThumbnailLoader(IconLoader):
+    thumbnail_ready = QtCore.pyqtSignal(object)
+
+    def __init__(self, atlas, max_workers=8, timeout=10, cache=None, parent=None):
+        super().__init__(max_workers=max_workers, timeout=timeout, cache=cache, icon_size=None, parent=parent)
+        self.atlas = atlas
+
+    def _loaded(self, key, image):
+        self.atlas.put(key, image)
+        self.thumbnail_ready.emit(key)
+
+# Paints a tile straight from the atlas plus the elided name, without going through
+# the style or any per-game QIcon. Missing tiles get a flat placeholder and are requested.
+class GridDelegate(QtWidgets.QAbstractItemDelegate):
+    def __init__(self, atlas, request, parent=None):
+        super().__init__(parent)
+        self.atlas = atlas
+        self.request = request
+        self.tile_size = QtCore.QSize(atlas.tile_width, atlas.tile_height)
+        self.placeholder = QtGui.QColor(60, 60, 60)
+
+    def sizeHint(self, option, index):
+        return QtCore.QSize(self.tile_size.width(), self.tile_size.height() + CAPTION_HEIGHT)
+
+    def paint(self, painter, option, index):
+        rect = option.rect
+        tile = QtCore.QRect(rect.left() + (rect.width() - self.tile_size.width()) // 2, rect.top(),
+                            self.tile_size.width(), self.tile_size.height())
+        app_id = index.data(AppIdRole)
+        if not self.atlas.draw(painter, tile, app_id):
+            painter.fillRect(tile, self.placeholder)
+            self.request(app_id)
+        selected = option.state & QtWidgets.QStyle.State_Selected
+        if selected:
+            painter.setPen(QtGui.QPen(option.palette.highlight(), 3))
+            painter.drawRect(tile.adjusted(1, 1, -2, -2))
+        caption = QtCore.QRect(rect.left(), tile.bottom() + 1, rect.width(), CAPTION_HEIGHT)
+        painter.setPen(option.palette.color(QtGui.QPalette.HighlightedText if selected else QtGui.QPalette.Text))
+        name = option.fontMetrics.elidedText(index.data(QtCore.Qt.DisplayRole) or "", QtCore.Qt.ElideRight, caption.width())
+        painter.drawText(caption, QtCore.Qt.AlignHCenter | QtCore.Qt.AlignVCenter, name)
+
+# Tile view of the same filter model as the list: header art from a ThumbnailAtlas,
+# loaded through the shared image cache for visible tiles only. Downloads for tiles
+# scrolled out of view are dropped, like the list's icon queue.
+class GameGridView(QtWidgets.QListView):
+    def __init__(self, image_cache=None, max_workers=8, atlas_bytes=512 * 1024 * 1024, prefetch_rows=2, parent=None):
+        super().__init__(parent)
+        self.atlas = ThumbnailAtlas(max_bytes=atlas_bytes)
+        self.loader = ThumbnailLoader(self.atlas, max_workers=max_workers, cache=image_cache)
+        self.failed = set()
+        self.loader.thumbnail_ready.connect(self.on_thumbnail_ready)
+        self.loader.icon_failed.connect(lambda app_id, error: self.failed.add(app_id))
+        self.prefetch_rows = prefetch_rows
+        self.delegate = GridDelegate(self.atlas, self.request_thumbnail, self)
+        self.setItemDelegate(self.delegate)
+
+        self.setViewMode(QtWidgets.QListView.IconMode)
+        self.setMovement(QtWidgets.QListView.Static)
+        self.setResizeMode(QtWidgets.QListView.Adjust)
+        self.setUniformItemSizes(True)
+        self.setWrapping(True)
+        self.setGridSize(QtCore.QSize(self.atlas.tile_width + 2 * TILE_MARGIN,
+                                      self.atlas.tile_height + CAPTION_HEIGHT + 2 * TILE_MARGIN))
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(self.gridSize().height() // 3)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+
+        self.viewport_timer = QtCore.QTimer(self)
+        self.viewport_timer.setSingleShot(True)
+        self.viewport_timer.setInterval(30)
+        self.viewport_timer.timeout.connect(self.update_visible_tiles)
+        self.verticalScrollBar().valueChanged.connect(lambda value: self.viewport_timer.start())
+
+    def setModel(self, model):
+        super().setModel(model)
+        model.modelReset.connect(lambda: self.viewport_timer.start())
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.viewport_timer.start()
+
+    def request_thumbnail(self, app_id):
+        if app_id is not None and app_id not in self.failed:
+            self.loader.request(app_id, header_url(app_id))
+
+    def on_thumbnail_ready(self, app_id):
+        # Tiles are cheap to paint, so repainting the viewport beats looking up the row
+        self.viewport().update()
+
+    def visible_range(self):
+        # Rows from the first to the last visible tile, widened by prefetch_rows lines of tiles
+        count = self.model().rowCount() if self.model() is not None else 0
+        if count == 0:
+            return range(0)
+        viewport = self.viewport().rect()
+        grid = self.gridSize()
+        per_line = max(1, viewport.width() // grid.width())
+        first = max(self.indexAt(QtCore.QPoint(TILE_MARGIN, TILE_MARGIN)).row(), 0)
+        last = self.indexAt(QtCore.QPoint(per_line * grid.width() - TILE_MARGIN, viewport.height() - TILE_MARGIN)).row()
+        if last < 0:
+            # Partly filled last line, or the layout is not done yet
+            last = min(first + per_line * (viewport.height() // grid.height() + 1) - 1, count - 1)
+        extra = per_line * self.prefetch_rows
+        return range(max(first - extra, 0), min(last + extra + 1, count))
+
+    def update_visible_tiles(self):
+        model = self.model()
+        wanted = {model.index(row, 0).data(AppIdRole) for row in self.visible_range()}
+        self.loader.retain(wanted)
+        for app_id in wanted:
+            if app_id not in self.atlas:
+                self.request_thumbnail(app_id)
+
+    def shutdown(self):
+        self.viewport_timer.stop()
+        self.loader.shutdown()
+        self.atlas.close()
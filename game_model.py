@@ -0,0 +1,198 @@
+from array import array
+
+from PyQt5 import QtCore
+
+# Same role the QListWidget items used for the app id
+AppIdRole = QtCore.Qt.UserRole
+
+def format_size(size):
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+# Holds the whole library once; rows are only added or reset on refresh_library.
+# icon_provider(game) is asked for the decoration of rows the view actually paints.
+class GameListModel(QtCore.QAbstractListModel):
+    def __init__(self, icon_provider=None, parent=None):
+        super().__init__(parent)
+        self.icon_provider = icon_provider
+        self.games = []
+        self.rows_by_appid = {}
+        # appid -> size on disk of the locally installed games
+        self.installed = {}
+        # appids with a launch that has not exited yet
+        self.running = set()
+        # steam id -> account name, for games owned by several merged accounts
+        self.account_names = {}
+
+    def set_games(self, games):
+        self.beginResetModel()
+        self.games = list(games)
+        self.rows_by_appid = {game.get("appid"): row for row, game in enumerate(self.games)}
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.games)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        game = self.games[index.row()]
+        if role == QtCore.Qt.DisplayRole:
+            name = game.get("name", "Unknown Game")
+            return f"{name}  (running)" if game.get("appid") in self.running else name
+        if role == QtCore.Qt.DecorationRole and self.icon_provider is not None:
+            return self.icon_provider(game)
+        if role == QtCore.Qt.ToolTipRole:
+            size = self.installed.get(game.get("appid"))
+            tooltip = f"Installed ({format_size(size)})" if size is not None else "Not installed"
+            owners = game.get("owners")
+            if owners and len(owners) > 1:
+                tooltip += "\nOwned by " + ", ".join(self.account_names.get(owner, owner) for owner in owners)
+            return tooltip
+        if role == AppIdRole:
+            return game.get("appid")
+        return None
+
+    def set_installed(self, installed):
+        # Only rows whose install state or size changed are repainted
+        changed = {appid for appid in installed.keys() | self.installed.keys()
+                   if installed.get(appid) != self.installed.get(appid)}
+        self.installed = dict(installed)
+        for appid in changed:
+            self.game_changed(appid, [QtCore.Qt.ToolTipRole])
+
+    def set_running(self, app_id, running):
+        if running:
+            self.running.add(app_id)
+        else:
+            self.running.discard(app_id)
+        self.game_changed(app_id, [QtCore.Qt.DisplayRole])
+
+    def update_installed(self, changes):
+        # changes maps appid -> size on disk, or None once the game was uninstalled
+        for appid, size in changes.items():
+            if size is None:
+                self.installed.pop(appid, None)
+            else:
+                self.installed[appid] = size
+            self.game_changed(appid, [QtCore.Qt.ToolTipRole])
+
+    def apply_delta(self, added, removed, changed):
+        # Update and append rows in place so the view keeps its scroll position and selection.
+        # Removals shift all later rows, so a delta with any is applied in a single reset
+        # instead of one beginRemoveRows per game (each of which rebuilt the filter model)
+        removed = {appid for appid in removed if appid in self.rows_by_appid}
+        if removed:
+            changed_by_appid = {game.get("appid"): game for game in changed}
+            self.beginResetModel()
+            self.games[:] = [changed_by_appid.get(game.get("appid"), game) for game in self.games
+                             if game.get("appid") not in removed]
+            self.games.extend(added)
+            self.rows_by_appid = {game.get("appid"): row for row, game in enumerate(self.games)}
+            self.endResetModel()
+            return
+        for game in changed:
+            row = self.rows_by_appid.get(game.get("appid"))
+            if row is not None:
+                self.games[row] = game
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [])
+        if added:
+            first = len(self.games)
+            self.beginInsertRows(QtCore.QModelIndex(), first, first + len(added) - 1)
+            for row, game in enumerate(added, first):
+                self.games.append(game)
+                self.rows_by_appid[game.get("appid")] = row
+            self.endInsertRows()
+
+    def append_games(self, games):
+        # Rows for the games not shown yet, e.g. while a library is still being parsed
+        added = {}
+        for game in games:
+            if game.get("appid") not in self.rows_by_appid:
+                added.setdefault(game.get("appid"), game)
+        self.apply_delta(list(added.values()), [], [])
+
+    def game_changed(self, app_id, roles=()):
+        # Repaint a single game, e.g. once its icon has arrived
+        row = self.rows_by_appid.get(app_id)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, list(roles))
+
+# Shows a subset of the source rows in a given order. Filtering hands over an array
+# of source rows, so a search costs O(matches) instead of rebuilding any items.
+# Another order of the same number of rows (a sort switch) is swapped in place and
+# only repainted, so the selection and scroll position survive it.
+class GameFilterModel(QtCore.QAbstractListModel):
+    # After every set_rows, reset or not, e.g. to queue icons for the rows now visible
+    rows_changed = QtCore.pyqtSignal()
+
+    def __init__(self, source, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.rows = array("i", range(source.rowCount()))
+        self.proxy_rows = None
+        source.modelReset.connect(self._source_reset)
+        # Source rows shift on insert/remove; the owner re-filters right after
+        source.rowsInserted.connect(self._source_reset)
+        source.rowsRemoved.connect(self._source_reset)
+        source.dataChanged.connect(self._source_changed)
+
+    def set_rows(self, rows):
+        rows = rows if isinstance(rows, array) else array("i", rows)
+        if rows and len(rows) == len(self.rows):
+            self._move_persistent(rows)
+            self.rows = rows
+            self.proxy_rows = None
+            self.dataChanged.emit(self.index(0), self.index(len(rows) - 1), [])
+            self.rows_changed.emit()
+        else:
+            self._reset(rows)
+
+    def _reset(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.proxy_rows = None
+        self.endResetModel()
+        self.rows_changed.emit()
+
+    def _move_persistent(self, rows):
+        # Selection and current index follow their game to its new row, or are dropped
+        persistent = self.persistentIndexList()
+        if not persistent:
+            return
+        new_rows = {source_row: row for row, source_row in enumerate(rows)}
+        moved = []
+        for index in persistent:
+            row = new_rows.get(self.rows[index.row()])
+            moved.append(QtCore.QModelIndex() if row is None else self.index(row))
+        self.changePersistentIndexList(persistent, moved)
+
+    def source_row(self, row):
+        return self.rows[row]
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        return self.source.data(self.source.index(self.rows[index.row()]), role)
+
+    def _source_reset(self):
+        # The source rows mean other games now, so nothing can be kept
+        self._reset(array("i", range(self.source.rowCount())))
+
+    def _source_changed(self, top_left, bottom_right, roles):
+        # Inverse mapping is only built when a source row actually changes
+        if self.proxy_rows is None:
+            self.proxy_rows = {source_row: row for row, source_row in enumerate(self.rows)}
+        for source_row in range(top_left.row(), bottom_right.row() + 1):
+            row = self.proxy_rows.get(source_row)
+            if row is not None:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, roles)
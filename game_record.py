@@ -0,0 +1,80 @@
+import sys
+
+# Fields of a GetOwnedGames entry the launcher keeps; everything else is dropped
+API_FIELDS = ("appid", "name", "img_icon_url", "playtime_forever", "playtime_2weeks",
+              "rtime_last_played", "has_community_visible_stats")
+# Stored per game: the API fields plus the steam ids of the accounts owning it
+GAME_FIELDS = API_FIELDS + ("owners",)
+_FIELD_SET = frozenset(GAME_FIELDS)
+
+# Owner tuples handed out so far; games owned by the same accounts share one tuple
+_owner_tuples = {}
+
+def owner_tuple(owners):
+    # owners as a shared tuple of interned steam ids
+    owners = tuple(owners)
+    shared = _owner_tuples.get(owners)
+    if shared is None:
+        shared = _owner_tuples[owners] = tuple(sys.intern(owner) for owner in owners)
+    return shared
+
+# One game of the library with only the fields the launcher uses, held in
+# __slots__ instead of a dict with every API field. It reads like the API dict
+# it replaces (game.get("name"), game["appid"], "owners" in game, dict(game));
+# a field that is None counts as missing, as in the snapshot. Names are interned,
+# so the snapshot, the account caches and a refresh in progress share one string
+# per name, and owners is a tuple shared by all games of the same accounts.
+class Game:
+    __slots__ = GAME_FIELDS
+
+    def __init__(self, appid=None, name=None, img_icon_url=None, playtime_forever=None, playtime_2weeks=None,
+                 rtime_last_played=None, has_community_visible_stats=None, owners=None):
+        self.appid = appid
+        self.name = name
+        self.img_icon_url = img_icon_url
+        self.playtime_forever = playtime_forever
+        self.playtime_2weeks = playtime_2weeks
+        self.rtime_last_played = rtime_last_played
+        self.has_community_visible_stats = has_community_visible_stats
+        self.owners = owners
+
+    @classmethod
+    def from_dict(cls, data):
+        # From an API entry, a cached account entry or another Game; unknown fields are dropped
+        get = data.get
+        name = get("name")
+        owners = get("owners")
+        return cls(get("appid"), name if name is None else sys.intern(name), get("img_icon_url"),
+                   get("playtime_forever"), get("playtime_2weeks"), get("rtime_last_played"),
+                   get("has_community_visible_stats"), owners if owners is None else owner_tuple(owners))
+
+    def get(self, field, default=None):
+        value = getattr(self, field) if field in _FIELD_SET else None
+        return default if value is None else value
+
+    def __getitem__(self, field):
+        value = self.get(field)
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def __contains__(self, field):
+        return self.get(field) is not None
+
+    def keys(self):
+        return [field for field in GAME_FIELDS if getattr(self, field) is not None]
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.keys()}
+
+    def __eq__(self, other):
+        if isinstance(other, Game):
+            return all(getattr(self, field) == getattr(other, field) for field in GAME_FIELDS)
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Game({self.to_dict()!r})"
@@ -0,0 +1,107 @@
+import threading
+from array import array
+from bisect import bisect_left
+
+# Descending numeric sorts and their field. SQLite sorts NULL below every value, so
+# with DESC a missing value comes after 0; as a negated key that is 1.
+DESCENDING_FIELDS = {
+    "playtime": "playtime_forever",
+    "recent_playtime": "playtime_2weeks",
+    "last_played": "rtime_last_played",
+}
+MISSING_KEY = 1
+
+def _descending(value):
+    return MISSING_KEY if value is None else -value
+
+# Sort orders of the library view, as library_db.SORT_ORDERS. Every key ends in the
+# appid, so no two games tie and re-sorting a single game lands it exactly where a
+# full sort would.
+def _sort_key(sort, games, names, favorites):
+    if sort == "name":
+        return lambda row: (names[row], games[row]["appid"])
+    if sort in DESCENDING_FIELDS:
+        field = DESCENDING_FIELDS[sort]
+        return lambda row: (_descending(games[row].get(field)), games[row]["appid"])
+    if sort == "favorites":
+        return lambda row: (games[row]["appid"] not in favorites, names[row], games[row]["appid"])
+    return lambda row: games[row]["appid"]
+
+# Sorted views over the rows of one library. Each order is computed once per
+# refresh, on first use or ahead of it by precompute(): a stable sort of the appid order by one precomputed key
+# column (C-level lookups, no key tuple per game), plus the position of every row.
+# A filtered set of rows is then sorted by position alone. When a single game
+# changes (e.g. a new favorite) update_row moves just that row in every order
+# computed so far. names are the normalized names of the search index.
+# Orders may be computed on any thread (see precompute). Published arrays are never
+# modified: update_row builds new ones and swaps the tuple, so readers only take
+# the lock when an order is still missing.
+class SortKeys:
+    def __init__(self, games, names, favorites):
+        self.games = games
+        self.names = names
+        self.favorites = favorites
+        # sort -> (rows in that order, position of each row); swapped as one tuple
+        self.sorted = {}
+        self.lock = threading.RLock()
+
+    def _column(self, sort):
+        # Primary key of every row; ties are left to the order it is applied to
+        games = self.games
+        if sort == "name":
+            return self.names
+        if sort in DESCENDING_FIELDS:
+            field = DESCENDING_FIELDS[sort]
+            return array("q", [_descending(game.get(field)) for game in games])
+        if sort == "favorites":
+            favorites = self.favorites
+            return bytes([game["appid"] not in favorites for game in games])
+        return array("q", [game["appid"] for game in games])
+
+    def _order(self, sort):
+        entry = self.sorted.get(sort)
+        if entry is not None:
+            return entry
+        with self.lock:
+            entry = self.sorted.get(sort)
+            if entry is None:
+                # Python's sort is stable, so sorting the appid (or, for favorites, the name)
+                # order by the primary key gives the same order as the full key
+                if sort == "appid":
+                    base = range(len(self.games))
+                else:
+                    base = self._order("name" if sort == "favorites" else "appid")[0]
+                order = array("i", sorted(base, key=self._column(sort).__getitem__))
+                positions = array("i", bytes(4 * len(order)))
+                for position, row in enumerate(order):
+                    positions[row] = position
+                entry = self.sorted[sort] = (order, positions)
+            return entry
+
+    def precompute(self, sorts):
+        # Compute the given orders ahead of their first use, e.g. on a worker thread
+        for sort in sorts:
+            self._order(sort)
+
+    def sort_rows(self, sort, rows):
+        # rows (distinct row numbers, e.g. search matches) in the given order, as a new array
+        order, positions = self._order(sort)
+        if len(rows) == len(order):
+            return array("i", order)
+        return array("i", sorted(rows, key=positions.__getitem__))
+
+    def update_row(self, row):
+        # Take row out of every computed order and insert it where its new key belongs;
+        # only the positions between its old and new place change. Works on copies, so
+        # a search sorting at the same time sees either the old or the new order
+        with self.lock:
+            for sort, (order, positions) in list(self.sorted.items()):
+                key = _sort_key(sort, self.games, self.names, self.favorites)
+                order, positions = array("i", order), array("i", positions)
+                old = positions[row]
+                del order[old]
+                new = bisect_left(order, key(row), key=key)
+                order.insert(new, row)
+                for position in range(min(old, new), max(old, new) + 1):
+                    positions[order[position]] = position
+                self.sorted[sort] = (order, positions)
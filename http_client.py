@@ -0,0 +1,239 @@
+import email.utils
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.exceptions import EmptyPoolError
+
+# Keep-alive connections per host; more concurrent requests wait for a free one
+# instead of opening a connection that is thrown away afterwards
+POOL_PER_HOST = 8
+# Hosts with their own pool (Steam API, icon host, header CDN, ...)
+MAX_HOSTS = 10
+# Seconds a request waits for a free pooled connection before it fails with ConnectTimeout
+POOL_TIMEOUT = 30
+# Memory for responses that are fresh according to Cache-Control/Expires
+CACHE_BYTES = 16 * 1024 * 1024
+
+# Seconds a response may be served from the cache, from Cache-Control max-age or
+# Expires. no-store/no-cache, Vary: * and responses without either header get 0.
+def freshness_lifetime(headers, now=None):
+    directives = {}
+    for part in headers.get("Cache-Control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"')
+    if "no-store" in directives or "no-cache" in directives or headers.get("Vary", "").strip() == "*":
+        return 0
+    if "max-age" in directives:
+        try:
+            return int(directives["max-age"]) - int(headers.get("Age", 0))
+        except ValueError:
+            return 0
+    if headers.get("Expires"):
+        try:
+            expires = email.utils.parsedate_to_datetime(headers["Expires"]).timestamp()
+            date = email.utils.parsedate_to_datetime(headers["Date"]).timestamp() if headers.get("Date") else now or time.time()
+        except (TypeError, ValueError):
+            return 0
+        return expires - date
+    return 0
+
+# Response kept in the cache or handed to requests that were coalesced with another
+class CachedResponse:
+    __slots__ = ("status_code", "reason", "headers", "content", "url", "encoding", "expires")
+
+    def __init__(self, response, expires=0.0):
+        self.status_code = response.status_code
+        self.reason = response.reason
+        self.headers = CaseInsensitiveDict(response.headers)
+        self.content = response.content
+        self.url = response.url
+        self.encoding = response.encoding
+        self.expires = expires
+
+    def response(self):
+        # A new requests.Response per caller, the content is shared
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.reason = self.reason
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response._content_consumed = True
+        response.url = self.url
+        response.encoding = self.encoding
+        return response
+
+class InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+# Upper bound in seconds of a request with the given requests timeout (float or
+# (connect, read)); None if it has none
+def total_timeout(timeout):
+    if isinstance(timeout, tuple):
+        return None if None in timeout else sum(timeout)
+    return timeout
+
+# urllib3 pools whose blocking get gives up after pool_timeout instead of waiting
+# forever; requests itself never passes a pool timeout
+class _BoundedPoolWait:
+    pool_timeout = None
+
+    def _get_conn(self, timeout=None):
+        return super()._get_conn(timeout=self.pool_timeout if timeout is None else timeout)
+
+# HTTPAdapter with blocking pools: requests beyond pool_maxsize wait for a free
+# connection, at most pool_timeout seconds (then requests.ConnectTimeout)
+class PoolAdapter(HTTPAdapter):
+    __attrs__ = HTTPAdapter.__attrs__ + ["pool_timeout"]
+
+    def __init__(self, pool_timeout=POOL_TIMEOUT, **kwargs):
+        self.pool_timeout = pool_timeout
+        super().__init__(pool_block=True, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self._bound(self.poolmanager)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        self._bound(manager)
+        return manager
+
+    def _bound(self, manager):
+        manager.pool_classes_by_scheme = {
+            scheme: type(pool_class.__name__, (_BoundedPoolWait, pool_class), {"pool_timeout": self.pool_timeout})
+            for scheme, pool_class in manager.pool_classes_by_scheme.items()}
+
+    def send(self, request, **kwargs):
+        try:
+            return super().send(request, **kwargs)
+        except EmptyPoolError as e:
+            raise requests.ConnectTimeout(e, request=request)
+
+# requests.Session shared by everything that talks to Steam: the Web API, the icon
+# host and the header image CDN. Each host gets a bounded keep-alive pool, gzip is
+# requested, identical GETs running at the same time go out once, and responses
+# that are fresh per Cache-Control/Expires are answered from memory (stale ones
+# with an ETag are revalidated). Streamed requests bypass de-duplication and cache.
+class HttpClient(requests.Session):
+    def __init__(self, per_host=POOL_PER_HOST, max_hosts=MAX_HOSTS, cache_bytes=CACHE_BYTES, pool_timeout=POOL_TIMEOUT):
+        super().__init__()
+        adapter = PoolAdapter(pool_timeout=pool_timeout, pool_connections=max_hosts, pool_maxsize=per_host)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+        self.headers["Accept-Encoding"] = "gzip, deflate"
+        self.cache_bytes = cache_bytes
+        self.cache = OrderedDict()
+        self.cached_bytes = 0
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.stats = Counter(sent=0, cache_hits=0, revalidated=0, coalesced=0)
+
+    def request(self, method, url, params=None, headers=None, stream=False, **kwargs):
+        if method.upper() != "GET" or stream:
+            return self._send(method, url, params=params, headers=headers, stream=stream, **kwargs)
+        headers = dict(headers or {})
+        prepared = requests.models.PreparedRequest()
+        prepared.prepare_url(url, params)
+        key = (prepared.url,
+               tuple(sorted((name.lower(), value) for name, value in headers.items())))
+        # The caller's own validators (e.g. ImageCache) or no-cache mean it wants the server's answer
+        use_cache = not any(name.lower() in ("if-none-match", "if-modified-since", "cache-control") for name in headers)
+
+        with self.lock:
+            entry = self.cache.get(key) if use_cache else None
+            if entry is not None and entry.expires > time.time():
+                self.cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return entry.response()
+            waiter = self.in_flight.get(key)
+            leader = waiter is None
+            if leader:
+                waiter = self.in_flight[key] = InFlight()
+            else:
+                self.stats["coalesced"] += 1
+
+        if not leader:
+            # Waits as long as the request itself could have taken
+            if not waiter.done.wait(total_timeout(kwargs.get("timeout"))):
+                raise requests.Timeout(f"Timed out waiting for the same request in flight: {url}")
+            if waiter.error is not None:
+                raise waiter.error
+            return waiter.result.response()
+
+        try:
+            if entry is not None:
+                if entry.headers.get("ETag"):
+                    headers["If-None-Match"] = entry.headers["ETag"]
+                if entry.headers.get("Last-Modified"):
+                    headers["If-Modified-Since"] = entry.headers["Last-Modified"]
+            response = self._send(method, url, params=params, headers=headers, **kwargs)
+            if entry is not None and response.status_code == 304:
+                with self.lock:
+                    # A 304 refreshes Date/Cache-Control/ETag, the body's own headers stay
+                    headers = entry.headers.copy()
+                    headers.update((name, value) for name, value in response.headers.items()
+                                   if name.lower() not in ("content-length", "content-encoding", "transfer-encoding"))
+                    entry.headers = headers
+                    entry.expires = time.time() + freshness_lifetime(entry.headers)
+                    self.stats["revalidated"] += 1
+                waiter.result = entry
+                return entry.response()
+            waiter.result = self._store(key, response)
+            return response
+        except BaseException as e:
+            waiter.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            waiter.done.set()
+
+    def _send(self, method, url, **kwargs):
+        with self.lock:
+            self.stats["sent"] += 1
+        return super().request(method, url, **kwargs)
+
+    def _store(self, key, response):
+        # Returns the response as a CachedResponse; kept only if fresh for a while
+        now = time.time()
+        lifetime = freshness_lifetime(response.headers, now) if response.status_code == 200 else 0
+        entry = CachedResponse(response, now + lifetime)
+        if lifetime > 0 and len(entry.content) <= self.cache_bytes // 4:
+            with self.lock:
+                old = self.cache.pop(key, None)
+                if old is not None:
+                    self.cached_bytes -= len(old.content)
+                self.cache[key] = entry
+                self.cached_bytes += len(entry.content)
+                while self.cached_bytes > self.cache_bytes:
+                    _, evicted = self.cache.popitem(last=False)
+                    self.cached_bytes -= len(evicted.content)
+        return entry
+
+    def clear_cache(self):
+        with self.lock:
+            self.cache.clear()
+            self.cached_bytes = 0
+
+    def summary(self):
+        with self.lock:
+            return dict(self.stats, cached=len(self.cache), cached_bytes=self.cached_bytes)
+
+_shared = None
+_shared_lock = threading.Lock()
+
+# The process-wide client, created on first use
+def shared_client():
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HttpClient()
+        return _shared
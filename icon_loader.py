@@ -0,0 +1,149 @@
+import threading
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5 import QtCore, QtGui
+
+import perf
+import steam_api
+
+# Neutral grey icon shown until the real icon has arrived
+def placeholder_icon(size=32):
+    pixmap = QtGui.QPixmap(size, size)
+    pixmap.fill(QtGui.QColor(80, 80, 80))
+    return QtGui.QIcon(pixmap)
+
+# In-memory LRU of decoded, pre-scaled icons, bounded by the pixel memory they hold.
+# Lives for the whole session so list rebuilds reuse icons instead of decoding again.
+class PixmapCache:
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, pixmap):
+        # Store the pixmap and return the QIcon built from it
+        icon = QtGui.QIcon(pixmap)
+        cost = pixmap.width() * pixmap.height() * pixmap.depth() // 8
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.total_bytes -= old[1]
+        self.entries[key] = (icon, cost)
+        self.total_bytes += cost
+        while self.total_bytes > self.max_bytes and self.entries:
+            _, (_, evicted_cost) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted_cost
+        return icon
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+
+# Downloads game icons on a bounded thread pool and hands the decoded images
+# back to the GUI thread through Qt signals. With an ImageCache, downloads go
+# through the on-disk cache first. Images are scaled to icon_size in the worker.
+class IconLoader(QtCore.QObject):
+    icon_loaded = QtCore.pyqtSignal(object, QtGui.QImage)
+    icon_failed = QtCore.pyqtSignal(object, str)
+
+    def __init__(self, max_workers=8, timeout=10, cache=None, icon_size=32, parent=None):
+        super().__init__(parent)
+        self.timeout = timeout
+        self.cache = cache
+        self.icon_size = icon_size
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="icon-loader")
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.stats = Counter(requested=0, loaded=0, failed=0, cancelled=0)
+
+    def request(self, key, url):
+        # Queue a download unless the same key is already on its way
+        with self.lock:
+            if key in self.pending:
+                return
+            future = self.executor.submit(self._fetch, key, url)
+            self.pending[key] = future
+            self.stats["requested"] += 1
+        future.add_done_callback(lambda f, key=key: self._done(key, f))
+
+    def retain(self, keys):
+        # Cancel queued downloads whose key is not in keys, e.g. rows scrolled out of view
+        with self.lock:
+            dropped = [self.pending.pop(key) for key in list(self.pending) if key not in keys]
+        self._cancel(dropped)
+
+    def cancel_pending(self):
+        # Drop queued downloads, e.g. when the list is rebuilt; running ones finish but are ignored
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        self._cancel(pending.values())
+
+    def _cancel(self, futures):
+        # Cancelling runs the done callbacks, which take the lock themselves
+        cancelled = sum(1 for future in futures if future.cancel())
+        with self.lock:
+            self.stats["cancelled"] += cancelled
+
+    def shutdown(self):
+        self.cancel_pending()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.cache is not None:
+            self.cache.flush()
+
+    def _session(self):
+        # Looked up on the first download so requests is only imported when needed
+        return steam_api.shared_session()
+
+    def _done(self, key, future):
+        with self.lock:
+            if self.pending.get(key) is future:
+                del self.pending[key]
+
+    def _fetch(self, key, url):
+        try:
+            image = self.load_image(url)
+            with self.lock:
+                self.stats["loaded"] += 1
+            self._loaded(key, image)
+        except Exception as e:
+            with self.lock:
+                self.stats["failed"] += 1
+            self.icon_failed.emit(key, str(e))
+
+    def load_image(self, url):
+        # Download (or take from the cache), decode and scale; runs on a worker thread.
+        # QImage may be decoded off the GUI thread, QPixmap may not
+        image = QtGui.QImage()
+        if self.cache is not None:
+            with perf.span("icon fetch", "network"):
+                path = self.cache.fetch(url, self._session(), self.timeout)
+            with perf.span("icon decode", "icons"):
+                loaded = image.load(path)
+        else:
+            with perf.span("icon fetch", "network"):
+                response = self._session().get(url, timeout=self.timeout)
+                response.raise_for_status()
+            with perf.span("icon decode", "icons"):
+                loaded = image.loadFromData(response.content)
+        if not loaded:
+            raise ValueError(f"invalid image data from {url}")
+        if self.icon_size:
+            with perf.span("icon decode", "icons"):
+                image = image.scaled(self.icon_size, self.icon_size, QtCore.Qt.KeepAspectRatio, QtCore.Qt.SmoothTransformation)
+        return image
+
+    def _loaded(self, key, image):
+        # Still on the worker thread; the signal is delivered in the receiver's thread
+        self.icon_loaded.emit(key, image)
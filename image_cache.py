@@ -0,0 +1,319 @@
+import hashlib
+import json
+import os
+import platform
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+
+INDEX_FILE = "index.json"
+# Save the index after this many changes instead of rewriting it for every image
+INDEX_SAVE_INTERVAL = 100
+# Taken by every process while it merges and writes the index
+LOCK_FILE = "index.lock"
+# Unindexed blobs younger than this may belong to another running launcher that
+# has not saved its index yet, so only older ones are removed as orphans
+ORPHAN_GRACE = 24 * 3600
+
+# Per-user cache directory: XDG_CACHE_HOME on Linux, LOCALAPPDATA on Windows
+def default_cache_dir():
+    if platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "gaminglauncher", "images")
+
+# Write a file via temp file + rename so a crash never leaves a truncated file behind
+def atomic_write(path, data):
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+# Exclusive lock on path between processes for the duration of the with block
+@contextmanager
+def file_lock(path):
+    with open(path, "a+b") as file:
+        if platform.system() == "Windows":
+            import msvcrt
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+# On-disk image cache shared by both launchers. Images are stored under the SHA-256
+# of their content, the index maps each URL to its blob plus ETag/Last-Modified for
+# revalidation, and the least recently used entries are evicted above max_bytes.
+# Several launchers may share the directory: flush merges the index other processes
+# saved in the meantime under a file lock, and a blob missing on disk is a miss.
+class ImageCache:
+    def __init__(self, directory=None, max_bytes=256 * 1024 * 1024, max_age=7 * 24 * 3600):
+        self.directory = directory or default_cache_dir()
+        self.blob_dir = os.path.join(self.directory, "blobs")
+        self.index_path = os.path.join(self.directory, INDEX_FILE)
+        self.lock_path = os.path.join(self.directory, LOCK_FILE)
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.lock = threading.RLock()
+        self.session = None
+        self.entries = OrderedDict()
+        # url -> hash of the entries dropped since the last flush, so merging does not revive them
+        self.removed = {}
+        self.blob_refs = Counter()
+        self.blob_sizes = {}
+        self.total_bytes = 0
+        self.unsaved_changes = 0
+        self.stats = Counter(hits=0, misses=0, revalidated=0, evictions=0, errors=0, bytes_downloaded=0)
+        # The index is read on first use, which is usually an icon worker and not startup
+        self.loaded = False
+
+    def _ensure_loaded(self):
+        with self.lock:
+            if not self.loaded:
+                self.loaded = True
+                os.makedirs(self.blob_dir, exist_ok=True)
+                self._load_index()
+
+    def _read_index(self):
+        try:
+            with open(self.index_path, "r") as file:
+                entries = json.load(file)
+        except (OSError, ValueError):
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _load_index(self):
+        # Oldest use first, so the OrderedDict is in LRU order
+        for url, entry in sorted(self._read_index().items(), key=lambda item: item[1].get("used", 0)):
+            path = self.blob_path(entry["hash"])
+            if not os.path.exists(path):
+                continue
+            self.entries[url] = entry
+            self._add_blob(entry["hash"], entry["size"])
+        self._remove_orphans()
+        # The budget may have been lowered since the last run
+        self._evict()
+
+    def _remove_orphans(self):
+        # Blobs written after the last index save are unknown and would never be evicted
+        cutoff = time.time() - ORPHAN_GRACE
+        for dir_entry in os.scandir(self.blob_dir):
+            blob_hash = dir_entry.name.split(".")[0]
+            if blob_hash not in self.blob_refs:
+                try:
+                    if dir_entry.stat().st_mtime < cutoff:
+                        os.remove(dir_entry.path)
+                except OSError:
+                    pass
+
+    def blob_path(self, blob_hash):
+        return os.path.join(self.blob_dir, f"{blob_hash}.img")
+
+    def lookup(self, url):
+        # Cached file path for url without touching the network, or None
+        with self.lock:
+            self._ensure_loaded()
+            entry = self.entries.get(url)
+            if entry is None or not self._blob_exists(url, entry):
+                return None
+            self._touch(url, entry)
+            return self.blob_path(entry["hash"])
+
+    def fetch(self, url, session=None, timeout=10):
+        # Return the local path of the image at url, downloading or revalidating as needed
+        with self.lock:
+            self._ensure_loaded()
+            entry = self.entries.get(url)
+            if entry is not None and not self._blob_exists(url, entry):
+                entry = None
+            if entry is not None and time.time() - entry.get("checked", 0) < self.max_age:
+                self.stats["hits"] += 1
+                self._touch(url, entry)
+                return self.blob_path(entry["hash"])
+            entry = dict(entry) if entry else None
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        import requests
+        session = session or self._session()
+        try:
+            response = session.get(url, headers=headers, timeout=timeout)
+            if response.status_code == 304 and entry is not None:
+                with self.lock:
+                    self.stats["revalidated"] += 1
+                    current = self.entries.get(url)
+                    if current is not None:
+                        current["checked"] = time.time()
+                        self._touch(url, current)
+                        self._changed()
+                        return self.blob_path(current["hash"])
+                entry = None
+                response = session.get(url, timeout=timeout)
+            response.raise_for_status()
+        except requests.RequestException:
+            with self.lock:
+                self.stats["errors"] += 1
+                # Serve a stale copy rather than nothing when offline
+                if entry is not None and url in self.entries:
+                    return self.blob_path(self.entries[url]["hash"])
+            raise
+
+        return self.store(url, response.content, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+
+    def store(self, url, data, etag=None, last_modified=None):
+        self._ensure_loaded()
+        blob_hash = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(blob_hash)
+        # Written under the lock so a concurrent _evict cannot delete the blob before it is indexed
+        with self.lock:
+            try:
+                # Fresh mtime so another process does not take it for an orphan
+                os.utime(path)
+            except OSError:
+                atomic_write(path, data)
+            self.stats["misses"] += 1
+            self.stats["bytes_downloaded"] += len(data)
+            old = self.entries.pop(url, None)
+            now = time.time()
+            self.entries[url] = {
+                "hash": blob_hash,
+                "size": len(data),
+                "etag": etag,
+                "last_modified": last_modified,
+                "checked": now,
+                "used": now,
+            }
+            # Added before the old blob is released, which may be the same one
+            self._add_blob(blob_hash, len(data))
+            if old is not None:
+                self._release_blob(old["hash"])
+            self._evict()
+            self._changed()
+        return path
+
+    def flush(self):
+        with self.lock:
+            if not self.unsaved_changes:
+                return
+            with file_lock(self.lock_path):
+                self._merge_index()
+                atomic_write(self.index_path, json.dumps(self.entries).encode())
+            self.removed.clear()
+            self.unsaved_changes = 0
+
+    def _merge_index(self):
+        # Adopt what other processes saved since we read the index; the more recently used entry wins
+        adopted = False
+        for url, entry in self._read_index().items():
+            current = self.entries.get(url)
+            if self.removed.get(url) == entry.get("hash") or (current is not None and current.get("used", 0) >= entry.get("used", 0)):
+                continue
+            if not os.path.exists(self.blob_path(entry["hash"])):
+                continue
+            self.entries[url] = entry
+            self._add_blob(entry["hash"], entry["size"])
+            if current is not None:
+                self._release_blob(current["hash"])
+            adopted = True
+        if adopted:
+            self.entries = OrderedDict(sorted(self.entries.items(), key=lambda item: item[1].get("used", 0)))
+            self._evict()
+
+    def clear(self):
+        with self.lock:
+            self._ensure_loaded()
+            for blob_hash in list(self.blob_refs):
+                self._delete_blob(blob_hash)
+            self.removed.update((url, entry["hash"]) for url, entry in self.entries.items())
+            self.entries.clear()
+            self.blob_refs.clear()
+            self.blob_sizes.clear()
+            self.total_bytes = 0
+            self._changed()
+        self.flush()
+
+    def summary(self):
+        with self.lock:
+            self._ensure_loaded()
+            return dict(self.stats, entries=len(self.entries), total_bytes=self.total_bytes)
+
+    def _session(self):
+        if self.session is None:
+            from http_client import shared_client
+            self.session = shared_client()
+        return self.session
+
+    def _blob_exists(self, url, entry):
+        # Another process may have evicted the blob; forget the entry then
+        if os.path.exists(self.blob_path(entry["hash"])):
+            return True
+        del self.entries[url]
+        self.removed[url] = entry["hash"]
+        self._release_blob(entry["hash"])
+        self._changed()
+        return False
+
+    def _touch(self, url, entry):
+        entry["used"] = time.time()
+        self.entries.move_to_end(url)
+        self.unsaved_changes += 1
+
+    def _changed(self):
+        self.unsaved_changes += 1
+        if self.unsaved_changes >= INDEX_SAVE_INTERVAL:
+            self.flush()
+
+    def _add_blob(self, blob_hash, size):
+        if self.blob_refs[blob_hash] == 0:
+            self.blob_sizes[blob_hash] = size
+            self.total_bytes += size
+        self.blob_refs[blob_hash] += 1
+
+    def _release_blob(self, blob_hash):
+        self.blob_refs[blob_hash] -= 1
+        if self.blob_refs[blob_hash] <= 0:
+            self._delete_blob(blob_hash)
+
+    def _delete_blob(self, blob_hash):
+        del self.blob_refs[blob_hash]
+        self.total_bytes -= self.blob_sizes.pop(blob_hash, 0)
+        try:
+            os.remove(self.blob_path(blob_hash))
+        except OSError:
+            pass
+
+    def _evict(self):
+        # Drop least recently used entries until the cache fits the budget again;
+        # the newest entry is kept even if it alone exceeds the budget
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            url, entry = self.entries.popitem(last=False)
+            self.removed[url] = entry["hash"]
+            self._release_blob(entry["hash"])
+            self.stats["evictions"] += 1
@@ -0,0 +1,143 @@
+import os
+import platform
+import shlex
+import shutil
+
+# Removed from every game's environment unless a profile sets them again: an
+# LD_PRELOAD the launcher itself runs under (overlays, recorders) or a leftover
+# GAME_MODE conflicts with what Steam and the game set up themselves
+DEFAULT_UNSET = ("LD_PRELOAD", "GAME_MODE")
+
+STEAM_RUNNING_WARNING = ("Steam is already running, so the game is started by the running client: only the "
+                         "launch profile's args reach it, not its env, wrapper, nice or cpu_affinity")
+
+# Whether a Steam client is running: Steam keeps its PID in ~/.steam/steam.pid on
+# Linux/macOS and in the registry (ActiveProcess\pid, 0 once it quit) on Windows
+def steam_client_running():
+    if platform.system() == "Windows":
+        try:
+            import winreg
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Software\Valve\Steam\ActiveProcess") as key:
+                return bool(winreg.QueryValueEx(key, "pid")[0])
+        except OSError:
+            return False
+    try:
+        with open(os.path.join(os.path.expanduser("~"), ".steam", "steam.pid")) as file:
+            pid = int(file.read().strip())
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except (OSError, ValueError):
+        return False
+    return True
+
+# Why launch will not fully apply, or None
+def launch_warning(launch):
+    if launch.tuned and steam_client_running():
+        return STEAM_RUNNING_WARNING
+    return None
+
+# Final argv and the complete environment for one game
+class ResolvedLaunch:
+    def __init__(self, command, env, missing=(), tuned=False):
+        self.command = command
+        self.env = env
+        # Wrapper tools the profile asks for but that are not on PATH
+        self.missing = list(missing)
+        # The profile sets env, a wrapper, nice or cpu_affinity
+        self.tuned = tuned
+
+# Per-game launch profiles from the "launch_profiles" config key:
+#   {"default": {...}, "<appid>": {...}}
+# A profile may set
+#   env           {"NAME": "value"}, null removes the variable
+#   wrapper       command run in front of Steam, e.g. ["gamemoderun"] or "mangohud --dlsym"
+#   args          extra arguments passed on to the game
+#   nice          niceness of the child (through nice -n)
+#   cpu_affinity  CPUs the child may run on, e.g. [2, 3] (through taskset -c)
+# A game's own profile is layered over "default": env is merged, the other keys
+# replace the default's. resolve() builds argv and environment once per game and
+# caches them; the launcher's os.environ is never touched, the child gets env=.
+#
+# env, wrapper, nice and cpu_affinity apply to the launched "steam -applaunch"
+# command. They reach the game only when that command starts the Steam client;
+# with a client already running it just hands the launch over and exits, and the
+# game inherits the client's environment. args always reach the game. Front ends
+# warn about this through launch_warning().
+class LaunchProfiles:
+    def __init__(self, profiles=None, base_env=None):
+        self.profiles = profiles or {}
+        self.base_env = base_env
+        self.cache = {}
+        self.tools = {}
+
+    def set_profiles(self, profiles):
+        self.profiles = profiles or {}
+        self.invalidate()
+
+    def invalidate(self):
+        # Drop resolved launches, e.g. after the profiles or PATH changed
+        self.cache.clear()
+        self.tools.clear()
+
+    def profile(self, app_id):
+        default = self.profiles.get("default") or {}
+        own = self.profiles.get(str(app_id)) or {}
+        profile = dict(default, **own)
+        profile["env"] = dict(default.get("env") or {}, **(own.get("env") or {}))
+        return profile
+
+    def resolve(self, app_id, command):
+        key = (app_id, tuple(command))
+        resolved = self.cache.get(key)
+        if resolved is None:
+            try:
+                resolved = self._resolve(app_id, list(command))
+            except (AttributeError, TypeError, ValueError) as e:
+                # e.g. nice: "high", an unbalanced quote in wrapper or a profile that is no object
+                raise ValueError(f"Invalid launch profile for {app_id}: {e}") from e
+            self.cache[key] = resolved
+            for tool in resolved.missing:
+                print(f"Launch profile of {app_id}: '{tool}' not found, starting without it.")
+        return resolved
+
+    def _resolve(self, app_id, command):
+        profile = self.profile(app_id)
+        env = dict(os.environ if self.base_env is None else self.base_env)
+        for name in DEFAULT_UNSET:
+            env.pop(name, None)
+        for name, value in profile["env"].items():
+            if value is None:
+                env.pop(name, None)
+            else:
+                env[name] = str(value)
+
+        # Wrappers exec the next command, so nice/taskset also apply to everything the
+        # wrapper starts (a new Steam client too), without a preexec_fn in the launcher
+        prefix, missing = [], []
+        wrappers = []
+        if profile.get("cpu_affinity"):
+            wrappers.append(["taskset", "-c", ",".join(str(int(cpu)) for cpu in profile["cpu_affinity"])])
+        if profile.get("nice"):
+            wrappers.append(["nice", "-n", str(int(profile["nice"]))])
+        wrapper = profile.get("wrapper")
+        if wrapper:
+            wrappers.append(shlex.split(wrapper) if isinstance(wrapper, str) else [str(part) for part in wrapper])
+        for tool in wrappers:
+            path = self._which(tool[0], env)
+            if path is None:
+                missing.append(tool[0])
+            else:
+                prefix += [path] + tool[1:]
+
+        # Look the program up once instead of on every spawn; left as is if it is not on PATH,
+        # so starting it raises FileNotFoundError as before
+        command[0] = self._which(command[0], env) or command[0]
+        args = [str(arg) for arg in profile.get("args") or []]
+        return ResolvedLaunch(prefix + command + args, env, missing, tuned=bool(profile["env"] or wrappers))
+
+    def _which(self, name, env):
+        key = (name, env.get("PATH"))
+        if key not in self.tools:
+            self.tools[key] = shutil.which(name, path=key[1])
+        return self.tools[key]
@@ -0,0 +1,189 @@
+import os
+import platform
+import subprocess
+import threading
+import time
+
+# How long after a launch the game may take to show up, e.g. while Steam updates it
+GAME_START_TIMEOUT = 120
+GAME_POLL_INTERVAL = 0.5
+# Steam on Linux runs every game under "reaper SteamLaunch AppId=<id> -- <command>",
+# which lives as long as the game. Other platforms have no such marker, so there only
+# the launched command itself is supervised.
+STEAM_GAME_TRACKING = platform.system() == "Linux"
+
+# PID of the reaper of the running Steam game app_id, or None
+def find_steam_game(app_id):
+    marker = f"AppId={app_id}".encode()
+    try:
+        pids = sorted(int(name) for name in os.listdir("/proc") if name.isdigit())
+    except OSError:
+        return None
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as file:
+                if marker in file.read().split(b"\0"):
+                    return pid
+        except OSError:
+            continue
+    return None
+
+# Appends bytes to path and rotates it to path.1 ... path.<backups> once it grows
+# past max_bytes, like logging.handlers.RotatingFileHandler but for raw output
+class RotatingLog:
+    def __init__(self, path, max_bytes=1024 * 1024, backups=3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.file = open(path, "ab")
+        self.size = self.file.tell()
+
+    def write(self, data):
+        if self.size and self.size + len(data) > self.max_bytes:
+            self.rotate()
+        self.file.write(data)
+        self.size += len(data)
+
+    def rotate(self):
+        self.file.close()
+        for i in range(self.backups - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{i}"):
+                os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        self.file = open(self.path, "wb")
+        self.size = 0
+
+    def close(self):
+        self.file.close()
+
+class LaunchSession:
+    def __init__(self, app_id, command, process, log_path):
+        self.app_id = app_id
+        self.command = command
+        self.process = process
+        self.pid = process.pid
+        self.log_path = log_path
+        self.started = time.time()
+        self.ended = None
+        # Of the launched command, i.e. usually steam and not the game
+        self.exit_code = None
+        # The game Steam started, once it was found; see LaunchSupervisor
+        self.game_pid = None
+
+    @property
+    def running(self):
+        return self.ended is None
+
+    @property
+    def played(self):
+        # Only launches whose game was seen running count as play sessions
+        return self.game_pid is not None
+
+    @property
+    def duration(self):
+        return (self.ended or time.time()) - self.started
+
+# Starts games and keeps track of them. Output of each child goes through a pipe
+# that a drain thread copies into a rotating log per game, so a chatty child can
+# never block on a full pipe; a second thread waits for the process, so it is
+# reaped even if a grandchild (e.g. the Steam client) keeps the pipe open.
+# on_exited(session) is called from that wait thread.
+#
+# "steam -applaunch" only hands the start over to Steam: it exits right away when
+# the client is already running, or becomes the client when it is not. With
+# find_game(app_id) -> pid or None (e.g. find_steam_game), a session instead lasts
+# as long as find_game keeps finding the game. If no game shows up within game_start_timeout, the
+# session ends with the launched command and is not played.
+class LaunchSupervisor:
+    def __init__(self, log_dir, max_log_bytes=1024 * 1024, log_backups=3, on_exited=None,
+                 find_game=None, game_start_timeout=GAME_START_TIMEOUT):
+        self.log_dir = log_dir
+        self.max_log_bytes = max_log_bytes
+        self.log_backups = log_backups
+        self.on_exited = on_exited
+        self.find_game = find_game
+        self.game_start_timeout = game_start_timeout
+        self.lock = threading.Lock()
+        # Sessions whose process has not exited yet
+        self.sessions = []
+
+    def launch(self, app_id, command, env=None, cwd=None):
+        # Raises OSError (e.g. FileNotFoundError) if the command cannot be started
+        log = RotatingLog(os.path.join(self.log_dir, f"{app_id}.log"), self.max_log_bytes, self.log_backups)
+        log.write(f"--- {time.strftime('%Y-%m-%d %H:%M:%S')} {' '.join(command)}\n".encode())
+        try:
+            process = subprocess.Popen(
+                command, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                env=env, cwd=cwd, start_new_session=os.name == "posix")
+        except OSError:
+            log.close()
+            raise
+        session = LaunchSession(app_id, command, process, log.path)
+        with self.lock:
+            self.sessions.append(session)
+        drain = threading.Thread(target=self._drain, args=(process.stdout, log), name=f"drain-{process.pid}", daemon=True)
+        drain.start()
+        threading.Thread(target=self._wait, args=(session, drain), name=f"wait-{process.pid}", daemon=True).start()
+        return session
+
+    def launch_detached(self, app_id, command, env=None, cwd=None):
+        # Start without supervision, for callers that exit right away (launcher_cli):
+        # output goes straight into the log file and nobody waits for the process
+        log = RotatingLog(os.path.join(self.log_dir, f"{app_id}.log"), self.max_log_bytes, self.log_backups)
+        try:
+            log.write(f"--- {time.strftime('%Y-%m-%d %H:%M:%S')} {' '.join(command)}\n".encode())
+            log.file.flush()
+            return subprocess.Popen(
+                command, stdin=subprocess.DEVNULL, stdout=log.file, stderr=subprocess.STDOUT,
+                env=env, cwd=cwd, start_new_session=os.name == "posix")
+        finally:
+            log.close()
+
+    def running(self, app_id=None):
+        with self.lock:
+            return [session for session in self.sessions if app_id is None or session.app_id == app_id]
+
+    def _drain(self, pipe, log):
+        try:
+            fd = pipe.fileno()
+            while True:
+                data = os.read(fd, 64 * 1024)
+                if not data:
+                    break
+                log.write(data)
+                log.file.flush()
+        except OSError:
+            pass
+        finally:
+            pipe.close()
+            log.close()
+
+    def _wait(self, session, drain):
+        if self.find_game is None:
+            session.exit_code = session.process.wait()
+        else:
+            self._wait_for_game(session)
+        session.ended = time.time()
+        with self.lock:
+            self.sessions.remove(session)
+        # Give the drain thread a moment to write the last output before reporting
+        drain.join(timeout=1)
+        if self.on_exited:
+            self.on_exited(session)
+        # Still running if it became the Steam client; reap it whenever that exits
+        session.process.wait()
+
+    def _wait_for_game(self, session):
+        deadline = time.monotonic() + self.game_start_timeout
+        while True:
+            if session.exit_code is None:
+                session.exit_code = session.process.poll()
+            if session.game_pid is None:
+                session.game_pid = self.find_game(session.app_id)
+                if session.game_pid is None and session.exit_code is not None and time.monotonic() > deadline:
+                    return
+            elif self.find_game(session.app_id) is None:
+                return
+            time.sleep(GAME_POLL_INTERVAL)
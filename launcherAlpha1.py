@@ -1,62 +1,87 @@
 import os
-import json
-import requests
 import subprocess
 import sys
-from PyQt5 import QtWidgets, QtGui, QtCore
+import importlib.util
 import platform
+from array import array
+import startup_profile
 
 # Function to install missing required packages
 def install_missing_packages():
     required_packages = ["requests", "PyQt5"]
     for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
+        # find_spec only locates the package instead of importing it
+        if importlib.util.find_spec(package) is None:
             print(f"Package {package} not found. Installing...")
             subprocess.check_call([sys.executable, "-m", "pip", "install", package])
 
 # Ensure all required packages are installed at the start
 install_missing_packages()
+startup_profile.mark("dependency check")
 
-CONFIG_FILE = "launcher_config.json"
+from PyQt5 import QtWidgets, QtGui, QtCore
+startup_profile.mark("import PyQt5")
+from icon_loader import IconLoader, PixmapCache, placeholder_icon
+from launch_profiles import launch_warning
+from launcher_core import LauncherCore
+from library_worker import LibraryFetchWorker
+from steam_api import header_url
+startup_profile.mark("import launcher modules")
 
-# Save configuration to the JSON file
-def save_config(config):
-    with open(CONFIG_FILE, "w") as file:
-        json.dump(config, file)
-
-# Load configuration from the JSON file if it exists, otherwise return an empty dict
-def load_config():
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r") as file:
-            return json.load(file)
-    return {}
-
-# Function to clean up problematic environment variables
-def clean_environment():
-    if "LD_PRELOAD" in os.environ:
-        print("Clearing LD_PRELOAD to avoid conflicts.")
-        del os.environ["LD_PRELOAD"]
-    if "GAME_MODE" in os.environ:
-        print("Clearing GameMode environment variable.")
-        del os.environ["GAME_MODE"]
+CONFIG_FILE = "launcher_config.json"
 
 class GamingLauncher(QtWidgets.QMainWindow):
+    # Emitted by the supervisor's wait thread, delivered on the GUI thread
+    session_exited = QtCore.pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Gaming Launcher Advanced")
         self.setGeometry(100, 100, 900, 700)
 
+        # Config, library snapshot, installed scan, launching and the image cache are shared
+        # with launcherAlpha2 and launcher_cli through LauncherCore
+        self.core = LauncherCore(CONFIG_FILE, on_exited=self.session_exited.emit)
         # Load the user configuration settings
-        self.config = load_config()
+        # Changes are batched and written atomically in the background
+        self.config_store = self.core.config_store
+        self.config = self.core.config
         self.steam_api_key = self.config.get("steam_api_key", "")
         self.steam_profile_id = self.config.get("steam_profile_id", "")
         self.user_profile = self.config.get("user_profile", {"name": "Guest", "avatar": None})
 
+        # Game records; the filtered view is an array of row numbers into steam_games
         self.steam_games = []
-        self.filtered_games = []
-        self.favorites = self.config.get("favorites", [])
+        self.rows_by_appid = {}
+        self.filtered_rows = array("i")
+        self.favorites = self.core.favorites
+        # Runs the library download and the installed scan in the background
+        self.refresh_worker = None
+
+        # Local library database; category, search and favorites are answered by indexed queries
+        self.library_db = self.core.library()
+
+        # Launched games: output goes to rotating logs, duration and exit code to the database
+        self.launch_supervisor = self.core.launch_supervisor
+        self.session_exited.connect(self.on_session_exited)
+        # Per-game launch profiles (env, wrappers like gamemoderun, nice/CPU affinity, args),
+        # resolved once per game; the launcher's own environment is left alone
+        self.launch_profiles = self.core.launch_profiles
+
+        # Shared on-disk cache for the header images
+        self.image_cache = self.core.icon_cache()
+        # Header images are loaded in the background, only for the rows in and near the viewport
+        self.icon_size = 32
+        self.icon_prefetch_rows = self.config.get("icon_prefetch_rows", 10)
+        self.pixmap_cache = PixmapCache(max_bytes=self.config.get("icon_memory_mb", 32) * 1024 * 1024)
+        self.placeholder_icon = placeholder_icon(self.icon_size)
+        self.icon_loader = IconLoader(max_workers=self.config.get("icon_concurrency", 8), cache=self.image_cache,
+                                      icon_size=self.icon_size)
+        self.icon_loader.icon_loaded.connect(self.on_icon_loaded)
+        self.icon_loader.icon_failed.connect(self.on_icon_failed)
+        self.failed_icons = set()
+        # List items of the games currently shown
+        self.items_by_appid = {}
 
         # Initialize the UI
         self.initUI()
@@ -90,17 +115,28 @@ class GamingLauncher(QtWidgets.QMainWindow):
         self.search_bar.textChanged.connect(self.filter_games)
         self.layout.addWidget(self.search_bar)
 
-        # Filter dropdown for game categories (All, Recently Played, Installed)
+        # Filter dropdown for game categories (All, Recently Played, Installed, Favorites);
+        # the item data is the LibraryDB.query category
         self.filter_dropdown = QtWidgets.QComboBox()
-        self.filter_dropdown.addItem("All")
-        self.filter_dropdown.addItem("Recently Played")
-        self.filter_dropdown.addItem("Installed")
+        self.filter_dropdown.addItem("All", "all")
+        self.filter_dropdown.addItem("Recently Played", "recent")
+        self.filter_dropdown.addItem("Installed", "installed")
+        self.filter_dropdown.addItem("Favorites", "favorites")
         self.filter_dropdown.currentIndexChanged.connect(self.filter_games)
         self.layout.addWidget(self.filter_dropdown)
 
         # List widget to display games
         self.game_list = QtWidgets.QListWidget()
+        self.game_list.setUniformItemSizes(True)
+        self.game_list.setIconSize(QtCore.QSize(self.icon_size, self.icon_size))
         self.layout.addWidget(self.game_list)
+        # Icons are requested once scrolling or a rebuild has settled
+        self.viewport_timer = QtCore.QTimer(self)
+        self.viewport_timer.setSingleShot(True)
+        self.viewport_timer.setInterval(30)
+        self.viewport_timer.timeout.connect(self.update_visible_icons)
+        self.game_list.verticalScrollBar().valueChanged.connect(lambda value: self.viewport_timer.start())
+        self.game_list.verticalScrollBar().rangeChanged.connect(lambda low, high: self.viewport_timer.start())
 
         # Profile section with avatar and username
         self.profile_widget = QtWidgets.QWidget()
@@ -142,8 +178,7 @@ class GamingLauncher(QtWidgets.QMainWindow):
         key, ok = QtWidgets.QInputDialog.getText(self, "Steam API Key", "Enter your Steam API Key:")
         if ok and key:
             self.steam_api_key = key
-            self.config["steam_api_key"] = key
-            save_config(self.config)
+            self.config_store.set("steam_api_key", key)
             QtWidgets.QMessageBox.information(self, "Success", "Steam API Key has been set.")
 
     def set_steam_profile_id(self):
@@ -151,8 +186,7 @@ class GamingLauncher(QtWidgets.QMainWindow):
         profile_id, ok = QtWidgets.QInputDialog.getText(self, "Steam Profile ID", "Enter your Steam Profile ID:")
         if ok and profile_id:
             self.steam_profile_id = profile_id
-            self.config["steam_profile_id"] = profile_id
-            save_config(self.config)
+            self.config_store.set("steam_profile_id", profile_id)
             QtWidgets.QMessageBox.information(self, "Success", "Steam Profile ID has been set.")
 
     def create_user_profile(self):
@@ -166,8 +200,7 @@ class GamingLauncher(QtWidgets.QMainWindow):
             return
 
         self.user_profile = {"name": name, "avatar": avatar_path}
-        self.config["user_profile"] = self.user_profile
-        save_config(self.config)
+        self.config_store.set("user_profile", self.user_profile)
         self.update_profile_ui()
 
     def update_profile_ui(self):
@@ -181,80 +214,113 @@ class GamingLauncher(QtWidgets.QMainWindow):
             self.avatar_label.clear()
 
     def refresh_library(self):
-        # Refresh the Steam game library using the API
-        if not self.steam_api_key or not self.steam_profile_id:
+        # Refresh the Steam game library of all configured accounts in the background
+        accounts = self.core.accounts()
+        if not accounts or not all(account["api_key"] for account in accounts):
             QtWidgets.QMessageBox.warning(self, "Error", "Please set your Steam API Key and Profile ID first.")
             return
+        if self.refresh_worker is not None:
+            return
 
-        try:
-            url = f"https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/?key={self.steam_api_key}&steamid={self.steam_profile_id}&include_appinfo=true"
-            response = requests.get(url)
-            response.raise_for_status()
-
-            data = response.json()
-            games = data.get('response', {}).get('games', [])
-
-            if not games:
-                QtWidgets.QMessageBox.warning(self, "No Games Found", "No games were found in your Steam library. Please check your Steam ID or API key.")
-                return
+        core = self.core
+        old_games = self.steam_games
+
+        def fetch(progress, cancel_event, on_games):
+            # Worker thread: download, store the snapshot as launcherAlpha2 does and scan the installed games
+            fetched, errors = core.fetch_accounts(accounts, progress, cancel_event)
+            games, _ = core.store_fetched(fetched, old_games)
+            installed = core.install_scanner.scan()
+            return games, errors, {appid: info["size_on_disk"] for appid, info in installed.items()}
+
+        worker = LibraryFetchWorker(fetch)
+        worker.signals.finished.connect(self.on_library_fetched)
+        worker.signals.failed.connect(self.on_library_failed)
+        worker.signals.cancelled.connect(self.on_library_failed)
+        self.refresh_worker = worker
+        self.refresh_button.setEnabled(False)
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def on_library_fetched(self, result):
+        games, errors, installed = result
+        self.refresh_worker = None
+        self.refresh_button.setEnabled(True)
+        if not games:
+            QtWidgets.QMessageBox.warning(self, "No Games Found", "No games were found in your Steam library. Please check your Steam ID or API key.")
+            return
+        for steam_id, error in errors.items():
+            print(f"Failed to fetch the library of {steam_id}: {error}")
 
-            self.steam_games = games
-            self.filtered_games = games
-            self.update_game_list()
+        self.steam_games = games
+        self.rows_by_appid = {game.get("appid"): row for row, game in enumerate(games)}
+        self.core.installed = installed
+        self.core.sync_flags()
+        self.filter_games()
 
-        except requests.RequestException as e:
-            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to fetch Steam library: {e}")
+    def on_library_failed(self, error=None):
+        self.refresh_worker = None
+        self.refresh_button.setEnabled(True)
+        if error:
+            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to fetch Steam library: {error}")
 
     def update_game_list(self):
-        # Update the list of games shown in the UI
+        # Update the list of games shown in the UI; icons come from the pixmap cache or later
+        # from the icon loader, so building the list never touches the network or the disk
         self.game_list.clear()
-        for game in self.filtered_games:
+        self.items_by_appid = {}
+        for row in self.filtered_rows:
+            game = self.steam_games[row]
             name = game.get('name', f"Steam Game {game.get('appid', '')}")
             app_id = game.get('appid', '')
+            if self.launch_supervisor.running(app_id):
+                name = f"{name}  (running)"
 
             item = QtWidgets.QListWidgetItem(name)
-            icon_url = f"https://cdn.cloudflare.steamstatic.com/steam/apps/{app_id}/header.jpg"
-            icon_path = f"cache/{app_id}.jpg"
-
-            if not os.path.exists("cache"):
-                os.mkdir("cache")
-
-            if not os.path.exists(icon_path):
-                try:
-                    img_data = requests.get(icon_url).content
-                    with open(icon_path, "wb") as img_file:
-                        img_file.write(img_data)
-                except Exception as e:
-                    print(f"Error downloading icon: {e}")
-                    continue
-
-            if os.path.exists(icon_path):
-                icon = QtGui.QIcon(icon_path)
+            icon = self.pixmap_cache.get((app_id, self.icon_size))
+            if icon is not None:
                 item.setIcon(icon)
-
+            elif app_id not in self.failed_icons:
+                item.setIcon(self.placeholder_icon)
             item.setData(QtCore.Qt.UserRole, app_id)
 
             self.game_list.addItem(item)
+            self.items_by_appid[app_id] = item
+        self.viewport_timer.start()
+
+    def update_visible_icons(self):
+        # Drop downloads for rows scrolled away and request the rows in and around the viewport
+        count = self.game_list.count()
+        if count == 0:
+            self.icon_loader.retain(set())
+            return
+        first = max(self.game_list.indexAt(QtCore.QPoint(1, 1)).row(), 0)
+        last = self.game_list.indexAt(QtCore.QPoint(1, self.game_list.viewport().height() - 1)).row()
+        last = count - 1 if last < 0 else last
+        wanted = [self.game_list.item(row).data(QtCore.Qt.UserRole)
+                  for row in range(max(first - self.icon_prefetch_rows, 0), min(last + self.icon_prefetch_rows + 1, count))]
+        self.icon_loader.retain(set(wanted))
+        for app_id in wanted:
+            if app_id not in self.failed_icons and self.pixmap_cache.get((app_id, self.icon_size)) is None:
+                self.icon_loader.request(app_id, header_url(app_id))
+
+    def on_icon_loaded(self, app_id, image):
+        icon = self.pixmap_cache.put((app_id, self.icon_size), QtGui.QPixmap.fromImage(image))
+        item = self.items_by_appid.get(app_id)
+        if item is not None:
+            item.setIcon(icon)
+
+    def on_icon_failed(self, app_id, error):
+        # The game stays in the list, just without an icon
+        print(f"Error downloading icon: {error}")
+        self.failed_icons.add(app_id)
+        item = self.items_by_appid.get(app_id)
+        if item is not None:
+            item.setIcon(QtGui.QIcon())
 
     def filter_games(self):
         # Filter the list of games based on search and filter criteria
-        search_term = self.search_bar.text().lower()
-        filter_index = self.filter_dropdown.currentIndex()
-
-        self.filtered_games = [
-            game for game in self.steam_games
-            if search_term in game['name'].lower()
-        ]
-
-        if filter_index == 1:  # Recently Played filter
-            self.filtered_games = [
-                game for game in self.filtered_games if game.get('playtime_2weeks', 0) > 0
-            ]
-        elif filter_index == 2:  # Installed filter
-            self.filtered_games = [
-                game for game in self.filtered_games if game.get('has_community_visible_stats', False)
-            ]
-
+        appids = self.library_db.query(self.filter_dropdown.currentData(), self.search_bar.text())
+        rows_by_appid = self.rows_by_appid
+        self.filtered_rows = array("i", [rows_by_appid[appid] for appid in appids if appid in rows_by_appid])
         self.update_game_list()
 
     def show_context_menu(self, pos):
@@ -281,14 +347,36 @@ class GamingLauncher(QtWidgets.QMainWindow):
 
         print(f"Starting game with App ID: {app_id}")
 
-        # Clean up environment variables before launching the game
-        clean_environment()
-
-        # Launch Steam in silent mode with the game
+        # Launch Steam in silent mode with the game; -applaunch passes profile args on to the game
         try:
-            subprocess.Popen(["steam", "-silent", f"steam://run/{app_id}"])
-        except Exception as e:
+            launch = self.launch_profiles.resolve(app_id, ["steam", "-silent", "-applaunch", str(app_id)])
+            warning = launch_warning(launch)
+            self.launch_supervisor.launch(app_id, launch.command, env=launch.env)
+        except ValueError as e:
+            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to start the game: {e}\nPlease fix launch_profiles in the config.")
+            return
+        except OSError as e:
             QtWidgets.QMessageBox.critical(self, "Error", f"Failed to start the game: {e}")
+            return
+        if warning:
+            print(warning)
+        self.set_running(app_id, True)
+
+    def on_session_exited(self, session):
+        if session.played:
+            print(f"Game {session.app_id} exited after {session.duration:.0f}s")
+            self.library_db.record_session(session)
+        else:
+            print(f"Game {session.app_id}: the game process could not be tracked, the launch is not recorded as played")
+        self.set_running(session.app_id, bool(self.launch_supervisor.running(session.app_id)))
+
+    def set_running(self, app_id, running):
+        # Mark the game's list item while it runs
+        item = self.items_by_appid.get(app_id)
+        if item is not None:
+            row = self.rows_by_appid.get(app_id)
+            name = self.steam_games[row].get("name", item.text()) if row is not None else item.text()
+            item.setText(f"{name}  (running)" if running else name)
 
     def add_to_favorites(self):
         # Add the selected game to the favorites list
@@ -297,15 +385,22 @@ class GamingLauncher(QtWidgets.QMainWindow):
             return
 
         app_id = item.data(QtCore.Qt.UserRole)
-        if app_id in self.favorites:
+        if not self.config_store.add_favorite(app_id):
             return
-
-        self.favorites.append(app_id)
-        self.config["favorites"] = self.favorites
-        save_config(self.config)
+        self.library_db.set_favorite(app_id)
+        if self.filter_dropdown.currentData() == "favorites":
+            self.filter_games()
 
         QtWidgets.QMessageBox.information(self, "Success", "Game added to favorites.")
 
+    def closeEvent(self, event):
+        # Stop downloads, persist the image cache index and pending config changes before quitting
+        if self.refresh_worker is not None:
+            self.refresh_worker.cancel()
+        self.icon_loader.shutdown()
+        self.core.close()
+        super().closeEvent(event)
+
     def open_steam_profile(self):
         # Open the user's Steam profile in the default browser
         profile_url = f"https://steamcommunity.com/profiles/{self.steam_profile_id}"
@@ -318,7 +413,11 @@ class GamingLauncher(QtWidgets.QMainWindow):
 
 def main():
     app = QtWidgets.QApplication(sys.argv)
+    startup_profile.mark("QApplication")
     launcher = GamingLauncher()
+    startup_profile.mark("window constructed")
+    # With --profile-startup the launcher quits after the first paint
+    startup_profile.watch_first_paint(launcher, quit_after=("first paint",))
     launcher.show()
     sys.exit(app.exec_())
 
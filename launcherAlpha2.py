@@ -1,46 +1,43 @@
 import os
-import json
-import requests
 import subprocess
 import sys
-from PyQt5 import QtWidgets, QtGui, QtCore
+import importlib.util
 import platform
+import time
+from array import array
+from itertools import compress
+import startup_profile
 
 # Funktion zum Installieren fehlender Pakete
 def install_missing_packages():
     required_packages = ["requests", "PyQt5"]
     for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
+        # find_spec sucht das Paket nur, statt es (teuer) zu importieren
+        if importlib.util.find_spec(package) is None:
             print(f"Package {package} not found. Installing...")
             subprocess.check_call([sys.executable, "-m", "pip", "install", package])
 
 # Stelle sicher, dass alle benötigten Pakete zu Beginn installiert werden
 install_missing_packages()
+startup_profile.mark("dependency check")
 
-CONFIG_FILE = "launcher_config.json"
-
-# Konfiguration in der JSON-Datei speichern
-def save_config(config):
-    with open(CONFIG_FILE, "w") as file:
-        json.dump(config, file)
-
-# Konfiguration aus der JSON-Datei laden, falls sie existiert, andernfalls ein leeres Dict zurückgeben
-def load_config():
-    if os.path.exists(CONFIG_FILE):
-        with open(CONFIG_FILE, "r") as file:
-            return json.load(file)
-    return {}
-
-# Funktion zum Bereinigen von problematischen Umgebungsvariablen
-def clean_environment():
-    if "LD_PRELOAD" in os.environ:
-        print("Clearing LD_PRELOAD to avoid conflicts.")
-        del os.environ["LD_PRELOAD"]
-    if "GAME_MODE" in os.environ:
-        print("Clearing GameMode environment variable.")
-        del os.environ["GAME_MODE"]
+from PyQt5 import QtWidgets, QtGui, QtCore
+startup_profile.mark("import PyQt5")
+from icon_loader import IconLoader, PixmapCache, placeholder_icon
+from steam_api import icon_url
+from game_model import AppIdRole, GameFilterModel, GameListModel
+from game_sort import SortKeys
+from search_index import SearchIndex
+from search_pipeline import SearchPipeline
+from launcher_core import CONFIG_FILE, LauncherCore
+from perf_overlay import PerfOverlay
+from library_worker import InstallScanWorker, LibraryFetchWorker
+from steam_watcher import SteamLibraryWatcher
+import perf
+startup_profile.mark("import launcher modules")
+
+# Zeilen, die während des Downloads auf einmal ins Modell eingefügt werden
+STREAM_CHUNK = 2000
 
 # Hilfsfunktion, um die richtige Ausführung von Programmen auf verschiedenen Plattformen zu gewährleisten
 def open_url_platform_compatible(url):
@@ -49,34 +46,104 @@ def open_url_platform_compatible(url):
     elif platform.system() == "Windows":
         subprocess.run(["start", url], shell=True)  # Windows verwendet start
 
-# Funktion zum Starten eines Spiels über Steam
-def start_game(app_id):
-    if platform.system() == "Linux":
-        # Steam im Hintergrund starten (ohne UI sichtbar)
-        subprocess.Popen(["steam", "-applaunch", str(app_id)], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-    elif platform.system() == "Windows":
-        # Steam im Hintergrund starten (ohne UI sichtbar)
-        subprocess.Popen(["steam", "-applaunch", str(app_id)], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-
 class GamingLauncher(QtWidgets.QMainWindow):
+    # Vom Warte-Thread des Supervisors gesendet, landet im GUI-Thread
+    session_exited = QtCore.pyqtSignal(object)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Gaming Launcher Advanced")
         self.setGeometry(100, 100, 900, 700)
 
-        # Benutzerkonfiguration laden
-        self.config = load_config()
+        # Alles ohne GUI (Konfiguration, Bibliothek, Installationsstand, Starten) steckt in LauncherCore,
+        # den auch launcher_cli benutzt. Konfigurationsänderungen werden gebündelt und atomar gespeichert
+        self.core = LauncherCore(CONFIG_FILE, on_exited=self.session_exited.emit)
+        self.config_store = self.core.config_store
+        self.config = self.core.config
         self.steam_api_key = self.config.get("steam_api_key", "")
         self.steam_profile_id = self.config.get("steam_profile_id", "")
         self.user_profile = self.config.get("user_profile", {"name": "Guest", "avatar": None})
 
         self.steam_games = []
-        self.filtered_games = []
-        self.favorites = self.config.get("favorites", [])
+        self.search_index = SearchIndex([])
+        # Sortierschlüssel werden einmal pro Bibliotheksstand berechnet ("sort_order" wie LibraryDB.SORT_ORDERS)
+        self.sort_keys = SortKeys([], [], self.core.favorites)
+        self.sort_order = self.config.get("sort_order", "name")
+        self.fuzzy_search = self.config.get("fuzzy_search", True)
+        # Gefilterte Ansicht als Zeilennummern (array "i") in steam_games, keine Kopie der Spiele
+        self.filtered_rows = array("i")
+        # Maske der gewählten Kategorie, ein Byte pro Zeile in steam_games; None für "All"
+        self.category_rows = None
+        self.favorites = self.core.favorites
+
+        # Zuletzt geladene Bibliothek, damit der Start ohne Netzwerk auskommt.
+        # Wird erst nach dem ersten Anzeigen des Fensters geöffnet
+        self.library_db = None
+
+        # Bibliotheksabruf läuft in einem Worker mit der wiederverwendeten Session des Kerns
+        # (erst beim ersten Abruf erzeugt, damit requests nicht beim Start importiert wird)
+        self.refresh_worker = None
+        # Alle noch laufenden Worker, auch abgebrochene: erst ihr letztes Signal gibt sie frei,
+        # sonst würden ihre Signalobjekte gelöscht, während run() noch auf den Socket wartet
+        self.fetch_workers = set()
+        # Ohne gespeicherte Bibliothek erscheinen die Spiele schon während des Downloads;
+        # geparste Blöcke werden gesammelt und höchstens alle 100 ms eingefügt, in Portionen
+        # von STREAM_CHUNK Zeilen je Durchlauf der Ereignisschleife
+        self.streamed_games = []
+        self.showing_streamed_games = False
+        self.stream_timer = QtCore.QTimer(self)
+        self.stream_timer.setSingleShot(True)
+        self.stream_timer.timeout.connect(self.show_streamed_games)
+
+        # Installierte Spiele aus den lokalen Steam-Manifesten; "steam_roots" überschreibt die Suchpfade
+        self.install_scanner = self.core.install_scanner
+        self.install_scan_running = False
+        # Beobachtet danach die appmanifest-Dateien ("install_watch": "auto" = inotify, sonst Polling)
+        self.install_watcher = SteamLibraryWatcher(
+            self.install_scanner, mode=self.config.get("install_watch", "auto"),
+            poll_ms=self.config.get("install_poll_ms", 5000))
+        self.install_watcher.installed_changed.connect(self.on_installed_changed)
+
+        # Gestartete Spiele: Ausgabe in rotierende Logs, Laufzeit und Exit-Code in die Datenbank
+        # Startprofile pro Spiel (Umgebung, Wrapper wie gamemoderun, nice/CPU-Affinität, Argumente)
+        # werden einmal aufgelöst, die Umgebung des Launchers bleibt unverändert
+        self.launch_supervisor = self.core.launch_supervisor
+        self.session_exited.connect(self.on_session_exited)
+
+        # Icons werden im Hintergrund geladen und per Signal eingesetzt
+        self.icon_size = 32
+        self.placeholder_icon = placeholder_icon(self.icon_size)
+        self.pixmap_cache = PixmapCache(max_bytes=self.config.get("icon_memory_mb", 32) * 1024 * 1024)
+        self.image_cache = self.core.icon_cache()
+        self.icon_loader = IconLoader(max_workers=self.config.get("icon_concurrency", 8), cache=self.image_cache, icon_size=self.icon_size)
+        self.icon_loader.icon_loaded.connect(self.on_icon_loaded)
+        self.icon_loader.icon_failed.connect(self.on_icon_failed)
+        self.failed_icons = set()
+        # Nur sichtbare Zeilen plus ein Vorlauf laden; gezeichnete Zeilen werden für die Statistik gezählt
+        self.icon_prefetch_rows = self.config.get("icon_prefetch_rows", 20)
+        self.rendered_rows = set()
+
+        # Suche läuft entprellt im Hintergrund, nur das Ergebnis wird im GUI-Thread angewendet
+        self.search_pipeline = SearchPipeline(self.matching_rows, debounce_ms=self.config.get("search_debounce_ms", 150))
+        self.search_pipeline.results_ready.connect(self.apply_search_results)
 
         # Initialisiere die UI
         self.initUI()
 
+        # Performance-Overlay (F12): misst die heißen Pfade und zeigt Ruckler samt Ursache;
+        # ausgeschaltet kosten die Messpunkte praktisch nichts
+        self.perf_overlay = PerfOverlay(self, stall_ms=self.config.get("perf_stall_ms", 50))
+        self.refresh_started = None
+        if self.config.get("perf_overlay", False):
+            self.perf_overlay_action.setChecked(True)
+        if self.config.get("view_mode", "list") == "grid":
+            self.grid_view_action.setChecked(True)
+
+        # Erst das Fenster zeichnen, dann den lokalen Stand anzeigen und im Hintergrund abgleichen.
+        # Der Timer greift, falls das Fenster (z.B. minimiert) nie gezeichnet wird
+        self.snapshot_scheduled = False
+        QtCore.QTimer.singleShot(500, self.schedule_library_snapshot)
+
     def initUI(self):
         # Haupt-UI-Komponenten und Layout einrichten
         self.central_widget = QtWidgets.QWidget()
@@ -87,6 +154,24 @@ class GamingLauncher(QtWidgets.QMainWindow):
         menubar = self.menuBar()
         settings_menu = menubar.addMenu("Settings")
 
+        # Ansicht: Performance-Overlay und Export der Messwerte als Chrome-Trace
+        view_menu = menubar.addMenu("View")
+        self.grid_view_action = QtWidgets.QAction("Grid View", self)
+        self.grid_view_action.setCheckable(True)
+        self.grid_view_action.setShortcut("Ctrl+G")
+        self.grid_view_action.toggled.connect(self.set_grid_view)
+        view_menu.addAction(self.grid_view_action)
+
+        self.perf_overlay_action = QtWidgets.QAction("Performance Overlay", self)
+        self.perf_overlay_action.setCheckable(True)
+        self.perf_overlay_action.setShortcut("F12")
+        self.perf_overlay_action.toggled.connect(lambda checked: self.perf_overlay.set_active(checked))
+        view_menu.addAction(self.perf_overlay_action)
+
+        export_trace_action = QtWidgets.QAction("Export Performance Trace...", self)
+        export_trace_action.triggered.connect(self.export_perf_trace)
+        view_menu.addAction(export_trace_action)
+
         # Aktionen für Steam API Key und Profile ID
         set_api_key_action = QtWidgets.QAction("Set Steam API Key", self)
         set_api_key_action.triggered.connect(self.set_steam_api_key)
@@ -96,6 +181,11 @@ class GamingLauncher(QtWidgets.QMainWindow):
         set_profile_id_action.triggered.connect(self.set_steam_profile_id)
         settings_menu.addAction(set_profile_id_action)
 
+        # Weitere Konten werden parallel abgerufen und zu einer Bibliothek zusammengeführt
+        add_account_action = QtWidgets.QAction("Add Steam Account", self)
+        add_account_action.triggered.connect(self.add_steam_account)
+        settings_menu.addAction(add_account_action)
+
         create_profile_action = QtWidgets.QAction("Create Profile", self)
         create_profile_action.triggered.connect(self.create_user_profile)
         settings_menu.addAction(create_profile_action)
@@ -103,20 +193,66 @@ class GamingLauncher(QtWidgets.QMainWindow):
         # Suchleiste für die Filterung der Spiele
         self.search_bar = QtWidgets.QLineEdit()
         self.search_bar.setPlaceholderText("Search for a game...")
-        self.search_bar.textChanged.connect(self.filter_games)
+        self.search_bar.textChanged.connect(self.search_pipeline.submit)
         self.layout.addWidget(self.search_bar)
 
-        # Dropdown für Spielkategorien (Alle, Kürzlich Gespielt, Installiert)
+        # Dropdown für Spielkategorien (Alle, Kürzlich Gespielt, Installiert, Favoriten);
+        # die Daten sind die Kategorien von LibraryDB.query
         self.filter_dropdown = QtWidgets.QComboBox()
-        self.filter_dropdown.addItem("All")
-        self.filter_dropdown.addItem("Recently Played")
-        self.filter_dropdown.addItem("Installed")
-        self.filter_dropdown.currentIndexChanged.connect(self.filter_games)
-        self.layout.addWidget(self.filter_dropdown)
-
-        # List-Widget für die Anzeige der Spiele
-        self.game_list = QtWidgets.QListWidget()
-        self.layout.addWidget(self.game_list)
+        self.filter_dropdown.addItem("All", "all")
+        self.filter_dropdown.addItem("Recently Played", "recent")
+        self.filter_dropdown.addItem("Installed", "installed")
+        self.filter_dropdown.addItem("Favorites", "favorites")
+        self.filter_dropdown.currentIndexChanged.connect(self.on_category_changed)
+
+        # Sortierung daneben; die Daten sind die Sortierungen von LibraryDB.SORT_ORDERS
+        self.sort_dropdown = QtWidgets.QComboBox()
+        self.sort_dropdown.addItem("Name", "name")
+        self.sort_dropdown.addItem("Total Playtime", "playtime")
+        self.sort_dropdown.addItem("Playtime (2 Weeks)", "recent_playtime")
+        self.sort_dropdown.addItem("Last Played", "last_played")
+        self.sort_dropdown.addItem("Favorites First", "favorites")
+        self.sort_dropdown.setCurrentIndex(max(self.sort_dropdown.findData(self.sort_order), 0))
+        self.sort_order = self.sort_dropdown.currentData()
+        self.sort_dropdown.currentIndexChanged.connect(self.on_sort_changed)
+        filter_row = QtWidgets.QHBoxLayout()
+        filter_row.addWidget(self.filter_dropdown, 1)
+        filter_row.addWidget(self.sort_dropdown)
+        self.layout.addLayout(filter_row)
+
+        # Listenansicht für die Spiele; das Modell wird einmal befüllt, Filter setzen nur die sichtbaren Zeilen
+        self.game_model = GameListModel(icon_provider=self.game_icon)
+        self.filter_model = GameFilterModel(self.game_model)
+        # Einspaltige QTableView mit fester Zeilenhöhe statt QTreeView/QListView: die legen nach jedem
+        # Filter alle Zeilen neu an (ein Aufruf ins Python-Modell pro Zeile, ~25 ms bei 10.000 Spielen),
+        # die Tabelle merkt sich nur die Zeilenzahl und fragt allein die sichtbaren Zeilen ab
+        self.game_list = QtWidgets.QTableView()
+        self.game_list.setModel(self.filter_model)
+        self.game_list.horizontalHeader().hide()
+        self.game_list.horizontalHeader().setStretchLastSection(True)
+        self.game_list.verticalHeader().hide()
+        self.game_list.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.game_list.verticalHeader().setDefaultSectionSize(self.icon_size + 4)
+        self.game_list.setShowGrid(False)
+        self.game_list.setWordWrap(False)
+        self.game_list.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.game_list.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.game_list.setIconSize(QtCore.QSize(self.icon_size, self.icon_size))
+        self.game_list.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+        # Liste und Kachelansicht (erst beim ersten Umschalten erzeugt) teilen sich Platz und Filtermodell
+        self.view_stack = QtWidgets.QStackedWidget()
+        self.view_stack.addWidget(self.game_list)
+        self.game_grid = None
+        self.layout.addWidget(self.view_stack)
+
+        # Nach Scrollen, Filtern oder Größenänderung die Icon-Warteschlange an den sichtbaren Bereich anpassen
+        self.viewport_timer = QtCore.QTimer(self)
+        self.viewport_timer.setSingleShot(True)
+        self.viewport_timer.setInterval(30)
+        self.viewport_timer.timeout.connect(self.update_visible_icons)
+        self.game_list.verticalScrollBar().valueChanged.connect(lambda value: self.viewport_timer.start())
+        self.game_list.verticalScrollBar().rangeChanged.connect(lambda low, high: self.viewport_timer.start())
+        self.filter_model.rows_changed.connect(lambda: self.viewport_timer.start())
 
         # Profilbereich mit Avatar und Benutzernamen
         self.profile_widget = QtWidgets.QWidget()
@@ -154,20 +290,38 @@ class GamingLauncher(QtWidgets.QMainWindow):
         self.game_list.customContextMenuRequested.connect(self.show_context_menu)
 
         # Doppelklick-Handler für das Starten eines Spiels
-        self.game_list.itemDoubleClicked.connect(self.launch_game)
+        self.game_list.doubleClicked.connect(self.launch_game)
 
-    def launch_game(self, item):
+    def launch_game(self, index):
         # Startet das Spiel, wenn darauf geklickt wird
-        app_id = item.data(QtCore.Qt.UserRole)
-        start_game(app_id)
+        app_id = index.data(AppIdRole)
+        try:
+            warning = self.core.launch_warning(app_id)
+            self.core.launch(app_id)
+        except ValueError as e:
+            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to start the game: {e}\nPlease fix launch_profiles in the config.")
+            return
+        except OSError as e:
+            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to start the game: {e}")
+            return
+        if warning:
+            self.statusBar().showMessage(warning, 10000)
+        self.game_model.set_running(app_id, True)
+
+    def on_session_exited(self, session):
+        # Gespielt zählt nur, wenn das Spiel selbst gefunden wurde (unter Linux über Steams reaper-Prozess)
+        self.core.record_session(session)
+        if not session.played:
+            self.statusBar().showMessage("Steam was asked to start the game, but the game process could not be "
+                                         "tracked; this launch is not recorded as played", 10000)
+        self.game_model.set_running(session.app_id, bool(self.launch_supervisor.running(session.app_id)))
 
     def set_steam_api_key(self):
         # Eingabeaufforderung zur Festlegung des Steam API-Schlüssels
         key, ok = QtWidgets.QInputDialog.getText(self, "Steam API Key", "Enter your Steam API Key:")
         if ok and key:
             self.steam_api_key = key
-            self.config["steam_api_key"] = key
-            save_config(self.config)
+            self.config_store.set("steam_api_key", key)
             QtWidgets.QMessageBox.information(self, "Success", "Steam API Key has been set.")
 
     def set_steam_profile_id(self):
@@ -175,10 +329,25 @@ class GamingLauncher(QtWidgets.QMainWindow):
         profile_id, ok = QtWidgets.QInputDialog.getText(self, "Steam Profile ID", "Enter your Steam Profile ID:")
         if ok and profile_id:
             self.steam_profile_id = profile_id
-            self.config["steam_profile_id"] = profile_id
-            save_config(self.config)
+            self.config_store.set("steam_profile_id", profile_id)
             QtWidgets.QMessageBox.information(self, "Success", "Steam Profile ID has been set.")
 
+    def add_steam_account(self):
+        # Fügt ein weiteres Konto hinzu; der API-Schlüssel ist optional (sonst gilt steam_api_key)
+        profile_id, ok = QtWidgets.QInputDialog.getText(self, "Add Steam Account", "Enter the Steam Profile ID:")
+        if not ok or not profile_id.strip():
+            return
+        name, ok = QtWidgets.QInputDialog.getText(self, "Add Steam Account", "Name shown for this account:")
+        if not ok:
+            return
+        accounts = list(self.config.get("steam_accounts") or [])
+        if not accounts and self.steam_profile_id:
+            # Das bisherige Einzelprofil bleibt Teil der Bibliothek
+            accounts.append({"steam_id": self.steam_profile_id})
+        accounts.append({"steam_id": profile_id.strip(), "name": name.strip() or None})
+        self.config_store.set("steam_accounts", accounts)
+        QtWidgets.QMessageBox.information(self, "Success", "Steam account has been added. Refresh the library to load its games.")
+
     def create_user_profile(self):
         # Ermögliche dem Benutzer, ein Profil mit Namen und Avatar zu erstellen
         name, ok = QtWidgets.QInputDialog.getText(self, "Create Profile", "Enter your profile name:")
@@ -190,8 +359,7 @@ class GamingLauncher(QtWidgets.QMainWindow):
             return
 
         self.user_profile = {"name": name, "avatar": avatar_path}
-        self.config["user_profile"] = self.user_profile
-        save_config(self.config)
+        self.config_store.set("user_profile", self.user_profile)
         self.update_profile_ui()
 
     def update_profile_ui(self):
@@ -204,76 +372,411 @@ class GamingLauncher(QtWidgets.QMainWindow):
         else:
             self.avatar_label.clear()
 
-    def refresh_library(self):
-        # Steam-Spielbibliothek mit der API neu laden
-        if not self.steam_api_key or not self.steam_profile_id:
-            QtWidgets.QMessageBox.warning(self, "Error", "Please set your Steam API Key and Profile ID first.")
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        self.schedule_library_snapshot()
+
+    def schedule_library_snapshot(self):
+        if not self.snapshot_scheduled:
+            self.snapshot_scheduled = True
+            QtCore.QTimer.singleShot(0, self.load_library_snapshot)
+
+    def load_library_snapshot(self):
+        # Zeigt die gespeicherte Bibliothek sofort an und gleicht sie anschließend mit Steam ab
+        if self.library_db is None:
+            self.library_db = self.core.library()
+        self.game_model.account_names = {account["steam_id"]: account["name"] for account in self.core.accounts()}
+        games = self.library_db.load_games(self.core.library_id)
+        if games:
+            self.show_library(games)
+        startup_profile.mark("library shown")
+        startup_profile.check_done(("first paint", "library shown"))
+        # Beim Profilieren wird nur der lokale Start gemessen
+        if startup_profile.enabled():
+            return
+        self.scan_installed()
+        if self.accounts_configured() and self.config.get("refresh_on_startup", True):
+            QtCore.QTimer.singleShot(0, lambda: self.refresh_library(silent=True))
+
+    def refresh_library(self, silent=False):
+        # Steam-Spielbibliothek im Hintergrund neu laden; ein zweiter Klick bricht den Abruf ab.
+        # silent unterdrückt Dialoge beim automatischen Abgleich
+        if self.refresh_worker is not None:
+            self.refresh_worker.cancel()
+            self.finish_refresh("Refresh cancelled")
             return
 
-        try:
-            url = f"https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/?key={self.steam_api_key}&steamid={self.steam_profile_id}&include_appinfo=true"
-            response = requests.get(url)
-            response.raise_for_status()
+        if not self.accounts_configured():
+            QtWidgets.QMessageBox.warning(self, "Error", "Please set your Steam API Key and Profile ID first.")
+            return
 
-            data = response.json()
-            games = data.get('response', {}).get('games', [])
+        # Beim automatischen Abgleich nur Konten, deren gespeicherte Bibliothek veraltet ist
+        accounts = self.core.stale_accounts(force=not silent)
+        self.game_model.account_names = {account["steam_id"]: account["name"] for account in self.core.accounts()}
+        if not accounts:
+            games = self.core.merge_accounts({})
+            if games:
+                self.apply_library(games)
+            self.statusBar().showMessage("Library is up to date", 5000)
+            return
 
-            if not games:
+        # Der Worker lädt, führt zusammen, speichert (eigene SQLite-Verbindung) und baut den Suchindex;
+        # der GUI-Thread übernimmt danach nur noch das Ergebnis. Auch die Session (und damit der
+        # Import von requests) entsteht erst im Worker; shared_session ist threadsicher
+        old_games = self.steam_games
+        stream = not old_games
+
+        def fetch(progress, cancel_event, on_games):
+            fetched, errors = self.core.fetch_accounts(accounts, progress, cancel_event, on_games if stream else None)
+            games, changes = self.core.store_fetched(fetched, old_games)
+            search_index = SearchIndex([game.get("name", "") for game in games])
+            return games, changes, errors, old_games, search_index
+
+        worker = LibraryFetchWorker(fetch)
+        # Signale eines abgebrochenen Workers können noch eintreffen und werden dann ignoriert
+        worker.signals.progress.connect(lambda message: self.on_library_progress(worker, message))
+        worker.signals.games.connect(lambda games: self.on_games_parsed(worker, games))
+        worker.signals.finished.connect(lambda result: self.on_library_fetched(worker, result, silent))
+        worker.signals.failed.connect(lambda error: self.on_library_failed(worker, error, silent))
+        worker.signals.cancelled.connect(lambda: self.on_library_cancelled(worker))
+        for signal in (worker.signals.finished, worker.signals.failed, worker.signals.cancelled):
+            signal.connect(lambda *args: self.fetch_workers.discard(worker))
+        self.fetch_workers.add(worker)
+        self.refresh_worker = worker
+        self.refresh_started = time.perf_counter()
+        self.refresh_button.setText("Cancel Refresh")
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def finish_refresh(self, message):
+        # Der ganze Abgleich als ein Span; er blockiert den GUI-Thread nicht ("async")
+        if perf.enabled() and self.refresh_started is not None:
+            perf.tracer.record("refresh_library", "async", self.refresh_started, time.perf_counter(), {"result": message})
+        self.refresh_worker = None
+        self.refresh_button.setText("Refresh Library")
+        self.statusBar().showMessage(message, 5000)
+        # Vorläufig angezeigte Spiele eines abgebrochenen oder fehlgeschlagenen Abrufs verwerfen
+        self.stream_timer.stop()
+        self.streamed_games = []
+        if self.showing_streamed_games:
+            self.showing_streamed_games = False
+            self.game_model.set_games(self.steam_games)
+
+    def on_games_parsed(self, worker, games):
+        if worker is not self.refresh_worker or self.steam_games:
+            return
+        self.streamed_games += games
+        if not self.showing_streamed_games:
+            # Die ersten Zeilen sofort zeigen
+            self.show_streamed_games()
+        elif not self.stream_timer.isActive():
+            self.stream_timer.start(100)
+
+    @perf.traced("show_streamed_games", "gui")
+    def show_streamed_games(self):
+        # Die Filter folgen erst mit der zusammengeführten Bibliothek (apply_library)
+        games, self.streamed_games = self.streamed_games[:STREAM_CHUNK], self.streamed_games[STREAM_CHUNK:]
+        self.showing_streamed_games = True
+        self.game_model.append_games(games)
+        if self.streamed_games:
+            self.stream_timer.start(0)
+
+    def on_library_progress(self, worker, message):
+        if worker is self.refresh_worker:
+            self.statusBar().showMessage(message)
+
+    def accounts_configured(self):
+        accounts = self.core.accounts()
+        return bool(accounts) and all(account["api_key"] for account in accounts)
+
+    def on_library_fetched(self, worker, result, silent):
+        if worker is not self.refresh_worker:
+            return
+        games, changes, errors, old_games, search_index = result
+        # Favoriten und Installationsstand können sich während des Abrufs geändert haben
+        self.core.sync_flags()
+        # Die vorläufigen Zeilen werden gleich durch die ganze Bibliothek ersetzt
+        self.showing_streamed_games = False
+        if errors:
+            failed = ", ".join(self.game_model.account_names.get(steam_id, steam_id) for steam_id in errors)
+            print(f"Failed to retrieve game data of {failed}: {'; '.join(str(error) for error in errors.values())}")
+            self.finish_refresh(f"Library updated: {len(games)} games (failed: {failed}, using stored copy)")
+        else:
+            self.finish_refresh(f"Library updated: {len(games)} games")
+        if not games:
+            if not silent:
                 QtWidgets.QMessageBox.warning(self, "No Games Found", "No games were found in your Steam library. Please check your Steam ID or API key.")
-                return
+            return
+        if old_games is not self.steam_games:
+            # Die Liste wurde inzwischen anders befüllt, der Unterschied passt nicht mehr
+            changes = None
+        self.apply_library_changes(games, changes, search_index)
 
-            self.steam_games = games
-            self.filtered_games = games
-            self.update_game_list()
+    def on_library_failed(self, worker, error, silent):
+        if worker is not self.refresh_worker:
+            return
+        self.finish_refresh("Failed to retrieve game data")
+        if silent:
+            print(f"Failed to retrieve game data: {error}")
+        else:
+            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to retrieve game data: {error}")
 
-        except requests.RequestException as e:
-            QtWidgets.QMessageBox.critical(self, "Error", f"Failed to retrieve game data: {str(e)}")
+    def on_library_cancelled(self, worker):
+        if worker is self.refresh_worker:
+            self.finish_refresh("Refresh cancelled")
 
-    def update_game_list(self):
-        # Aktualisiert die Anzeige der Spiele im Launcher mit Bildern
-        self.game_list.clear()
-        for game in self.filtered_games:
-            item = QtWidgets.QListWidgetItem(game.get("name", "Unknown Game"))
-            item.setData(QtCore.Qt.UserRole, game.get("appid"))
-
-            # Spielbild hinzufügen
-            img_url = game.get("img_icon_url")
-            if img_url:
-                img_url = f"http://media.steampowered.com/steamcommunity/public/images/apps/{game['appid']}/{img_url}.jpg"
-                pixmap = QtGui.QPixmap()
-                pixmap.loadFromData(requests.get(img_url).content)  # Laden des Bildes
-                icon = QtGui.QIcon(pixmap)
-                item.setIcon(icon)
-
-            self.game_list.addItem(item)
+    def apply_library(self, games):
+        # Übernimmt nur hinzugefügte, entfernte und geänderte Spiele in Ansicht und Snapshot
+        self.apply_library_changes(games, self.core.update_library(self.steam_games, games))
 
+    @perf.traced("apply_library", "gui")
+    def apply_library_changes(self, games, changes, search_index=None):
+        # changes wie von LauncherCore.update_library; search_index, falls schon über games gebaut
+        if changes is None:
+            self.show_library(games, search_index)
+            return
+
+        added, removed, changed = changes
+        if not (added or removed or changed):
+            return
+        self.game_model.apply_delta(added, removed, changed)
+        self.steam_games = self.game_model.games
+        if search_index is None or [game.get("appid") for game in self.steam_games] != [game.get("appid") for game in games]:
+            search_index = SearchIndex([game.get("name", "") for game in self.steam_games])
+        self.search_index = search_index
+        self.update_sort_keys()
+        self.filter_games()
+
+    def scan_installed(self):
+        # Liest die appmanifest-Dateien im Hintergrund; nur geänderte werden neu geparst
+        if self.install_scan_running or self.install_watcher.active:
+            return
+        self.install_scan_running = True
+        worker = InstallScanWorker(self.install_scanner)
+        worker.signals.finished.connect(self.on_installed_scanned)
+        worker.signals.failed.connect(self.on_install_scan_failed)
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def on_installed_scanned(self, installed):
+        self.install_scan_running = False
+        self.core.set_installed(installed)
+        self.game_model.set_installed(installed)
+        if self.filter_dropdown.currentData() == "installed":
+            self.filter_games()
+        # Ab jetzt kommen nur noch einzelne Änderungen vom Watcher
+        self.install_watcher.start(installed)
+
+    def on_install_scan_failed(self, error):
+        # Damit ein späterer Aufruf von scan_installed wieder scannen kann
+        self.install_scan_running = False
+        self.statusBar().showMessage(f"Could not scan installed games: {error}", 5000)
+
+    def on_installed_changed(self, changes):
+        # Installiert/deinstalliert/aktualisiert: nur die betroffenen Zeilen neu zeichnen
+        self.core.update_installed(changes)
+        self.game_model.update_installed(changes)
+        if self.filter_dropdown.currentData() == "installed":
+            self.filter_games()
+
+    @perf.traced("show_library", "gui")
+    def show_library(self, games, search_index=None):
+        # Baut Modell und Suchindex einmal auf, Filter arbeiten danach nur noch mit Zeilennummern
+        self.steam_games = games
+        if search_index is None:
+            search_index = SearchIndex([game.get("name", "") for game in games])
+        self.search_index = search_index
+        self.update_sort_keys()
+        self.game_model.set_games(games)
+        self.filter_games()
+
+    def update_sort_keys(self):
+        # Die aktuelle Sortierung berechnet filter_games gleich selbst, die übrigen werden im
+        # Such-Thread vorberechnet, damit schon der erste Wechsel nur noch kopiert
+        self.sort_keys = SortKeys(self.steam_games, self.search_index.names, self.favorites)
+        sorts = [self.sort_dropdown.itemData(index) for index in range(self.sort_dropdown.count())]
+        self.search_pipeline.prepare(self.sort_keys.precompute, [sort for sort in sorts if sort != self.sort_order])
+
+    @perf.traced("update_game_list", "gui")
+    def update_game_list(self):
+        # Zeigt die gefilterten Zeilen an, ohne Listeneinträge neu zu erzeugen
+        self.filter_model.set_rows(self.filtered_rows)
+
+    def game_icon(self, game):
+        # Wird nur für gezeichnete Zeilen aufgerufen: liefert das dekodierte Icon oder einen
+        # Platzhalter und fordert das Bild im Hintergrund an
+        app_id = game.get("appid")
+        self.rendered_rows.add(app_id)
+        return self.request_icon(game)
+
+    def request_icon(self, game):
+        app_id = game.get("appid")
+        icon = self.pixmap_cache.get((app_id, self.icon_size))
+        if icon is not None:
+            return icon
+        img_url = game.get("img_icon_url")
+        if not img_url or app_id in self.failed_icons:
+            return None
+        self.icon_loader.request(app_id, icon_url(app_id, img_url))
+        return self.placeholder_icon
+
+    def visible_rows(self):
+        # Bereich der sichtbaren Zeilen in der gefilterten Liste, erweitert um den Vorlauf
+        count = self.filter_model.rowCount()
+        if count == 0:
+            return range(0)
+        viewport = self.game_list.viewport()
+        first = self.game_list.indexAt(QtCore.QPoint(1, 1)).row()
+        last = self.game_list.indexAt(QtCore.QPoint(1, viewport.height() - 1)).row()
+        first = max(first, 0)
+        last = count - 1 if last < 0 else last
+        return range(max(first - self.icon_prefetch_rows, 0), min(last + self.icon_prefetch_rows + 1, count))
+
+    def update_visible_icons(self):
+        # Verwirft Downloads für weggescrollte Zeilen und lädt den Vorlauf um den sichtbaren Bereich vor
+        if self.view_stack.currentWidget() is not self.game_list:
+            return
+        games = self.game_model.games
+        wanted = [games[self.filter_model.source_row(row)] for row in self.visible_rows()]
+        self.icon_loader.retain({game.get("appid") for game in wanted})
+        for game in wanted:
+            self.request_icon(game)
+
+    def icon_stats(self):
+        return dict(self.icon_loader.stats, rows_rendered=len(self.rendered_rows))
+
+    def on_icon_loaded(self, app_id, image):
+        # Merkt sich das fertig geladene Icon und lässt nur diese Zeile neu zeichnen
+        with perf.span("icon upload", "gui"):
+            self.pixmap_cache.put((app_id, self.icon_size), QtGui.QPixmap.fromImage(image))
+            self.game_model.game_changed(app_id, [QtCore.Qt.DecorationRole])
+
+    def on_icon_failed(self, app_id, error):
+        # Fehlende Icons in dieser Sitzung nicht bei jedem Neuzeichnen erneut anfordern
+        self.failed_icons.add(app_id)
+
+    def matching_rows(self, query, cancel_event=None):
+        # Läuft im Such-Thread: liefert die Zeilen, die zur Suche passen, in der gewählten Sortierung
+        category_rows = self.category_rows
+        search_index = self.search_index
+        sort_keys, sort_order = self.sort_keys, self.sort_order
+        with perf.span("search", "search"):
+            rows = search_index.search(query)
+        # Bei Tippfehlern ohne Treffer ähnliche Namen nach Relevanz anzeigen (unsortiert)
+        ranked = False
+        if not rows and self.fuzzy_search and not (cancel_event and cancel_event.is_set()):
+            rows = search_index.fuzzy_search(query)
+            ranked = True
+        if category_rows is not None:
+            # Nur die Treffer werden als kleine Zahlen kopiert, ohne Zwischenliste
+            if len(category_rows) != len(search_index):
+                # Maske und Index aus verschiedenen Ständen der Bibliothek; filter_games folgt ohnehin
+                rows = array("i")
+            elif rows is search_index.all_rows:
+                rows = array("i", compress(rows, category_rows))
+            else:
+                rows = array("i", compress(rows, map(category_rows.__getitem__, rows)))
+        if not ranked and len(sort_keys.games) == len(search_index):
+            with perf.span("sort", "search", order=sort_order):
+                rows = sort_keys.sort_rows(sort_order, rows)
+        return rows
+
+    def update_category_rows(self):
+        # Die Kategorie kommt als indizierte Abfrage aus der Datenbank und wird als Maske über
+        # die Zeilen gemerkt, die Suche schneidet ihre Treffer nur noch damit
+        category = self.filter_dropdown.currentData()
+        if category == "all" or self.library_db is None:
+            self.category_rows = None
+            return
+        rows_by_appid = self.game_model.rows_by_appid
+        mask = bytearray(len(self.steam_games))
+        for appid in self.library_db.query(category):
+            row = rows_by_appid.get(appid)
+            if row is not None:
+                mask[row] = 1
+        self.category_rows = mask
+
+    @perf.traced("filter_games", "gui")
     def filter_games(self):
-        # Filtert die Spiele nach Namen oder Kategorie
-        query = self.search_bar.text().lower()
-        category = self.filter_dropdown.currentText()
-
-        self.filtered_games = [
-            game for game in self.steam_games
-            if query in game.get('name', '').lower()
-        ]
+        # Filtert die Spiele sofort im GUI-Thread, z.B. direkt nach dem Laden der Bibliothek
+        self.search_pipeline.invalidate()
+        self.update_category_rows()
+        self.apply_search_results(self.matching_rows(self.search_bar.text()))
+
+    def on_category_changed(self):
+        # Kategoriewechsel ohne Entprellung durch die Such-Pipeline schicken
+        self.update_category_rows()
+        self.search_pipeline.submit(self.search_bar.text(), immediate=True)
+
+    def on_sort_changed(self):
+        # Die Reihenfolge wird beim ersten Mal berechnet und danach nur noch kopiert
+        self.sort_order = self.sort_dropdown.currentData()
+        self.config_store.set("sort_order", self.sort_order)
+        self.search_pipeline.submit(self.search_bar.text(), immediate=True)
+
+    def apply_search_results(self, rows, timing=None):
+        self.filtered_rows = rows
         self.update_game_list()
 
+    def set_grid_view(self, enabled):
+        # Kachelansicht mit den Header-Bildern aus dem Thumbnail-Atlas ("grid_atlas_mb" begrenzt die Cache-Datei)
+        if enabled and self.game_grid is None:
+            from game_grid import GameGridView
+            self.game_grid = GameGridView(
+                image_cache=self.image_cache, max_workers=self.config.get("icon_concurrency", 8),
+                atlas_bytes=self.config.get("grid_atlas_mb", 512) * 1024 * 1024)
+            self.game_grid.setModel(self.filter_model)
+            # Eine andere Sortierung tauscht die Zeilen ohne Reset aus
+            self.filter_model.rows_changed.connect(lambda: self.game_grid.viewport_timer.start())
+            self.game_grid.setContextMenuPolicy(QtCore.Qt.CustomContextMenu)
+            self.game_grid.customContextMenuRequested.connect(self.show_context_menu)
+            self.game_grid.doubleClicked.connect(self.launch_game)
+            self.view_stack.addWidget(self.game_grid)
+        self.view_stack.setCurrentWidget(self.game_grid if enabled else self.game_list)
+        self.config_store.set("view_mode", "grid" if enabled else "list")
+        if not enabled:
+            self.viewport_timer.start()
+
     def show_context_menu(self, pos):
         # Kontextmenü zum Hinzufügen von Spielen zu den Favoriten
+        view = self.view_stack.currentWidget()
         context_menu = QtWidgets.QMenu(self)
         add_favorite_action = context_menu.addAction("Add to Favorites")
-        action = context_menu.exec_(self.game_list.mapToGlobal(pos))
+        action = context_menu.exec_(view.mapToGlobal(pos))
 
         if action == add_favorite_action:
-            current_item = self.game_list.currentItem()
-            if current_item:
-                app_id = current_item.data(QtCore.Qt.UserRole)
-                if app_id not in self.favorites:
-                    self.favorites.append(app_id)
-                    self.config["favorites"] = self.favorites
-                    save_config(self.config)
+            current_index = view.currentIndex()
+            if current_index.isValid():
+                app_id = current_index.data(AppIdRole)
+                if self.core.add_favorite(app_id):
+                    # Nur dieses Spiel wird in den bereits berechneten Sortierungen neu einsortiert
+                    row = self.game_model.rows_by_appid.get(app_id)
+                    if row is not None and row < len(self.sort_keys.games):
+                        self.sort_keys.update_row(row)
+                    if self.filter_dropdown.currentData() == "favorites" or self.sort_order == "favorites":
+                        self.filter_games()
                     QtWidgets.QMessageBox.information(self, "Added", "Game added to favorites.")
 
+    def export_perf_trace(self):
+        # Speichert die aufgezeichneten Spans im Chrome-Trace-Format (chrome://tracing, Perfetto)
+        if not perf.tracer.events:
+            QtWidgets.QMessageBox.information(self, "Performance Trace", "Nothing recorded yet. Turn on the performance overlay (F12) first.")
+            return
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Performance Trace", "launcher-trace.json", "Trace (*.json)")
+        if path:
+            perf.export_chrome_trace(path)
+            self.statusBar().showMessage(f"Trace with {len(perf.tracer.events)} events saved to {path}", 5000)
+
+    def closeEvent(self, event):
+        # Laufende Downloads und Suchen beim Schließen abbrechen und den Cache-Index sichern
+        if self.refresh_worker is not None:
+            self.refresh_worker.cancel()
+        self.search_pipeline.shutdown()
+        self.icon_loader.shutdown()
+        if self.game_grid is not None:
+            self.game_grid.shutdown()
+        self.install_watcher.stop()
+        self.core.close()
+        super().closeEvent(event)
+
     def open_steam_profile(self):
         # Öffnet das Steam-Profil im Standard-Browser
         profile_url = f"https://steamcommunity.com/profiles/{self.steam_profile_id}"
@@ -286,7 +789,11 @@ class GamingLauncher(QtWidgets.QMainWindow):
 
 def main():
     app = QtWidgets.QApplication(sys.argv)
+    startup_profile.mark("QApplication")
     launcher = GamingLauncher()
+    startup_profile.mark("window constructed")
+    # Mit --profile-startup wird nach dem ersten Zeichnen und dem Laden der Bibliothek beendet
+    startup_profile.watch_first_paint(launcher, quit_after=("first paint", "library shown"))
     launcher.show()
     sys.exit(app.exec_())
 
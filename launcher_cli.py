@@ -0,0 +1,140 @@
+import argparse
+import json
+import sys
+import threading
+
+from launcher_core import CONFIG_FILE, LauncherCore
+from library_db import CATEGORY_FILTERS, SORT_ORDERS
+
+# Command line front end of the launcher, built on launcher_core without PyQt5, e.g.
+#   python launcher_cli.py refresh            fetch the library and scan installed games
+#   python launcher_cli.py prefetch-icons     warm the icon cache (e.g. on login)
+#   python launcher_cli.py search "hollow"    search the stored library
+#   python launcher_cli.py launch 620         start a game through Steam
+
+def print_games(games, as_json):
+    if as_json:
+        print(json.dumps([game.to_dict() for game in games]))
+        return
+    for game in games:
+        print(f"{game['appid']:>10}  {game.get('name', '')}")
+
+def cmd_list(core, args):
+    print_games(core.query(args.category, "", args.sort), args.json)
+    return 0
+
+def cmd_search(core, args):
+    print_games(core.query(args.category, " ".join(args.text), args.sort), args.json)
+    return 0
+
+def cmd_launch(core, args):
+    exited = threading.Event()
+    core.launch_supervisor.on_exited = lambda session: exited.set()
+    try:
+        warning = core.launch_warning(args.appid)
+        launched = core.launch(args.appid, detach=not args.wait)
+    except (OSError, ValueError) as e:
+        print(f"Failed to start the game: {e}", file=sys.stderr)
+        return 1
+    if warning:
+        print(warning, file=sys.stderr)
+    print(f"Started {args.appid} (pid {launched.pid})")
+    if not args.wait:
+        return 0
+    # Set by the supervisor once the game (or, if it was never found, the launched process)
+    # has exited and the last output is in the log
+    exited.wait()
+    core.record_session(launched)
+    if launched.played:
+        print(f"Game {args.appid} exited after {launched.duration:.0f}s")
+    else:
+        print(f"Game {args.appid}: the game process could not be tracked, not recorded as played", file=sys.stderr)
+    return launched.exit_code or 0
+
+def cmd_refresh(core, args):
+    import requests
+    import steam_api
+    accounts = core.accounts()
+    if not accounts or not all(account["api_key"] for account in accounts):
+        print("Please set steam_api_key and steam_profile_id (or steam_accounts) in the config first.", file=sys.stderr)
+        return 1
+    if not args.skip_installed:
+        core.scan_installed()
+    old_games = core.games()
+    try:
+        games, errors = core.fetch_library(progress=lambda message: print(message, file=sys.stderr) if args.verbose else None,
+                                           force=not args.stale_only)
+    except (requests.RequestException, ValueError, steam_api.FetchCancelled) as e:
+        print(f"Failed to retrieve game data: {e}", file=sys.stderr)
+        return 1
+    names = {account["steam_id"]: account["name"] for account in accounts}
+    for steam_id, error in errors.items():
+        print(f"Failed to retrieve games of {names[steam_id]}, using the stored copy: {error}", file=sys.stderr)
+    if not games:
+        print("No games were found in your Steam library. Please check your Steam ID or API key.", file=sys.stderr)
+        return 1
+    changes = core.update_library(old_games, games)
+    if changes is None:
+        print(f"Library stored: {len(games)} games, {len(core.installed)} installed")
+    else:
+        added, removed, changed = changes
+        print(f"Library updated: {len(games)} games ({len(added)} added, {len(removed)} removed, "
+              f"{len(changed)} changed), {len(core.installed)} installed")
+    if len(accounts) > 1:
+        print(f"Accounts: {len(accounts)} ({len(accounts) - len(errors)} up to date, {len(errors)} failed)")
+    return 1 if errors else 0
+
+def cmd_prefetch_icons(core, args):
+    games = core.query(args.category, "", "appid")
+    counts = core.prefetch_icons(games, workers=args.workers)
+    print(f"Icons: {counts['icons']} ({counts['downloaded']} downloaded, {counts['revalidated']} revalidated, "
+          f"{counts['hits']} cached, {counts['failed']} failed)")
+    return 1 if counts["failed"] else 0
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="launcher_cli", description="Gaming Launcher without the GUI")
+    parser.add_argument("--config", default=CONFIG_FILE, help=f"config file (default: {CONFIG_FILE})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_filters(command):
+        command.add_argument("--category", choices=list(CATEGORY_FILTERS), default="all")
+        command.add_argument("--sort", choices=list(SORT_ORDERS), default="name")
+        command.add_argument("--json", action="store_true", help="print the games as JSON")
+
+    command = commands.add_parser("list", help="list the stored library")
+    add_filters(command)
+    command.set_defaults(run=cmd_list)
+
+    command = commands.add_parser("search", help="search the stored library by name")
+    command.add_argument("text", nargs="+")
+    add_filters(command)
+    command.set_defaults(run=cmd_search)
+
+    command = commands.add_parser("launch", help="start a game through Steam")
+    command.add_argument("appid", type=int)
+    command.add_argument("--wait", action="store_true", help="stay until the game exits and record the session")
+    command.set_defaults(run=cmd_launch)
+
+    command = commands.add_parser("refresh", help="fetch the library from Steam and scan installed games")
+    command.add_argument("--skip-installed", action="store_true", help="do not scan the local Steam folders")
+    command.add_argument("--verbose", action="store_true", help="print download progress")
+    command.add_argument("--stale-only", action="store_true",
+                         help="only fetch accounts whose stored library is older than account_max_age")
+    command.set_defaults(run=cmd_refresh)
+
+    command = commands.add_parser("prefetch-icons", help="download game icons into the cache")
+    command.add_argument("--category", choices=list(CATEGORY_FILTERS), default="all")
+    command.add_argument("--workers", type=int, default=None)
+    command.set_defaults(run=cmd_prefetch_icons)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    core = LauncherCore(args.config)
+    try:
+        return args.run(core, args)
+    finally:
+        core.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import library_accounts
+import perf
+import steam_api
+from config_store import ConfigStore
+from image_cache import ImageCache
+from launch_profiles import LaunchProfiles, launch_warning
+from launch_supervisor import STEAM_GAME_TRACKING, LaunchSupervisor, find_steam_game
+from library_db import LibraryDB, default_data_dir, diff_library
+from steam_local import SteamLibraryScanner
+
+CONFIG_FILE = "launcher_config.json"
+
+# Command to start a game through Steam (Steam stays in the background, no UI)
+def steam_launch_command(app_id):
+    return ["steam", "-applaunch", str(app_id)]
+
+# Launcher state and operations without a GUI: config, the library snapshot, the
+# installed scan, launching and the icon cache. launcherAlpha2 and launcher_cli both
+# build on it. Nothing here imports PyQt5, and requests is only imported once the
+# network is actually used. on_exited(session) is called from the supervisor's
+# wait thread when a supervised game exits.
+class LauncherCore:
+    def __init__(self, config_path=CONFIG_FILE, on_exited=None):
+        self.config_store = ConfigStore(config_path)
+        self.config = self.config_store.data
+        self.favorites = self.config_store.favorites
+        # Opened on first use (see library())
+        self.library_db = None
+        self.api_session = None
+        self.image_cache = None
+        self.installed = {}
+        self.install_scanner = SteamLibraryScanner(self.config.get("steam_roots"))
+        self.launch_profiles = LaunchProfiles(self.config.get("launch_profiles"))
+        self.launch_supervisor = LaunchSupervisor(
+            os.path.join(default_data_dir(), "logs"), max_log_bytes=self.config.get("launch_log_kb", 1024) * 1024,
+            on_exited=on_exited, find_game=find_steam_game if STEAM_GAME_TRACKING else None)
+
+    @property
+    def steam_id(self):
+        return self.config.get("steam_profile_id")
+
+    def accounts(self):
+        # Configured Steam accounts, see library_accounts.configured_accounts
+        return library_accounts.configured_accounts(self.config)
+
+    @property
+    def library_id(self):
+        # Identity of the stored library: the steam ids of all accounts merged into it
+        return library_accounts.library_id(self.accounts())
+
+    def library(self):
+        if self.library_db is None:
+            self.library_db = LibraryDB()
+            self.library_db.set_favorites(self.favorites)
+        return self.library_db
+
+    def games(self):
+        # Stored library of the configured accounts, ordered by appid
+        return self.library().load_games(self.library_id)
+
+    def query(self, category="all", search="", sort="name"):
+        # Stored games in category matching search, as game dicts in the given order
+        by_appid = {game["appid"]: game for game in self.games()}
+        return [by_appid[appid] for appid in self.library().query(category, search, sort) if appid in by_appid]
+
+    def session(self):
+        # Shared keep-alive client for API calls and images, created on first use
+        if self.api_session is None:
+            self.api_session = steam_api.shared_session()
+        return self.api_session
+
+    def stale_accounts(self, force=False):
+        # Accounts whose cached library is missing or older than "account_max_age" seconds
+        # (all of them with force)
+        accounts = self.accounts()
+        if force:
+            return accounts
+        db = self.library()
+        max_age = self.config.get("account_max_age", library_accounts.DEFAULT_MAX_AGE)
+        now = time.time()
+        return [account for account in accounts
+                if (db.account_fetched(account["steam_id"]) or 0) < now - max_age]
+
+    def fetch_accounts(self, accounts, progress=None, cancel_event=None, on_games=None):
+        # Download the owned games of accounts in parallel; ({steam_id: games}, {steam_id: error}).
+        # Raises like fetch_owned_games if every account failed. Safe to call off the GUI thread;
+        # on_games(games) gets the games of each account as they are parsed.
+        return library_accounts.fetch_accounts(
+            accounts, session=self.session(), max_workers=self.config.get("account_workers", library_accounts.DEFAULT_WORKERS),
+            timeout=tuple(self.config.get("api_timeout", steam_api.DEFAULT_TIMEOUT)),
+            retries=self.config.get("api_retries", 3), cancel_event=cancel_event, progress=progress,
+            on_games=on_games)
+
+    def merge_accounts(self, fetched):
+        # Cache the fetched account libraries and merge them with the cached ones of the
+        # other accounts into the library of all accounts (see update_library)
+        return self._merge_accounts(self.library(), fetched)
+
+    def _merge_accounts(self, db, fetched):
+        for steam_id, games in fetched.items():
+            db.store_account(steam_id, games)
+        libraries = {}
+        for account in self.accounts():
+            games = fetched.get(account["steam_id"])
+            if games is None:
+                games = db.account_games(account["steam_id"])
+            if games is not None:
+                libraries[account["steam_id"]] = games
+        return library_accounts.merge_libraries(libraries)
+
+    def store_fetched(self, fetched, old_games):
+        # merge_accounts and update_library for a fetch worker: the writes go through a
+        # connection of the calling thread, so the GUI thread only applies the result.
+        # Returns (games, changes). The favorite and install flags belong to the owning
+        # thread and are brought up to date by sync_flags() afterwards.
+        db = LibraryDB(self.library_db.path if self.library_db is not None else None)
+        try:
+            games = self._merge_accounts(db, fetched)
+            with perf.span("store library", "db"):
+                return games, self._update_library(db, old_games, games, flags=False)
+        finally:
+            db.close()
+
+    def sync_flags(self):
+        db = self.library()
+        db.set_favorites(self.favorites)
+        db.set_installed(self.installed)
+
+    def fetch_library(self, progress=None, cancel_event=None, force=True):
+        # Fetch the accounts (only the stale ones unless force) and return (merged games,
+        # {steam_id: error}); raises requests.RequestException, ValueError or FetchCancelled
+        accounts = self.stale_accounts(force)
+        fetched, errors = self.fetch_accounts(accounts, progress, cancel_event) if accounts else ({}, {})
+        return self.merge_accounts(fetched), errors
+
+    def update_library(self, old_games, games):
+        # Store a fetched library. Returns (added, removed, changed) against old_games, or
+        # None if the snapshot was replaced as a whole (first fetch or another profile).
+        with perf.span("store library", "db"):
+            return self._update_library(self.library(), old_games, games)
+
+    def _update_library(self, db, old_games, games, flags=True):
+        if not old_games or db.get_meta("steam_id") != self.library_id:
+            db.replace_games(self.library_id, games)
+            if flags:
+                self.sync_flags()
+            return None
+        added, removed, changed = diff_library(old_games, games)
+        if added or removed or changed:
+            db.apply_delta(added, removed, changed)
+        return added, removed, changed
+
+    def scan_installed(self):
+        # Synchronous scan of the Steam library folders; {appid: size on disk}
+        installed = self.install_scanner.scan()
+        self.set_installed({appid: info["size_on_disk"] for appid, info in installed.items()})
+        return self.installed
+
+    def set_installed(self, installed):
+        self.installed = dict(installed)
+        self.library().set_installed(self.installed)
+
+    def update_installed(self, changes):
+        for appid, size in changes.items():
+            if size is None:
+                self.installed.pop(appid, None)
+            else:
+                self.installed[appid] = size
+        self.library().update_installed(changes)
+
+    def add_favorite(self, app_id):
+        # False if the game already was a favorite
+        if not self.config_store.add_favorite(app_id):
+            return False
+        self.library().set_favorite(app_id)
+        return True
+
+    def launch(self, app_id, detach=False):
+        # Start app_id with its launch profile. Supervised by default (returns a LaunchSession);
+        # detach=True returns the Popen and leaves the process alone. Raises OSError, or
+        # ValueError for an invalid launch profile.
+        launch = self.launch_profiles.resolve(app_id, steam_launch_command(app_id))
+        if detach:
+            return self.launch_supervisor.launch_detached(app_id, launch.command, env=launch.env)
+        return self.launch_supervisor.launch(app_id, launch.command, env=launch.env)
+
+    def launch_warning(self, app_id):
+        # Why app_id's launch profile will not fully apply (Steam already running), or None.
+        # Raises ValueError for an invalid launch profile.
+        return launch_warning(self.launch_profiles.resolve(app_id, steam_launch_command(app_id)))
+
+    def record_session(self, session):
+        # Launches whose game was never seen running are not play sessions
+        if session.played:
+            self.library().record_session(session)
+
+    def icon_cache(self):
+        if self.image_cache is None:
+            self.image_cache = ImageCache(max_bytes=self.config.get("image_cache_mb", 256) * 1024 * 1024)
+        return self.image_cache
+
+    def prefetch_icons(self, games, workers=None, progress=None):
+        # Download the icons of games into the on-disk cache; fresh entries are not re-requested.
+        # progress(done, total) is called after each icon. Returns counts of the outcomes.
+        import requests
+        cache = self.icon_cache()
+        urls = [steam_api.icon_url(game["appid"], game["img_icon_url"]) for game in games if game.get("img_icon_url")]
+        workers = workers or self.config.get("icon_concurrency", 8)
+        # Workers beyond the per-host pool wait for a connection instead of opening new ones
+        session = self.session()
+        counts = Counter(icons=len(urls), failed=0)
+
+        def fetch(url):
+            try:
+                cache.fetch(url, session)
+                return True
+            except (requests.RequestException, OSError):
+                return False
+
+        before = cache.summary()
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="icon-prefetch") as executor:
+            for done, ok in enumerate(executor.map(fetch, urls), 1):
+                counts["failed"] += not ok
+                if progress:
+                    progress(done, len(urls))
+        cache.flush()
+        after = cache.summary()
+        for key in ("hits", "misses", "revalidated"):
+            counts[key] = after[key] - before[key]
+        counts["downloaded"] = counts.pop("misses")
+        return counts
+
+    def close(self):
+        if self.image_cache is not None:
+            self.image_cache.flush()
+        if self.api_session is not None:
+            self.api_session.close()
+        self.config_store.close()
@@ -0,0 +1,88 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import steam_api
+from game_record import Game, owner_tuple
+
+# Seconds a cached account library counts as fresh ("account_max_age")
+DEFAULT_MAX_AGE = 3600
+# Accounts fetched at the same time ("account_workers")
+DEFAULT_WORKERS = 4
+
+# Accounts from "steam_accounts" ([{"steam_id", "api_key", "name"}], api_key defaults to
+# steam_api_key), or the single steam_profile_id when there is no such list
+def configured_accounts(config):
+    accounts = []
+    entries = config.get("steam_accounts") or [{"steam_id": config.get("steam_profile_id")}]
+    for entry in entries:
+        steam_id = str(entry.get("steam_id") or "").strip()
+        if steam_id and all(account["steam_id"] != steam_id for account in accounts):
+            accounts.append({
+                "steam_id": steam_id,
+                "api_key": entry.get("api_key") or config.get("steam_api_key", ""),
+                "name": entry.get("name") or steam_id,
+            })
+    return accounts
+
+# Identity of the merged library in the snapshot; a single account keeps its steam id
+def library_id(accounts):
+    return "+".join(sorted(account["steam_id"] for account in accounts))
+
+# GetOwnedGames for every account on at most max_workers threads, sharing session.
+# Returns ({steam_id: games}, {steam_id: error}). If every account failed the first
+# error is raised, as for a single account; FetchCancelled once cancel_event is set.
+# on_games(games) gets every parsed batch of every account, from the fetch threads.
+def fetch_accounts(accounts, session=None, max_workers=DEFAULT_WORKERS, timeout=steam_api.DEFAULT_TIMEOUT,
+                   retries=3, cancel_event=None, progress=None, on_games=None):
+    import requests
+    report = progress or (lambda message: None)
+    several = len(accounts) > 1
+
+    def fetch(account):
+        prefix = f"{account['name']}: " if several else ""
+        return steam_api.fetch_owned_games(
+            account["api_key"], account["steam_id"], session=session, timeout=timeout, retries=retries,
+            cancel_event=cancel_event, progress=lambda message: report(prefix + message), on_games=on_games)
+
+    fetched = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(accounts))), thread_name_prefix="account-fetch") as executor:
+        futures = {executor.submit(fetch, account): account["steam_id"] for account in accounts}
+        for future in as_completed(futures):
+            try:
+                fetched[futures[future]] = future.result()
+            except (requests.RequestException, ValueError, steam_api.FetchCancelled) as e:
+                errors[futures[future]] = e
+    if cancel_event is not None and cancel_event.is_set():
+        raise steam_api.FetchCancelled()
+    if errors and not fetched:
+        raise next(iter(errors.values()))
+    return fetched, errors
+
+# Merge account libraries (Game records or cached dicts) into one list of new Game
+# records ordered by appid. A game owned by several accounts appears once with all
+# of them in owners; playtimes add up and the latest rtime_last_played wins.
+def merge_libraries(libraries):
+    merged = {}
+    for steam_id in sorted(libraries):
+        for game in libraries[steam_id]:
+            appid = game.get("appid")
+            current = merged.get(appid)
+            if current is None:
+                current = merged[appid] = Game.from_dict(game)
+                current.owners = [steam_id]
+                continue
+            current.owners.append(steam_id)
+            for field in ("playtime_forever", "playtime_2weeks"):
+                if field in game:
+                    setattr(current, field, current.get(field, 0) + game[field])
+            if game.get("rtime_last_played", 0) > current.get("rtime_last_played", 0):
+                current.rtime_last_played = game["rtime_last_played"]
+            if game.get("has_community_visible_stats"):
+                current.has_community_visible_stats = True
+            for field in ("name", "img_icon_url"):
+                if not current.get(field) and game.get(field):
+                    setattr(current, field, game[field])
+    games = [merged[appid] for appid in sorted(merged)]
+    for game in games:
+        game.owners = owner_tuple(game.owners)
+    return games
@@ -0,0 +1,301 @@
+import json
+import os
+import platform
+import sqlite3
+import sys
+import time
+
+from game_record import API_FIELDS, GAME_FIELDS, Game, owner_tuple
+from search_index import normalize
+
+# Launcher-side state per game, kept across refreshes
+LOCAL_COLUMNS = {
+    "name_key": "TEXT",
+    "favorite": "INTEGER NOT NULL DEFAULT 0",
+    "installed": "INTEGER NOT NULL DEFAULT 0",
+    "size_on_disk": "INTEGER",
+    # Comma separated steam ids (see library_accounts.merge_libraries)
+    "owners": "TEXT",
+}
+
+# Filter dropdown categories; each condition matches one of the indexes below exactly
+CATEGORY_FILTERS = {
+    "all": None,
+    "recent": "playtime_2weeks > 0",
+    "installed": "installed = 1",
+    "favorites": "favorite = 1",
+}
+
+SORT_ORDERS = {
+    "appid": "appid",
+    "name": "name_key, appid",
+    "playtime": "playtime_forever DESC, appid",
+    "recent_playtime": "playtime_2weeks DESC, appid",
+    "last_played": "rtime_last_played DESC, appid",
+    "favorites": "favorite DESC, name_key, appid",
+}
+
+INDEXES = (
+    "CREATE INDEX IF NOT EXISTS games_name ON games (name_key)",
+    "CREATE INDEX IF NOT EXISTS games_playtime ON games (playtime_forever)",
+    "CREATE INDEX IF NOT EXISTS games_last_played ON games (rtime_last_played)",
+    "CREATE INDEX IF NOT EXISTS games_recent ON games (playtime_2weeks) WHERE playtime_2weeks > 0",
+    "CREATE INDEX IF NOT EXISTS games_installed ON games (name_key) WHERE installed = 1",
+    "CREATE INDEX IF NOT EXISTS games_favorite ON games (name_key) WHERE favorite = 1",
+)
+
+# Trigram full-text index over name_key, kept in sync with games by triggers
+FTS_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS games_fts USING fts5 "
+    "(name_key, content='games', content_rowid='appid', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS games_fts_insert AFTER INSERT ON games BEGIN "
+    "INSERT INTO games_fts (rowid, name_key) VALUES (new.appid, new.name_key); END",
+    "CREATE TRIGGER IF NOT EXISTS games_fts_delete AFTER DELETE ON games BEGIN "
+    "INSERT INTO games_fts (games_fts, rowid, name_key) VALUES ('delete', old.appid, old.name_key); END",
+    "CREATE TRIGGER IF NOT EXISTS games_fts_update AFTER UPDATE OF name_key ON games "
+    "WHEN old.name_key IS NOT new.name_key BEGIN "
+    "INSERT INTO games_fts (games_fts, rowid, name_key) VALUES ('delete', old.appid, old.name_key); "
+    "INSERT INTO games_fts (rowid, name_key) VALUES (new.appid, new.name_key); END",
+)
+
+# Per-user data directory: XDG_DATA_HOME on Linux, LOCALAPPDATA on Windows
+def default_data_dir():
+    if platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    else:
+        base = os.environ.get("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return os.path.join(base, "gaminglauncher")
+
+def game_row(game):
+    owners = game.get("owners")
+    return tuple(game.get(field) for field in API_FIELDS) + (",".join(owners) if owners else None,)
+
+# Compare two libraries by appid. Returns (added, removed appids, changed), where
+# added and changed hold the new game dicts.
+def diff_library(old_games, new_games):
+    old_by_appid = {game.get("appid"): game for game in old_games}
+    new_appids = set()
+    added = []
+    changed = []
+    for game in new_games:
+        appid = game.get("appid")
+        new_appids.add(appid)
+        old = old_by_appid.get(appid)
+        if old is None:
+            added.append(game)
+        elif game_row(old) != game_row(game):
+            changed.append(game)
+    removed = [appid for appid in old_by_appid if appid not in new_appids]
+    return added, removed, changed
+
+# Local snapshot of the last fetched library so the launcher can show it at
+# startup without touching the network. Besides the API fields every game keeps
+# its favorite and install state, and category, search and sort run as indexed
+# queries (see query()). WAL lets both launchers read while the other one writes.
+class LibraryDB:
+    def __init__(self, path=None):
+        self.path = path or os.path.join(default_data_dir(), "library.sqlite3")
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.create_function("normalize_name", 1, lambda name: normalize(name or ""), deterministic=True)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        # With WAL a commit is still atomic, it is only fsynced at checkpoints
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS games (
+                    appid INTEGER PRIMARY KEY,
+                    name TEXT,
+                    img_icon_url TEXT,
+                    playtime_forever INTEGER,
+                    playtime_2weeks INTEGER,
+                    rtime_last_played INTEGER,
+                    has_community_visible_stats INTEGER
+                )""")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            # One row per launch: when, how long and how it ended
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id INTEGER PRIMARY KEY,
+                    appid INTEGER NOT NULL,
+                    started REAL NOT NULL,
+                    ended REAL,
+                    exit_code INTEGER,
+                    log_path TEXT
+                )""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS sessions_appid ON sessions (appid, started)")
+            # Last fetched library of every account, merged into games (see library_accounts)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS accounts (
+                    steam_id TEXT PRIMARY KEY,
+                    fetched REAL NOT NULL,
+                    games TEXT NOT NULL
+                )""")
+            self._migrate()
+
+    def _migrate(self):
+        # Snapshots written before the local columns existed get them added and filled in
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(games)")}
+        for column, definition in LOCAL_COLUMNS.items():
+            if column not in columns:
+                self.conn.execute(f"ALTER TABLE games ADD COLUMN {column} {definition}")
+        self.conn.execute("UPDATE games SET name_key = normalize_name(name) WHERE name_key IS NULL")
+        for statement in INDEXES:
+            self.conn.execute(statement)
+        # FTS5 with the trigram tokenizer needs SQLite 3.34; older builds fall back to LIKE
+        try:
+            exists = self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'games_fts'").fetchone()
+            for statement in FTS_SCHEMA:
+                self.conn.execute(statement)
+            if not exists:
+                self.conn.execute("INSERT INTO games_fts (games_fts) VALUES ('rebuild')")
+            self.fts = True
+        except sqlite3.OperationalError:
+            self.fts = False
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else default
+
+    def set_meta(self, key, value):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def load_games(self, steam_id):
+        # Snapshot for steam_id as Game records ordered by appid, or [] if it belongs to another profile
+        if not steam_id or self.get_meta("steam_id") != steam_id:
+            return []
+        games = []
+        owners = {}
+        for row in self.conn.execute(f"SELECT {', '.join(GAME_FIELDS)} FROM games ORDER BY appid"):
+            game = Game(*row)
+            if game.name is not None:
+                game.name = sys.intern(game.name)
+            if game.has_community_visible_stats is not None:
+                game.has_community_visible_stats = bool(game.has_community_visible_stats)
+            if game.owners is not None:
+                shared = owners.get(game.owners)
+                if shared is None:
+                    shared = owners[game.owners] = owner_tuple(game.owners.split(","))
+                game.owners = shared
+            games.append(game)
+        return games
+
+    def store_account(self, steam_id, games, fetched=None):
+        # Cache the library of one account; only the API fields are kept
+        data = json.dumps([{field: game[field] for field in API_FIELDS if field in game} for game in games])
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO accounts (steam_id, fetched, games) VALUES (?, ?, ?)",
+                              (steam_id, time.time() if fetched is None else fetched, data))
+
+    def account_games(self, steam_id):
+        # Cached library of steam_id, or None if it was never fetched
+        row = self.conn.execute("SELECT games FROM accounts WHERE steam_id = ?", (steam_id,)).fetchone()
+        return json.loads(row["games"]) if row else None
+
+    def account_fetched(self, steam_id):
+        # time.time() of the last successful fetch of steam_id, or None
+        row = self.conn.execute("SELECT fetched FROM accounts WHERE steam_id = ?", (steam_id,)).fetchone()
+        return row["fetched"] if row else None
+
+    def replace_games(self, steam_id, games):
+        # Games that are still owned keep their favorite and install state
+        with self.conn:
+            if self.get_meta("steam_id") != steam_id:
+                self.conn.execute("DELETE FROM games")
+            else:
+                self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS keep (appid INTEGER PRIMARY KEY)")
+                self.conn.execute("DELETE FROM keep")
+                self.conn.executemany("INSERT OR IGNORE INTO keep VALUES (?)", [(game.get("appid"),) for game in games])
+                self.conn.execute("DELETE FROM games WHERE appid NOT IN (SELECT appid FROM keep)")
+            self._upsert(games)
+            # Fresh statistics let the planner pick the partial indexes for small categories
+            self.conn.execute("ANALYZE")
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('steam_id', ?)", (steam_id,))
+
+    def apply_delta(self, added, removed, changed):
+        # Write only what changed since the last refresh
+        with self.conn:
+            self.conn.executemany("DELETE FROM games WHERE appid = ?", [(appid,) for appid in removed])
+            self._upsert(added + changed)
+
+    def set_favorites(self, appids):
+        self._set_flag("favorite", appids)
+
+    def set_favorite(self, appid, favorite=True):
+        with self.conn:
+            self.conn.execute("UPDATE games SET favorite = ? WHERE appid = ?", (int(favorite), appid))
+
+    def set_installed(self, installed):
+        # installed maps appid -> size on disk in bytes (see steam_local)
+        self._set_flag("installed", installed)
+        current = dict(self.conn.execute("SELECT appid, size_on_disk FROM games WHERE installed = 1").fetchall())
+        sizes = [(size, appid) for appid, size in installed.items() if appid in current and current[appid] != size]
+        if sizes:
+            with self.conn:
+                self.conn.executemany("UPDATE games SET size_on_disk = ? WHERE appid = ?", sizes)
+
+    def update_installed(self, changes):
+        # changes maps appid -> size on disk, or None once the game was uninstalled
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE games SET installed = ?, size_on_disk = ? WHERE appid = ?",
+                [(int(size is not None), size, appid) for appid, size in changes.items()])
+
+    def record_session(self, session):
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO sessions (appid, started, ended, exit_code, log_path) VALUES (?, ?, ?, ?, ?)",
+                (session.app_id, session.started, session.ended, session.exit_code, session.log_path))
+
+    def sessions(self, appid):
+        # Launches of appid, newest first
+        return [dict(row) for row in self.conn.execute(
+            "SELECT * FROM sessions WHERE appid = ? ORDER BY started DESC", (appid,))]
+
+    def query(self, category="all", search="", sort="appid"):
+        # Appids of the games in category whose name contains search, in the given order
+        sql, params = self.build_query(category, search, sort)
+        return [row[0] for row in self.conn.execute(sql, params)]
+
+    def build_query(self, category="all", search="", sort="appid"):
+        conditions = []
+        params = []
+        if CATEGORY_FILTERS[category]:
+            conditions.append(CATEGORY_FILTERS[category])
+        search = normalize(search)
+        if search and self.fts and len(search) >= 3:
+            conditions.append("appid IN (SELECT rowid FROM games_fts WHERE games_fts MATCH ?)")
+            params.append('"' + search.replace('"', '""') + '"')
+        elif search:
+            # Too short for a trigram; one or two characters match most of the library anyway
+            conditions.append("instr(name_key, ?) > 0")
+            params.append(search)
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f"SELECT appid FROM games{where} ORDER BY {SORT_ORDERS[sort]}", params
+
+    def close(self):
+        self.conn.close()
+
+    def _set_flag(self, column, appids):
+        # Set column for exactly the given games and clear it everywhere else, touching only the
+        # rows that change (usually none when the launcher starts)
+        appids = set(appids)
+        current = {row[0] for row in self.conn.execute(f"SELECT appid FROM games WHERE {column} = 1")}
+        with self.conn:
+            self.conn.executemany(f"UPDATE games SET {column} = 0 WHERE appid = ?", [(appid,) for appid in current - appids])
+            self.conn.executemany(f"UPDATE games SET {column} = 1 WHERE appid = ?", [(appid,) for appid in appids - current])
+
+    def _upsert(self, games):
+        # ON CONFLICT only overwrites the API fields and leaves any other columns of the row alone
+        fields = GAME_FIELDS + ("name_key",)
+        placeholders = ", ".join("?" for _ in fields)
+        updates = ", ".join(f"{field} = excluded.{field}" for field in fields[1:])
+        # Rows that did not change are not rewritten at all
+        changed = " OR ".join(f"{field} IS NOT excluded.{field}" for field in fields[1:])
+        self.conn.executemany(
+            f"INSERT INTO games ({', '.join(fields)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(appid) DO UPDATE SET {updates} WHERE {changed}",
+            [game_row(game) + (normalize(game.get("name") or ""),) for game in games])
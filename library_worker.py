@@ -0,0 +1,83 @@
+import threading
+import traceback
+
+from PyQt5 import QtCore
+
+import perf
+import steam_api
+
+class LibraryFetchSignals(QtCore.QObject):
+    progress = QtCore.pyqtSignal(str)
+    # Games parsed so far, while the download is still running
+    games = QtCore.pyqtSignal(object)
+    finished = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(str)
+    cancelled = QtCore.pyqtSignal()
+
+# Runs fetch(progress, cancel_event, on_games) on the Qt thread pool so the window
+# stays responsive, e.g. LauncherCore.fetch_accounts for the stale accounts.
+# Exactly one of finished/failed/cancelled is emitted at the end, also when fetch
+# raises something unexpected. The owner has to keep the worker (and so its
+# signals) alive until then; emits after the signals are gone, e.g. while the
+# interpreter shuts down, are dropped.
+class LibraryFetchWorker(QtCore.QRunnable):
+    def __init__(self, fetch):
+        super().__init__()
+        self.fetch = fetch
+        self.cancel_event = threading.Event()
+        self.signals = LibraryFetchSignals()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        import requests
+        try:
+            with perf.span("fetch library", "network"):
+                result = self.fetch(self._emit_progress, self.cancel_event, self._emit_games)
+        except steam_api.FetchCancelled:
+            signal, args = "cancelled", ()
+        except (requests.RequestException, ValueError) as e:
+            signal, args = ("cancelled", ()) if self.cancel_event.is_set() else ("failed", (str(e),))
+        except Exception as e:
+            traceback.print_exc()
+            signal, args = "failed", (f"Unexpected error: {e}",)
+        else:
+            signal, args = ("cancelled", ()) if self.cancel_event.is_set() else ("finished", (result,))
+        self._emit(signal, *args)
+
+    def _emit_progress(self, message):
+        self._emit("progress", message)
+
+    def _emit_games(self, games):
+        self._emit("games", games)
+
+    def _emit(self, signal, *args):
+        try:
+            getattr(self.signals, signal).emit(*args)
+        except RuntimeError:
+            # "wrapped C/C++ object has been deleted": nobody is listening any more
+            pass
+
+class InstallScanSignals(QtCore.QObject):
+    finished = QtCore.pyqtSignal(object)
+    failed = QtCore.pyqtSignal(str)
+
+# Scans the local Steam library folders on the Qt thread pool. The scanner is
+# reused between runs, so later scans only reparse changed manifests. Either
+# finished or failed is emitted at the end, whatever scan() raises.
+class InstallScanWorker(QtCore.QRunnable):
+    def __init__(self, scanner):
+        super().__init__()
+        self.scanner = scanner
+        self.signals = InstallScanSignals()
+
+    def run(self):
+        try:
+            installed = self.scanner.scan()
+            sizes = {appid: info["size_on_disk"] for appid, info in installed.items()}
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(sizes)
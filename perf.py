@@ -0,0 +1,121 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from image_cache import atomic_write
+
+# Spans kept for the overlay and the trace export; older ones are dropped
+MAX_EVENTS = 200000
+
+# Lightweight timing of the launcher's hot paths. While disabled (the default) a
+# span is a shared no-op object and a traced function pays one attribute check.
+# Enabled, every span appends (name, category, start, duration, thread) to a ring
+# buffer that perf_overlay shows live and export_chrome_trace() writes in the
+# Chrome trace format (chrome://tracing, Perfetto).
+class Tracer:
+    def __init__(self, max_events=MAX_EVENTS):
+        self.enabled = False
+        self.events = deque(maxlen=max_events)
+        self.origin = time.perf_counter()
+        self.thread_names = {}
+        # Guards thread_names; events is a deque, whose append is atomic
+        self.lock = threading.Lock()
+
+    def span(self, name, category="launcher", **args):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name, category, args)
+
+    def record(self, name, category, start, end, args=None):
+        # start/end are time.perf_counter() values
+        thread = threading.get_ident()
+        if thread not in self.thread_names:
+            with self.lock:
+                self.thread_names[thread] = threading.current_thread().name
+        self.events.append((name, category, start, end - start, thread, args))
+
+    def recent(self, seconds):
+        # Events that ended within the last seconds, oldest first
+        since = time.perf_counter() - seconds
+        return [event for event in list(self.events) if event[2] + event[3] >= since]
+
+    def clear(self):
+        self.events.clear()
+
+    def chrome_trace(self):
+        pid = os.getpid()
+        with self.lock:
+            thread_names = list(self.thread_names.items())
+        trace = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": thread, "args": {"name": name}}
+                 for thread, name in thread_names]
+        for name, category, start, duration, thread, args in list(self.events):
+            event = {"name": name, "cat": category, "ph": "X", "pid": pid, "tid": thread,
+                     "ts": round((start - self.origin) * 1e6, 1), "dur": round(duration * 1e6, 1)}
+            if args:
+                event["args"] = args
+            trace.append(event)
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        atomic_write(os.path.abspath(path), json.dumps(self.chrome_trace()).encode())
+
+class Span:
+    def __init__(self, tracer, name, category, args):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args or None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.tracer.record(self.name, self.category, self.start, time.perf_counter(), self.args)
+        return False
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+NULL_SPAN = NullSpan()
+
+tracer = Tracer()
+
+def enabled():
+    return tracer.enabled
+
+def enable():
+    tracer.enabled = True
+
+def disable():
+    tracer.enabled = False
+
+def span(name, category="launcher", **args):
+    if not tracer.enabled:
+        return NULL_SPAN
+    return Span(tracer, name, category, args)
+
+# Decorator form of span() for whole functions, e.g. @perf.traced("filter_games", "gui")
+def traced(name, category="launcher"):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                tracer.record(name, category, start, time.perf_counter())
+        return wrapper
+    return decorate
+
+def export_chrome_trace(path):
+    tracer.export_chrome_trace(path)
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import defaultdict
+
+from PyQt5 import QtCore, QtGui, QtWidgets
+
+import perf
+
+# Detects frames the GUI thread could not deliver: a precise timer fires every
+# interval_ms, and when it fires more than stall_ms late the event loop was
+# blocked for that long. Each stall is recorded as a "frame stall" span, so the
+# overlay and the trace show it next to the work that caused it.
+class StallMonitor(QtCore.QObject):
+    def __init__(self, stall_ms=50, interval_ms=16, parent=None):
+        super().__init__(parent)
+        self.stall_ms = stall_ms
+        self.timer = QtCore.QTimer(self)
+        self.timer.setTimerType(QtCore.Qt.PreciseTimer)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self._tick)
+        self.last = None
+
+    def start(self):
+        self.last = time.perf_counter()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def _tick(self):
+        now = time.perf_counter()
+        expected = self.last + self.timer.interval() / 1000
+        if (now - expected) * 1000 > self.stall_ms:
+            perf.tracer.record("frame stall", "stall", expected, now)
+        self.last = now
+
+# Semi-transparent panel over the top right corner of parent with the stalls and
+# the busiest spans of the last window_s seconds. Showing it enables tracing and
+# the stall monitor, hiding it turns both off again.
+class PerfOverlay(QtWidgets.QLabel):
+    def __init__(self, parent, stall_ms=50, window_s=10):
+        super().__init__(parent)
+        self.window_s = window_s
+        self.gui_thread = threading.get_ident()
+        self.monitor = StallMonitor(stall_ms, parent=self)
+        self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
+        self.setTextFormat(QtCore.Qt.PlainText)
+        self.setFont(QtGui.QFontDatabase.systemFont(QtGui.QFontDatabase.FixedFont))
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 190); color: #e0e0e0; padding: 6px;")
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.setInterval(500)
+        self.refresh_timer.timeout.connect(self.refresh)
+        parent.installEventFilter(self)
+        self.hide()
+
+    def set_active(self, active):
+        if active:
+            perf.enable()
+            self.monitor.start()
+            self.refresh_timer.start()
+            self.refresh()
+            self.show()
+            self.raise_()
+        else:
+            self.hide()
+            self.refresh_timer.stop()
+            self.monitor.stop()
+            perf.disable()
+
+    def eventFilter(self, watched, event):
+        if event.type() == QtCore.QEvent.Resize:
+            self._place()
+        return False
+
+    def refresh(self):
+        self.setText(self.summary())
+        self.adjustSize()
+        self._place()
+
+    def summary(self):
+        events = perf.tracer.recent(self.window_s)
+        stalls = [event for event in events if event[1] == "stall"]
+        spans = [event for event in events if event[1] != "stall"]
+        lines = [f"Performance (last {self.window_s}s, F12 to hide)",
+                 f"stalls > {self.monitor.stall_ms} ms: {len(stalls)}"
+                 + (f", worst {max(event[3] for event in stalls) * 1000:.0f} ms" if stalls else "")]
+        if stalls:
+            # GUI-thread spans overlapping the latest stall are what blocked the event loop
+            _, _, start, duration, _, _ = stalls[-1]
+            causes = [event for event in spans if event[4] == self.gui_thread and event[1] != "async"
+                      and event[2] < start + duration and event[2] + event[3] > start]
+            causes.sort(key=lambda event: -event[3])
+            lines.append(f"last stall {duration * 1000:.0f} ms: "
+                         + (", ".join(f"{event[0]} {event[3] * 1000:.0f} ms" for event in causes[:3]) or "untraced work"))
+        totals = defaultdict(lambda: [0, 0.0, 0.0, False])
+        for name, category, _, duration, thread, _ in spans:
+            total = totals[name]
+            total[0] += 1
+            total[1] += duration
+            total[2] = max(total[2], duration)
+            total[3] = total[3] or thread == self.gui_thread
+        lines.append(f"{'span':<22}{'n':>6}{'total ms':>10}{'max ms':>9}")
+        for name, (count, total, longest, on_gui) in sorted(totals.items(), key=lambda item: -item[1][1])[:10]:
+            label = name + ("" if on_gui else " (bg)")
+            lines.append(f"{label[:22]:<22}{count:>6}{total * 1000:>10.1f}{longest * 1000:>9.1f}")
+        return "\n".join(lines)
+
+    def _place(self):
+        parent = self.parentWidget()
+        menu = parent.menuWidget() if isinstance(parent, QtWidgets.QMainWindow) else None
+        self.move(max(0, parent.width() - self.width() - 8), (menu.height() if menu else 0) + 8)
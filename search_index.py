@@ -0,0 +1,67 @@
+import unicodedata
+from array import array
+from collections import Counter
+
+# Casefold, strip accents and collapse whitespace so "Pokémon  Go" matches "pokemon go"
+def normalize(text):
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(text.casefold().split())
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+# Substring search over game names. Names are normalized once, every trigram maps
+# to the ascending rows containing it, and a query that extends the previous one
+# only re-checks the previous matches. The previous result is swapped as a single
+# tuple, so searches may run on a worker thread.
+class SearchIndex:
+    def __init__(self, names):
+        self.names = [normalize(name) for name in names]
+        self.postings = {}
+        for row, name in enumerate(self.names):
+            for gram in trigrams(name):
+                rows = self.postings.get(gram)
+                if rows is None:
+                    rows = self.postings[gram] = array("i")
+                rows.append(row)
+        self.all_rows = array("i", range(len(self.names)))
+        self.last = ("", self.all_rows)
+
+    def __len__(self):
+        return len(self.names)
+
+    def search(self, query):
+        # Rows whose name contains query, in library order
+        query = normalize(query)
+        if not query:
+            self.last = ("", self.all_rows)
+            return self.all_rows
+
+        candidates = self.all_rows
+        last_query, last_rows = self.last
+        if last_query and last_query in query:
+            candidates = last_rows
+        grams = trigrams(query)
+        if grams:
+            # Every match contains every trigram, so the rarest one bounds the candidates
+            rarest = min((self.postings.get(gram, ()) for gram in grams), key=len)
+            if len(rarest) < len(candidates):
+                candidates = rarest
+
+        names = self.names
+        rows = array("i", [row for row in candidates if query in names[row]])
+        self.last = (query, rows)
+        return rows
+
+    def fuzzy_search(self, query, limit=50, min_score=0.5):
+        # Typo-tolerant fallback: rank rows by the share of query trigrams they contain
+        grams = trigrams(normalize(query))
+        if not grams:
+            return array("i")
+        scores = Counter()
+        for gram in grams:
+            scores.update(self.postings.get(gram, ()))
+        threshold = min_score * len(grams)
+        ranked = [row for row, score in scores.most_common() if score >= threshold]
+        return array("i", ranked[:limit])
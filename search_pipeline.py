@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt5 import QtCore
+
+# One frame at 60 Hz; GUI-thread work above this shows up as a stutter
+FRAME_MS = 1000 / 60
+
+# Debounced search pipeline for the search bar. Keystrokes within the debounce
+# window are coalesced into one query, matching runs on a single worker thread,
+# and a newer query cancels the older one: queued work is skipped and results
+# that arrive late are dropped before they reach the view.
+class SearchPipeline(QtCore.QObject):
+    results_ready = QtCore.pyqtSignal(object, object)
+    _finished = QtCore.pyqtSignal(int, object, object)
+
+    def __init__(self, search, debounce_ms=150, parent=None):
+        super().__init__(parent)
+        self.search = search
+        self.generation = 0
+        self.query = ""
+        self.submitted_at = 0.0
+        self.cancel_event = threading.Event()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="search")
+        self.timings = deque(maxlen=200)
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self._start)
+        self._finished.connect(self._deliver)
+
+    def submit(self, query, immediate=False):
+        # Remember only the newest query; the timer restarts on every keystroke
+        self.invalidate()
+        self.query = query
+        self.submitted_at = time.perf_counter()
+        self.timer.start(0 if immediate else self.timer.interval())
+
+    def invalidate(self):
+        # Results of everything submitted so far are no longer wanted
+        self.generation += 1
+        self.cancel_event.set()
+
+    def prepare(self, function, *args):
+        # Run function on the search thread ahead of the next queries, e.g. to build
+        # data the searches will need; queries submitted meanwhile run after it
+        self.executor.submit(function, *args)
+
+    def shutdown(self):
+        self.timer.stop()
+        self.invalidate()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _start(self):
+        self.cancel_event = threading.Event()
+        timing = {"query": self.query, "debounce_ms": (time.perf_counter() - self.submitted_at) * 1000}
+        self.executor.submit(self._run, self.generation, self.query, self.cancel_event, timing, time.perf_counter())
+
+    def _run(self, generation, query, cancel_event, timing, started_at):
+        if cancel_event.is_set():
+            return
+        begin = time.perf_counter()
+        timing["queue_ms"] = (begin - started_at) * 1000
+        rows = self.search(query, cancel_event)
+        timing["match_ms"] = (time.perf_counter() - begin) * 1000
+        if not cancel_event.is_set():
+            self._finished.emit(generation, rows, timing)
+
+    def _deliver(self, generation, rows, timing):
+        if generation != self.generation:
+            return
+        begin = time.perf_counter()
+        self.results_ready.emit(rows, timing)
+        now = time.perf_counter()
+        # Time spent on the GUI thread applying the result, and keystroke-to-view in total
+        timing["apply_ms"] = (now - begin) * 1000
+        timing["total_ms"] = (now - self.submitted_at) * 1000
+        self.timings.append(timing)
+
+    def slow_applies(self):
+        return [timing for timing in self.timings if timing["apply_ms"] > FRAME_MS]
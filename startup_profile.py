@@ -0,0 +1,59 @@
+import sys
+import time
+
+# Taken when this module is imported, which the launchers do before anything heavy
+START = time.perf_counter()
+
+FLAG = "--profile-startup"
+
+marks = []
+reported = False
+paint_filter = None
+
+def enabled():
+    return FLAG in sys.argv
+
+# Record how long startup took up to this point
+def mark(label):
+    if enabled():
+        marks.append((label, time.perf_counter()))
+
+# Print the time of each stage and since process start, e.g.
+#   import PyQt5           42.1 ms   (total   55.3 ms)
+def report():
+    print(f"Startup profile ({sys.argv[0]}):")
+    previous = START
+    for label, at in marks:
+        print(f"  {label:<22} {(at - previous) * 1000:7.1f} ms   (total {(at - START) * 1000:7.1f} ms)")
+        previous = at
+
+# Marks "first paint" when widget is painted for the first time. With quit_after
+# the report is printed and the app quits once all those labels have been marked.
+def watch_first_paint(widget, quit_after=()):
+    global paint_filter
+    if not enabled():
+        return
+    from PyQt5 import QtCore
+
+    class PaintFilter(QtCore.QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QtCore.QEvent.Paint and obj is widget:
+                widget.removeEventFilter(self)
+                mark("first paint")
+                check_done(quit_after)
+            return False
+
+    paint_filter = PaintFilter()
+    widget.installEventFilter(paint_filter)
+
+# Print the report and quit once every label in labels has been marked
+def check_done(labels):
+    global reported
+    if reported or not enabled():
+        return
+    seen = {label for label, _ in marks}
+    if all(label in seen for label in labels):
+        reported = True
+        report()
+        from PyQt5 import QtCore
+        QtCore.QTimer.singleShot(0, QtCore.QCoreApplication.quit)
@@ -0,0 +1,158 @@
+import codecs
+import json
+import re
+import time
+
+import perf
+from game_record import Game
+
+OWNED_GAMES_URL = "https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/"
+# Base URL for the small community icons returned by GetOwnedGames
+ICON_BASE_URL = "http://media.steampowered.com/steamcommunity/public/images/apps"
+# Base URL for the 460x215 header art shown in the grid view
+HEADER_BASE_URL = "https://cdn.cloudflare.steamstatic.com/steam/apps"
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (5, 30)
+# Responses worth retrying; anything else (e.g. 403 for a bad key) fails right away
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Start of the games array in a GetOwnedGames body; only game_count comes before it
+GAMES_KEY = re.compile(r'"games"\s*:\s*\[')
+# "}" tried from the end of the buffer before waiting for the next chunk
+MAX_CUTS = 8
+
+class FetchCancelled(Exception):
+    pass
+
+# Build the icon URL for a game from its app id and icon hash
+def icon_url(app_id, icon_hash):
+    return f"{ICON_BASE_URL}/{app_id}/{icon_hash}.jpg"
+
+def header_url(app_id):
+    return f"{HEADER_BASE_URL}/{app_id}/header.jpg"
+
+# The process-wide HTTP client (see http_client) used for the API, icons and header
+# images. requests is imported here rather than at module level to keep startup fast.
+def shared_session():
+    from http_client import shared_client
+    return shared_client()
+
+# Incremental decoder for a GetOwnedGames body: feed() it the downloaded chunks and
+# get back the games completed so far as Game records, so the first rows can be shown
+# long before a large library has arrived and no dict per game outlives its chunk.
+# The complete entries of a chunk are decoded by one json.loads, cut after the last
+# "}" that makes them valid JSON. That can only be the end of an entry: a cut inside
+# a string or a nested value never parses.
+class OwnedGamesParser:
+    def __init__(self):
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.in_games = False
+        self.done = False
+        self.count = 0
+
+    def feed(self, data, final=False):
+        # Games completed by data; final=True for the end of the body, which raises
+        # ValueError if it was not valid JSON or ended inside the games array
+        self.buffer += self.decoder.decode(data, final)
+        games = []
+        if not self.in_games and not self.done:
+            match = GAMES_KEY.search(self.buffer)
+            if match is not None:
+                self.buffer = self.buffer[match.end():]
+                self.in_games = True
+            elif final:
+                # A response without games ({"response": {}}), or no JSON at all
+                json.loads(self.buffer)
+                self.done = True
+        if self.in_games and not self.done:
+            games = self._parse_games()
+        if final and not self.done:
+            raise ValueError(f"Incomplete GetOwnedGames response after {self.count} games")
+        return games
+
+    def _parse_games(self):
+        rest = self.buffer.lstrip()
+        if self.count and rest.startswith(","):
+            rest = rest[1:].lstrip()
+        if rest.startswith("]"):
+            self.done = True
+            return []
+        cut = len(rest)
+        for _ in range(MAX_CUTS):
+            cut = rest.rfind("}", 0, cut)
+            if cut < 0:
+                break
+            try:
+                entries = json.loads("[" + rest[:cut + 1] + "]")
+            except ValueError:
+                continue
+            self.buffer = rest[cut + 1:]
+            self.done = self.buffer.lstrip().startswith("]")
+            self.count += len(entries)
+            return [Game.from_dict(entry) for entry in entries]
+        self.buffer = rest
+        return []
+
+# Fetch the owned games of steam_id as Game records. Connection errors, timeouts and
+# 5xx/429 responses are retried with exponential backoff; cancel_event aborts between
+# attempts and between downloaded chunks. progress(message) reports each stage, and
+# on_games(games) gets the games of each chunk as soon as they are parsed (a retry
+# only passes on games beyond those already delivered).
+def fetch_owned_games(api_key, steam_id, session=None, timeout=DEFAULT_TIMEOUT, retries=3, backoff=0.5,
+                      cancel_event=None, progress=None, on_games=None):
+    import requests
+    session = session or shared_session()
+    params = {"key": api_key, "steamid": steam_id, "include_appinfo": "true"}
+    report = progress or (lambda message: None)
+    delivered = 0
+
+    for attempt in range(retries + 1):
+        _check_cancelled(cancel_event)
+        report("Requesting Steam library..." if attempt == 0 else f"Retrying ({attempt}/{retries})...")
+        try:
+            with session.get(OWNED_GAMES_URL, params=params, timeout=timeout, stream=True) as response:
+                # On the last attempt a retryable status falls through to raise_for_status
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    response.raise_for_status()
+                    games = []
+                    for batch in _iter_games(response, cancel_event, report):
+                        games += batch
+                        if on_games is not None and len(games) > delivered:
+                            on_games(games[delivered:])
+                            delivered = len(games)
+                    return games
+                reason = f"HTTP {response.status_code}"
+        except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+            # ChunkedEncodingError: the connection dropped while the body was streaming
+            if attempt == retries:
+                raise
+            reason = e.__class__.__name__
+
+        delay = backoff * (2 ** attempt)
+        report(f"{reason}, retrying in {delay:.1f}s...")
+        if cancel_event is not None:
+            if cancel_event.wait(delay):
+                raise FetchCancelled()
+        else:
+            time.sleep(delay)
+
+def _iter_games(response, cancel_event, report):
+    # Batches of games as the body arrives; parsing overlaps the download
+    parser = OwnedGamesParser()
+    received = 0
+    for chunk in response.iter_content(chunk_size=64 * 1024):
+        _check_cancelled(cancel_event)
+        received += len(chunk)
+        with perf.span("parse library", "network", bytes=len(chunk)):
+            games = parser.feed(chunk)
+        report(f"Downloading library... {received // 1024} KB, {parser.count} games")
+        if games:
+            yield games
+    games = parser.feed(b"", final=True)
+    if games:
+        yield games
+
+def _check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise FetchCancelled()
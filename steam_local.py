@@ -0,0 +1,207 @@
+import os
+import platform
+import re
+
+# Bit of StateFlags that is set once every file of the app is on disk
+STATE_FULLY_INSTALLED = 4
+
+# One VDF token after optional whitespace: a quoted string, a brace, a // comment
+# or an unquoted word (used by some older files)
+TOKEN = re.compile(r'\s*(?:"((?:[^"\\]|\\.)*)"|([{}])|//[^\n]*(?:\n|$)|([^\s{}"]+))')
+ESCAPE = re.compile(r"\\(.)")
+ESCAPES = {"n": "\n", "t": "\t"}
+
+class VDFError(ValueError):
+    pass
+
+# Steam installs to different places per platform and package format
+def default_steam_roots():
+    home = os.path.expanduser("~")
+    if platform.system() == "Windows":
+        base = os.environ.get("PROGRAMFILES(X86)") or "C:\\Program Files (x86)"
+        candidates = [os.path.join(base, "Steam")]
+    else:
+        candidates = [
+            os.path.join(home, ".steam", "steam"),
+            os.path.join(home, ".local", "share", "Steam"),
+            os.path.join(home, ".var", "app", "com.valvesoftware.Steam", ".local", "share", "Steam"),
+        ]
+    roots = []
+    for path in candidates:
+        real = os.path.realpath(path)
+        if os.path.isdir(os.path.join(real, "steamapps")) and real not in roots:
+            roots.append(real)
+    return roots
+
+# Yield ("{", None), ("}", None) and ("str", text) tokens of a VDF file, reading it
+# in chunks instead of loading it at once
+def iter_tokens(file, chunk_size=64 * 1024):
+    buffer = ""
+    pos = 0
+    eof = False
+    while True:
+        match = TOKEN.match(buffer, pos)
+        # A token touching the end of the buffer may continue in the next chunk
+        if not eof and (match is None or match.end() == len(buffer)):
+            chunk = file.read(chunk_size)
+            if chunk:
+                buffer = buffer[pos:] + chunk
+                pos = 0
+            else:
+                eof = True
+            continue
+        if match is None:
+            if buffer[pos:].strip():
+                raise VDFError(f"unexpected data: {buffer[pos:pos + 20]!r}")
+            return
+        pos = match.end()
+        quoted, brace, word = match.groups()
+        if brace:
+            yield brace, None
+        elif quoted is not None:
+            yield "str", ESCAPE.sub(lambda m: ESCAPES.get(m.group(1), m.group(1)), quoted)
+        elif word is not None:
+            yield "str", word
+
+# Parse a whole VDF file into nested dicts. Keys are lowercased because Steam
+# itself treats them case-insensitively ("AppState" vs "appstate").
+def parse_vdf(file):
+    root = {}
+    stack = [root]
+    key = None
+    for kind, value in iter_tokens(file):
+        if kind == "{":
+            if key is None:
+                raise VDFError("block without a key")
+            block = stack[-1][key] = {}
+            stack.append(block)
+            key = None
+        elif kind == "}":
+            if key is not None or len(stack) == 1:
+                raise VDFError("unexpected }")
+            stack.pop()
+        elif key is None:
+            key = value.lower()
+        else:
+            stack[-1][key] = value
+            key = None
+    if len(stack) != 1 or key is not None:
+        raise VDFError("unexpected end of file")
+    return root
+
+def load_vdf(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as file:
+        return parse_vdf(file)
+
+# Library folders listed in <root>/steamapps/libraryfolders.vdf, the root itself first.
+# Handles the current format ("0" { "path" ... }) and the old one ("1" "D:\\Games").
+def library_folders(root, vdf=None):
+    folders = [root]
+    try:
+        vdf = vdf if vdf is not None else load_vdf(os.path.join(root, "steamapps", "libraryfolders.vdf"))
+    except (OSError, VDFError):
+        return folders
+    entries = vdf.get("libraryfolders")
+    if not isinstance(entries, dict):
+        return folders
+    for key, value in entries.items():
+        path = value.get("path") if isinstance(value, dict) else (value if key.isdigit() else None)
+        if path and os.path.realpath(path) not in folders:
+            folders.append(os.path.realpath(path))
+    return folders
+
+# Install info of one appmanifest_<appid>.acf, or None if it cannot be read
+def read_manifest(path):
+    try:
+        state = load_vdf(path).get("appstate")
+    except (OSError, VDFError):
+        return None
+    if not isinstance(state, dict):
+        return None
+    try:
+        return {
+            "appid": int(state["appid"]),
+            "name": state.get("name", ""),
+            "installdir": state.get("installdir", ""),
+            "size_on_disk": int(state.get("sizeondisk", 0) or 0),
+            "state_flags": int(state.get("stateflags", 0) or 0),
+            "last_updated": int(state.get("lastupdated", 0) or 0),
+        }
+    except (KeyError, ValueError):
+        return None
+
+# Finds installed Steam games from the manifests in every library folder. Each
+# manifest is remembered with its mtime, size and inode, so a rescan only stats the files
+# and reparses the ones that were added or changed since the last scan.
+class SteamLibraryScanner:
+    def __init__(self, roots=None):
+        self.roots = list(roots) if roots is not None else default_steam_roots()
+        self.manifests = {}
+        self.folders_cache = {}
+        self.last_scan = {"manifests": 0, "parsed": 0, "reused": 0, "removed": 0}
+
+    def steamapps_dirs(self):
+        dirs = []
+        for root in self.roots:
+            vdf_path = os.path.join(root, "steamapps", "libraryfolders.vdf")
+            try:
+                stamp = os.stat(vdf_path).st_mtime_ns
+            except OSError:
+                stamp = None
+            cached = self.folders_cache.get(root)
+            if cached is None or cached[0] != stamp:
+                cached = self.folders_cache[root] = (stamp, library_folders(root))
+            for folder in cached[1]:
+                path = os.path.join(folder, "steamapps")
+                if path not in dirs and os.path.isdir(path):
+                    dirs.append(path)
+        return dirs
+
+    def scan(self):
+        # appid -> manifest info of every fully installed game
+        seen = set()
+        parsed = reused = 0
+        for directory in self.steamapps_dirs():
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if not (entry.name.startswith("appmanifest_") and entry.name.endswith(".acf")):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                seen.add(entry.path)
+                if self.update_manifest(entry.path, stat):
+                    parsed += 1
+                else:
+                    reused += 1
+        removed = [path for path in self.manifests if path not in seen]
+        for path in removed:
+            del self.manifests[path]
+        self.last_scan = {"manifests": len(seen), "parsed": parsed, "reused": reused, "removed": len(removed)}
+        return self.installed()
+
+    def update_manifest(self, path, stat=None):
+        # Reparse path if it changed since it was last read; True if it was parsed
+        if stat is None:
+            stat = os.stat(path)
+        # Steam replaces manifests by renaming a new file over them, which also changes the inode
+        stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        cached = self.manifests.get(path)
+        if cached is not None and cached[0] == stamp:
+            return False
+        self.manifests[path] = (stamp, read_manifest(path))
+        return True
+
+    def forget_manifest(self, path):
+        return self.manifests.pop(path, None) is not None
+
+    def installed(self):
+        games = {}
+        for _, info in self.manifests.values():
+            if info is not None and info["state_flags"] & STATE_FULLY_INSTALLED:
+                games[info["appid"]] = info
+        return games
@@ -0,0 +1,186 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+
+from PyQt5 import QtCore
+
+from library_worker import InstallScanWorker
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+EVENT = struct.Struct("iIII")
+
+# Minimal inotify binding over ctypes; raises OSError where inotify is unavailable
+class Inotify:
+    def __init__(self):
+        name = ctypes.util.find_library("c")
+        if not hasattr(os, "O_CLOEXEC") or name is None:
+            raise OSError("inotify is not available on this platform")
+        self.libc = ctypes.CDLL(name, use_errno=True)
+        if not hasattr(self.libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}
+
+    def add_watch(self, path, mask=WATCH_MASK):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self.paths[wd] = path
+        return wd
+
+    def read_events(self):
+        # (directory, mask, file name) of every queued event
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = EVENT.unpack_from(data, offset)
+                offset += EVENT.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                events.append((self.paths.get(wd), mask, name))
+
+    def close(self):
+        os.close(self.fd)
+
+# Keeps the installed set of a SteamLibraryScanner up to date while the launcher
+# runs. inotify reports changed appmanifest files directly, so only those are
+# reparsed; without inotify (or with mode="poll") the folders are re-stat'ed every
+# poll_ms. Full passes run on the Qt thread pool, one at a time; manifest events
+# arriving meanwhile wait for it. installed_changed carries {appid: size on disk,
+# or None if removed}.
+class SteamLibraryWatcher(QtCore.QObject):
+    installed_changed = QtCore.pyqtSignal(object)
+
+    def __init__(self, scanner, mode="auto", poll_ms=5000, debounce_ms=50, parent=None):
+        super().__init__(parent)
+        self.scanner = scanner
+        self.mode = mode
+        self.active = False
+        self.installed = {}
+        self.inotify = None
+        self.notifier = None
+        self.pending = set()
+        self.scan_worker = None
+        self.poll_timer = QtCore.QTimer(self)
+        self.poll_timer.setInterval(poll_ms)
+        self.poll_timer.timeout.connect(self.rescan)
+        # Steam touches a manifest several times per update; apply them together
+        self.debounce_timer = QtCore.QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(debounce_ms)
+        self.debounce_timer.timeout.connect(self._apply_pending)
+
+    def start(self, installed):
+        # installed is the result of the scan the scanner has just done
+        self.installed = dict(installed)
+        self.active = True
+        if self.mode != "poll":
+            try:
+                self._start_inotify()
+                return
+            except OSError as e:
+                print(f"inotify unavailable ({e}), polling the Steam library every {self.poll_timer.interval()} ms")
+                self._stop_inotify()
+        self.mode = "poll"
+        self.poll_timer.start()
+
+    def stop(self):
+        self.active = False
+        self.poll_timer.stop()
+        self.debounce_timer.stop()
+        self._stop_inotify()
+        # A pass still running finishes on its own, its result is dropped
+        self.scan_worker = None
+        self.pending.clear()
+
+    def rescan(self):
+        # Full stat pass in the background; still only reparses changed manifests.
+        # Skipped while the previous pass runs.
+        if self.scan_worker is not None:
+            return
+        worker = self.scan_worker = InstallScanWorker(self.scanner)
+        worker.signals.finished.connect(lambda installed: self._scan_done(worker, installed))
+        worker.signals.failed.connect(lambda error: self._scan_done(worker, None))
+        QtCore.QThreadPool.globalInstance().start(worker)
+
+    def _scan_done(self, worker, installed):
+        if worker is not self.scan_worker:
+            return
+        self.scan_worker = None
+        if installed is not None:
+            self._emit_changes(installed)
+        if self.pending:
+            self.debounce_timer.start()
+
+    def _start_inotify(self):
+        self.inotify = Inotify()
+        for directory in self.scanner.steamapps_dirs():
+            self.inotify.add_watch(directory)
+        self.notifier = QtCore.QSocketNotifier(self.inotify.fd, QtCore.QSocketNotifier.Read, self)
+        self.notifier.activated.connect(self._read_inotify)
+        self.mode = "inotify"
+
+    def _stop_inotify(self):
+        if self.notifier is not None:
+            self.notifier.setEnabled(False)
+            self.notifier = None
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
+
+    def _read_inotify(self):
+        for directory, mask, name in self.inotify.read_events():
+            if mask & IN_Q_OVERFLOW or name == "libraryfolders.vdf":
+                # Events were lost or library folders changed: fall back to one full pass
+                self.pending.add(None)
+            elif directory and name.startswith("appmanifest_") and name.endswith(".acf"):
+                self.pending.add(os.path.join(directory, name))
+        if self.pending:
+            self.debounce_timer.start()
+
+    def _apply_pending(self):
+        if self.scan_worker is not None:
+            # The scanner belongs to the running pass; applied once it is done
+            return
+        pending, self.pending = self.pending, set()
+        if None in pending:
+            # Watch again before the pass so that nothing changed during it is missed
+            self._stop_inotify()
+            try:
+                self._start_inotify()
+            except OSError:
+                self._stop_inotify()
+                self.mode = "poll"
+                self.poll_timer.start()
+            self.rescan()
+            return
+        for path in pending:
+            try:
+                self.scanner.update_manifest(path)
+            except OSError:
+                self.scanner.forget_manifest(path)
+        self._emit_changes()
+
+    def _emit_changes(self, installed=None):
+        # installed: {appid: size on disk} of a finished pass, else taken from the scanner
+        if installed is None:
+            installed = {appid: info["size_on_disk"] for appid, info in self.scanner.installed().items()}
+        changes = {appid: installed.get(appid) for appid in installed.keys() | self.installed.keys()
+                   if installed.get(appid) != self.installed.get(appid)}
+        self.installed = installed
+        if changes:
+            self.installed_changed.emit(changes)
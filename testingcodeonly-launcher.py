@@ -1,23 +1,26 @@
 import os
 import json
-import requests
 import subprocess
 import sys
-from PyQt5 import QtWidgets, QtGui, QtCore
+import importlib.util
 import platform
+import startup_profile
 
 # Funktion zum Installieren fehlender Pakete
 def install_missing_packages():
     required_packages = ["requests", "PyQt5"]
     for package in required_packages:
-        try:
-            __import__(package)
-        except ImportError:
+        # find_spec sucht das Paket nur, statt es (teuer) zu importieren
+        if importlib.util.find_spec(package) is None:
             print(f"Package {package} not found. Installing...")
             subprocess.check_call([sys.executable, "-m", "pip", "install", package])
 
 # Stelle sicher, dass alle benötigten Pakete zu Beginn installiert werden
 install_missing_packages()
+startup_profile.mark("dependency check")
+
+from PyQt5 import QtWidgets, QtCore
+startup_profile.mark("import PyQt5")
 
 # Konfigurationsdatei im Benutzerverzeichnis speichern
 CONFIG_FILE = os.path.join(os.path.expanduser("~"), ".launcher_config.json")
@@ -99,6 +102,8 @@ class GamingLauncher(QtWidgets.QMainWindow):
             QtWidgets.QMessageBox.warning(self, "Error", "Please set your Steam API Key and Profile ID first.")
             return
 
+        # requests wird nur hier gebraucht und deshalb nicht beim Start importiert
+        import requests
         try:
             url = f"https://api.steampowered.com/IPlayerService/GetOwnedGames/v1/?key={self.steam_api_key}&steamid={self.steam_profile_id}&include_appinfo=true"
             response = requests.get(url)
@@ -125,7 +130,11 @@ class GamingLauncher(QtWidgets.QMainWindow):
 
 def main():
     app = QtWidgets.QApplication(sys.argv)
+    startup_profile.mark("QApplication")
     launcher = GamingLauncher()
+    startup_profile.mark("window constructed")
+    # Mit --profile-startup wird nach dem ersten Zeichnen beendet
+    startup_profile.watch_first_paint(launcher, quit_after=("first paint",))
     launcher.show()
     sys.exit(app.exec_())
 
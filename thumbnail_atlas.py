@@ -0,0 +1,189 @@
+import ctypes
+import json
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+from PyQt5 import QtCore, QtGui, sip
+
+from image_cache import atomic_write, default_cache_dir
+
+ATLAS_FILE = "thumbnails.atlas"
+INDEX_FILE = "thumbnails.json"
+# 460x215 header art scaled to 40%
+TILE_SIZE = (184, 86)
+# Tiles per atlas page; a page is one image, 64 tiles stacked vertically
+PAGE_TILES = 64
+# Save the index after this many new tiles instead of on every one
+INDEX_SAVE_INTERVAL = 100
+
+def default_atlas_dir():
+    return os.path.join(os.path.dirname(default_cache_dir()), "thumbnails")
+
+# Pre-scaled thumbnails packed into pages of one memory-mapped cache file. A tile
+# is scaled and converted to the screen format once (on a worker thread) and
+# copied into its slot; painting is then a plain blit from a page image that
+# wraps the mapping, with no QIcon/QPixmap per game and nothing decoded on the
+# GUI thread. Slots are reused least recently drawn first above max_bytes, and
+# the index (key -> slot) survives restarts next to the atlas file.
+class ThumbnailAtlas:
+    def __init__(self, directory=None, tile_size=TILE_SIZE, max_bytes=512 * 1024 * 1024):
+        self.directory = directory or default_atlas_dir()
+        self.path = os.path.join(self.directory, ATLAS_FILE)
+        self.index_path = os.path.join(self.directory, INDEX_FILE)
+        self.tile_width, self.tile_height = tile_size
+        self.tile_bytes = self.tile_width * self.tile_height * 4
+        # Pages start at multiples of the mmap granularity so each can be mapped on its own
+        granularity = mmap.ALLOCATIONGRANULARITY
+        self.page_bytes = (self.tile_bytes * PAGE_TILES + granularity - 1) // granularity * granularity
+        self.max_pages = max(1, max_bytes // self.page_bytes)
+        self.lock = threading.Lock()
+        self.slots = OrderedDict()
+        self.free = []
+        self.pages = []
+        self.page_images = []
+        self.file = None
+        self.closed = False
+        self.unsaved_changes = 0
+
+    def _ensure_open(self):
+        # Caller holds the lock
+        if self.file is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        self.file = open(self.path, "a+b")
+        size = os.fstat(self.file.fileno()).st_size
+        try:
+            with open(self.index_path, "r") as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            index = {}
+        pages = min(size // self.page_bytes, self.max_pages)
+        if index.get("tile") != [self.tile_width, self.tile_height]:
+            # Other tile size (or no index): start over
+            index, pages = {}, 0
+            self.file.truncate(0)
+        for _ in range(pages):
+            self._map_page()
+        used = set()
+        # Stored oldest first, so the OrderedDict is in LRU order again
+        for key, slot in index.get("slots", []):
+            if slot < pages * PAGE_TILES and slot not in used:
+                self.slots[key] = slot
+                used.add(slot)
+        self.free = [slot for slot in range(pages * PAGE_TILES - 1, -1, -1) if slot not in used]
+
+    def _map_page(self):
+        page = len(self.pages)
+        end = (page + 1) * self.page_bytes
+        if os.fstat(self.file.fileno()).st_size < end:
+            os.ftruncate(self.file.fileno(), end)
+        mapping = mmap.mmap(self.file.fileno(), self.page_bytes, offset=page * self.page_bytes)
+        self.pages.append((mapping, (ctypes.c_char * self.page_bytes).from_buffer(mapping)))
+        self.page_images.append(None)
+
+    def __contains__(self, key):
+        with self.lock:
+            if self.closed:
+                return False
+            self._ensure_open()
+            return key in self.slots
+
+    def put(self, key, image):
+        # Scale image to the tile (cropping to the tile's aspect ratio) and store it under key.
+        # Thread-safe; meant for the loader's worker threads.
+        tile = image.scaled(self.tile_width, self.tile_height, QtCore.Qt.KeepAspectRatioByExpanding,
+                            QtCore.Qt.SmoothTransformation)
+        if tile.width() != self.tile_width or tile.height() != self.tile_height:
+            tile = tile.copy((tile.width() - self.tile_width) // 2, (tile.height() - self.tile_height) // 2,
+                             self.tile_width, self.tile_height)
+        tile = tile.convertToFormat(QtGui.QImage.Format_RGB32)
+        bits = tile.constBits()
+        bits.setsize(self.tile_bytes)
+        data = bits.asstring()
+        with self.lock:
+            # A download may still finish after the view was closed
+            if self.closed:
+                return
+            self._ensure_open()
+            slot = self._allocate(key)
+            page, row = divmod(slot, PAGE_TILES)
+            offset = row * self.tile_bytes
+            self.pages[page][0][offset:offset + self.tile_bytes] = data
+            self.slots[key] = slot
+            # A new wrapper gets a new cacheKey, so paint engines that cache the page
+            # (e.g. as a GL texture) pick up the new tile
+            self.page_images[page] = None
+            self.unsaved_changes += 1
+            save = self.unsaved_changes >= INDEX_SAVE_INTERVAL
+        if save:
+            self.flush()
+
+    def _allocate(self, key):
+        slot = self.slots.pop(key, None)
+        if slot is not None:
+            return slot
+        if not self.free and len(self.pages) < self.max_pages:
+            self._map_page()
+            first = (len(self.pages) - 1) * PAGE_TILES
+            self.free = list(range(first + PAGE_TILES - 1, first - 1, -1))
+        if self.free:
+            return self.free.pop()
+        _, slot = self.slots.popitem(last=False)
+        return slot
+
+    def draw(self, painter, rect, key):
+        # Paint the tile of key into rect; False if there is none yet
+        with self.lock:
+            if self.closed:
+                return False
+            self._ensure_open()
+            slot = self.slots.get(key)
+            if slot is None:
+                return False
+            self.slots.move_to_end(key)
+            page, row = divmod(slot, PAGE_TILES)
+            image = self.page_images[page]
+            if image is None:
+                image = self.page_images[page] = QtGui.QImage(
+                    sip.voidptr(ctypes.addressof(self.pages[page][1])), self.tile_width,
+                    self.tile_height * PAGE_TILES, self.tile_width * 4, QtGui.QImage.Format_RGB32)
+            # Blit under the lock, a worker may be about to reuse an evicted slot
+            source = QtCore.QRect(0, row * self.tile_height, self.tile_width, self.tile_height)
+            if rect.width() == self.tile_width and rect.height() == self.tile_height:
+                painter.drawImage(rect.topLeft(), image, source)
+            else:
+                painter.drawImage(rect, image, source)
+        return True
+
+    def summary(self):
+        with self.lock:
+            return {"tiles": len(self.slots), "pages": len(self.pages), "max_pages": self.max_pages,
+                    "file_bytes": len(self.pages) * self.page_bytes}
+
+    def flush(self):
+        with self.lock:
+            if self.file is None or not self.unsaved_changes:
+                return
+            for mapping, _ in self.pages:
+                mapping.flush()
+            data = json.dumps({"tile": [self.tile_width, self.tile_height], "slots": list(self.slots.items())}).encode()
+            self.unsaved_changes = 0
+        atomic_write(self.index_path, data)
+
+    def close(self):
+        self.flush()
+        with self.lock:
+            self.closed = True
+            # Page images and ctypes views point into the mappings and have to go first
+            self.page_images = []
+            mappings = [mapping for mapping, _ in self.pages]
+            self.pages = []
+            for mapping in mappings:
+                mapping.close()
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.slots.clear()
+            self.free = []